@@ -7,7 +7,7 @@ from jinja2 import Template
 
 from ai_org_backend.tasks.celery_app import celery
 from ai_org_backend.main import Repo, TASK_CNT, TASK_LAT, debit, TOKEN_PRICE_PER_1000
-from ai_org_backend.services.storage import save_artefact
+from ai_org_backend.services.storage import artefact_file, save_artefact
 from ai_org_backend.services.testing import run_tests
 from ai_org_backend.db import SessionLocal
 from sqlmodel import select
@@ -76,7 +76,9 @@ def agent_qa(tid: str, task_id: str) -> None:
                     return
                 snippets = []
                 for artefact in artifacts:
-                    file_path = Path("workspace") / tid / artefact.repo_path
+                    file_path = artefact_file(
+                        tid, artefact.repo_path, artefact.sha256
+                    ) or Path("workspace") / artefact.repo_path
                     try:
                         code_content = file_path.read_text(encoding="utf-8")
                     except Exception as e:
@@ -257,7 +259,7 @@ def agent_qa(tid: str, task_id: str) -> None:
                     f"[QAAgent] Created new Dev task {new_task_id} to address test failures from task {task_id}"
                 )
                 try:
-                    from scripts.seed_graph import ingest
+                    from ai_org_backend.services.graph_ingest import ingest
                     ingest(tid)
                 except Exception as e:
                     logging.error(f"[QAAgent] Neo4j ingest failed for new task {new_task_id}: {e}")
@@ -300,7 +302,7 @@ def agent_qa(tid: str, task_id: str) -> None:
                 f"[QAAgent] Created new Dev task {new_task_id} to add missing tests for task {task_id}"
             )
             try:
-                from scripts.seed_graph import ingest
+                from ai_org_backend.services.graph_ingest import ingest
                 ingest(tid)
             except Exception as e:
                 logging.error(f"[QAAgent] Neo4j ingest failed for new task {new_task_id}: {e}")
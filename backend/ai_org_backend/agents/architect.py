@@ -68,7 +68,7 @@ def run_architect(purpose: Purpose, task: str | None = None) -> str:
 
 @shared_task(name="architect.seed_graph", queue="architect")
 def seed_graph(tenant_id: str, purpose_id: str) -> None:
-    from ai_org_backend.scripts.seed_graph import ingest
+    from ai_org_backend.services.graph_ingest import ingest
 
     with SessionLocal() as db:
         purpose = db.get(Purpose, purpose_id)
@@ -7,7 +7,7 @@ from jinja2 import Template
 
 # Import Celery app and utilities
 from ai_org_backend.tasks.celery_app import celery
-from ai_org_backend.services.storage import save_artefact
+from ai_org_backend.services.storage import artefact_file, save_artefact
 from ai_org_backend.main import Repo, TASK_CNT, TASK_LAT, debit, TOKEN_PRICE_PER_1000
 from ai_org_backend.db import SessionLocal
 from ai_org_backend.models import Task, Artifact
@@ -35,8 +35,10 @@ def agent_repo(tenant_id: str, task_id: str) -> None:
                     Task.description.ilike("%architecture blueprint%")
                 ).first()
                 if artefact:
-                    # Read blueprint content from workspace file
-                    artefact_path = Path("workspace") / task_obj.tenant_id / artefact.repo_path
+                    # Read blueprint content from the artefact store
+                    artefact_path = artefact_file(
+                        task_obj.tenant_id, artefact.repo_path, artefact.sha256
+                    ) or Path("workspace") / artefact.repo_path
                     try:
                         architecture_plan = artefact_path.read_text(encoding="utf-8")
                         logging.info(f"[repo_composer] Loaded architecture plan from artefact {artefact.repo_path}")
@@ -0,0 +1,23 @@
+"""index artifact.sha256 for content-addressed dedup lookups
+
+Revision ID: 20251017_add_artifact_sha256_index
+Revises: 20251017_add_task_readiness_indexes
+Create Date: 2025-10-17 00:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = '20251017_add_artifact_sha256_index'
+down_revision: Union[str, Sequence[str], None] = '20251017_add_task_readiness_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_artifact_sha256', 'artifact', ['sha256'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_artifact_sha256', table_name='artifact')
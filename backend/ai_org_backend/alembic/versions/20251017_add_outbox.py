@@ -0,0 +1,41 @@
+"""add outboxentry table for asynchronous artefact post-processing
+
+Revision ID: 20251017_add_outbox
+Revises: 20251017_add_artifact_sha256_index
+Create Date: 2025-10-17 00:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = '20251017_add_outbox'
+down_revision: Union[str, Sequence[str], None] = '20251017_add_artifact_sha256_index'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'outboxentry',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('topic', sa.String(length=64), nullable=False),
+        sa.Column('tenant_id', sa.String(), nullable=False),
+        sa.Column('ref_id', sa.String(), nullable=False),
+        sa.Column('payload', sa.String(), nullable=False, server_default='{}'),
+        sa.Column('status', sa.String(length=16), nullable=False, server_default='pending'),
+        sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('available_at', sa.DateTime(), nullable=False),
+        sa.Column('claim', sa.String(length=36), nullable=True),
+        sa.Column('last_error', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+    )
+    op.create_index(
+        'ix_outboxentry_status_available', 'outboxentry', ['status', 'available_at'], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_outboxentry_status_available', table_name='outboxentry')
+    op.drop_table('outboxentry')
@@ -0,0 +1,27 @@
+"""add indexes for set-based readiness query
+
+Revision ID: 20251017_add_task_readiness_indexes
+Revises: 20250808_add_tenant_allow_web_research
+Create Date: 2025-10-17 00:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = '20251017_add_task_readiness_indexes'
+down_revision: Union[str, Sequence[str], None] = '20250808_add_tenant_allow_web_research'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_task_tenant_status', 'task', ['tenant_id', 'status'], unique=False)
+    op.create_index('ix_taskdependency_to_id', 'taskdependency', ['to_id'], unique=False)
+    op.create_index('ix_taskdependency_from_id', 'taskdependency', ['from_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_taskdependency_from_id', table_name='taskdependency')
+    op.drop_index('ix_taskdependency_to_id', table_name='taskdependency')
+    op.drop_index('ix_task_tenant_status', table_name='task')
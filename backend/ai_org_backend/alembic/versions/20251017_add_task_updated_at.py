@@ -0,0 +1,32 @@
+"""add task.updated_at for incremental graph ingest
+
+Revision ID: 20251017_add_task_updated_at
+Revises: 20251017_add_outbox
+Create Date: 2025-10-17 00:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = '20251017_add_task_updated_at'
+down_revision: Union[str, Sequence[str], None] = '20251017_add_outbox'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # SQLite cannot add a column with a non-constant default: add it nullable,
+    # backfill, then tighten it (batch mode recreates the table on SQLite)
+    op.add_column('task', sa.Column('updated_at', sa.DateTime(), nullable=True))
+    op.execute(sa.text('UPDATE task SET updated_at = CURRENT_TIMESTAMP'))
+    with op.batch_alter_table('task') as batch_op:
+        batch_op.alter_column('updated_at', existing_type=sa.DateTime(), nullable=False)
+    op.create_index('ix_task_tenant_updated', 'task', ['tenant_id', 'updated_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_task_tenant_updated', table_name='task')
+    with op.batch_alter_table('task') as batch_op:
+        batch_op.drop_column('updated_at')
@@ -1,16 +1,20 @@
 from pathlib import Path
-from fastapi import APIRouter, HTTPException, Depends
-from fastapi.responses import FileResponse
-from ai_org_backend.services.storage import vector_store
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Depends, Header, Response
+from fastapi.responses import FileResponse, StreamingResponse
+from ai_org_backend.services.storage import (
+    artefact_file,
+    artifact_path,
+    has_blob,
+    read_artefact,
+    vector_store,
+)
 from sqlmodel import Session, select
 from sqlalchemy.orm import selectinload
 from ai_org_backend.db import engine
 from ai_org_backend.models import Purpose, Task, TaskDependency, Artifact, Tenant
-import sys
-ROOT = Path(__file__).resolve().parents[3]
-if str(ROOT) not in sys.path:
-    sys.path.append(str(ROOT))
-from scripts.seed_graph import ingest  # noqa: E402
+from ai_org_backend.services.archive import ARCHIVE_DIR, cached_archive, project_etag, stream_zip
+from ai_org_backend.services.graph_ingest import ingest
 from ai_org_backend.api.dependencies import get_current_tenant
 
 router = APIRouter(prefix="/api", tags=["pipeline"])
@@ -142,33 +146,79 @@ def create_purpose(payload: dict, current_tenant: Tenant = Depends(get_current_t
     return {"blueprint": blueprint}
 
 
+def _not_modified(if_none_match: Optional[str], etag: str) -> bool:
+    tags = {t.strip().removeprefix("W/").strip('"') for t in (if_none_match or "").split(",")}
+    return etag in tags or "*" in tags
+
+
 @router.get("/artifact/{artifact_id}")
-def download_artifact(artifact_id: str, current_tenant: Tenant = Depends(get_current_tenant)):
-    """Download the content of an artifact file by ID."""
+def download_artifact(
+    artifact_id: str,
+    current_tenant: Tenant = Depends(get_current_tenant),
+    if_none_match: Optional[str] = Header(default=None),
+):
+    """Download the content of an artifact file by ID.
+
+    Served from the immutable blob, the ETag is the stored sha256, so polling
+    clients get a 304 without the file being touched. Artefacts from before
+    the blob store only have the (mutable) workspace file; they get a weak
+    ETag from its mtime and size instead. Ranges (and If-Range) are handled
+    by ``FileResponse``.
+    """
     tenant_id = current_tenant.id
     with Session(engine) as session:
         art = session.get(Artifact, artifact_id)
-        if not art or (art.task and art.task.tenant_id != tenant_id):
+        if not art or not art.task or art.task.tenant_id != tenant_id:
             raise HTTPException(status_code=404, detail="Artifact not found")
-        file_path = Path("workspace") / art.repo_path
-        if not file_path.exists():
+    file_path: Optional[Path] = None
+    if has_blob(art.sha256):
+        tag, etag = art.sha256, f'"{art.sha256}"'
+    else:
+        # the workspace path may have been overwritten since: tag what is on disk
+        file_path = artifact_path(tenant_id, art.repo_path)
+        if file_path is None:
             raise HTTPException(status_code=404, detail="Artifact file not found")
-    return FileResponse(file_path, media_type=art.media_type, filename=Path(art.repo_path).name)
+        st = file_path.stat()
+        tag = f"{st.st_mtime_ns:x}-{st.st_size:x}"
+        etag = f'W/"{tag}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if _not_modified(if_none_match, tag):
+        return Response(status_code=304, headers=headers)
+    file_path = file_path or artefact_file(tenant_id, art.repo_path, art.sha256)
+    if file_path is None:
+        raise HTTPException(status_code=404, detail="Artifact file not found")
+    return FileResponse(
+        file_path, media_type=art.media_type, filename=Path(art.repo_path).name, headers=headers
+    )
 
 
 @router.get("/project.zip")
-def download_project_archive(current_tenant: Tenant = Depends(get_current_tenant)):
+def download_project_archive(
+    current_tenant: Tenant = Depends(get_current_tenant),
+    if_none_match: Optional[str] = Header(default=None),
+):
     """Download a ZIP archive containing all artifacts for the tenant."""
     tenant_id = current_tenant.id
     base_dir = Path("workspace") / tenant_id
     if not base_dir.exists():
         raise HTTPException(status_code=404, detail="No project output available")
-    archive_path = base_dir.parent / f"{tenant_id}_output.zip"
-    if archive_path.exists():
-        archive_path.unlink()
-    from shutil import make_archive
-    make_archive(str(archive_path.with_suffix("")), "zip", root_dir=base_dir)
-    return FileResponse(archive_path, media_type="application/zip", filename=f"{tenant_id}_project.zip")
+    etag = project_etag(base_dir)
+    headers = {"ETag": f'"{etag}"', "Cache-Control": "private, no-cache"}
+    if _not_modified(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    filename = f"{tenant_id}_project.zip"
+    cache_dir = Path("workspace") / ARCHIVE_DIR
+    cached = cached_archive(cache_dir, tenant_id, etag)
+    if cached:
+        return FileResponse(
+            cached, media_type="application/zip", filename=filename, headers=headers
+        )
+    headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return StreamingResponse(
+        stream_zip(base_dir, tenant_id, etag, cache_dir),
+        media_type="application/zip",
+        headers=headers,
+    )
 
 
 @router.get("/context")
@@ -186,13 +236,16 @@ def get_context(task_id: str, current_tenant: Tenant = Depends(get_current_tenan
         payload = res.payload or {}
         source = payload.get("file", "")
         snippet_text = ""
-        if source:
-            file_path = Path("workspace") / source
-            if file_path.exists():
-                try:
-                    content = file_path.read_text(encoding="utf-8", errors="ignore")
-                except Exception:
-                    content = ""
+        if payload.get("text"):  # the matching chunk
+            content = payload["text"]
+            snippet_text = content[:500] + ("..." if len(content) > 500 else "")
+        elif source:
+            try:
+                data = read_artefact(tenant_id, source, payload.get("sha"), 2048)
+            except Exception:
+                data = None
+            if data is not None:
+                content = data.decode("utf-8", errors="ignore")
                 snippet_text = content[:500] + ("..." if len(content) > 500 else "")
         snippets.append({
             "source": source,
@@ -23,6 +23,7 @@ from ai_org_backend.api.dependencies import get_current_tenant
 from ai_org_backend.db import engine
 # storage helpers are used by individual agent modules
 from ai_org_backend.models import Task, Tenant
+from ai_org_backend.orchestrator.ready_queue import ready_tasks
 from prometheus_client import Counter, Histogram, Gauge, make_asgi_app
 from neo4j import GraphDatabase
 import redis
@@ -135,8 +136,11 @@ async def create_task(d: Dict, current_tenant: Tenant = Depends(get_current_tena
     return t.model_dump()
 
 @app.get("/backlog")
-async def backlog(current_tenant: Tenant = Depends(get_current_tenant)):
+async def backlog(ready: bool = False, current_tenant: Tenant = Depends(get_current_tenant)):
     with Session(engine) as s:
+        if ready:
+            # only tasks whose prerequisites are done (one anti-join query)
+            return ready_tasks(s, current_tenant.id)
         rows = s.exec(
             select(Task).where(Task.tenant_id == current_tenant.id, Task.status == "todo")
         ).all()
@@ -3,11 +3,13 @@ from .purpose import Purpose
 from .task import Task
 from .task_dependency import TaskDependency
 from .artifact import Artifact
+from .outbox import OutboxEntry
 
 __all__ = [
     "Tenant",
     "Purpose", 
     "Task",
     "TaskDependency",
-    "Artifact"
+    "Artifact",
+    "OutboxEntry",
 ]
@@ -1,11 +1,12 @@
 import uuid
-import hashlib
 from datetime import datetime as dt
 from pathlib import Path
 from typing import TYPE_CHECKING, Optional
 
 from sqlmodel import SQLModel, Field, Relationship
 
+from ai_org_backend.utils.ingest import ingest
+
 if TYPE_CHECKING:
     from .task import Task
 
@@ -25,7 +26,7 @@ class Artifact(SQLModel, table=True):
     repo_path: str = Field(nullable=False)
     media_type: str = Field(nullable=False)
     size: int = Field(default=0, ge=0)
-    sha256: str = Field(nullable=False, min_length=64, max_length=64)
+    sha256: str = Field(nullable=False, min_length=64, max_length=64, index=True)
     created_at: dt = Field(default_factory=dt.utcnow, nullable=False)
 
     @classmethod
@@ -49,15 +50,14 @@ class Artifact(SQLModel, table=True):
             tgt = repo_root / f"{stem}_{counter}{suffix}"
             counter += 1
         
-        tgt.write_bytes(abs_path.read_bytes())
-        sha = hashlib.sha256(tgt.read_bytes()).hexdigest()
+        meta = ingest(abs_path, tgt)
         
         return cls(
             task_id=task_id,
             repo_path=str(tgt.relative_to(repo_root)),
             media_type=_guess_media_type(tgt),
-            size=tgt.stat().st_size,
-            sha256=sha,
+            size=meta.size,
+            sha256=meta.sha256,
         )
 
 
@@ -0,0 +1,24 @@
+from datetime import datetime as dt
+from typing import Optional
+
+from sqlalchemy import Index
+from sqlmodel import Field, SQLModel
+
+
+class OutboxEntry(SQLModel, table=True):
+    """Side effect to run after a SQL write committed (see ``services.outbox``)."""
+
+    # workers poll pending entries that are due
+    __table_args__ = (Index("ix_outboxentry_status_available", "status", "available_at"),)
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    topic: str = Field(nullable=False, max_length=64)
+    tenant_id: str = Field(nullable=False)
+    ref_id: str = Field(nullable=False)  # e.g. artifact id
+    payload: str = Field(default="{}", nullable=False)  # JSON
+    status: str = Field(default="pending", nullable=False, max_length=16)  # pending | dead
+    attempts: int = Field(default=0, ge=0)
+    available_at: dt = Field(default_factory=dt.utcnow, nullable=False)
+    claim: Optional[str] = Field(default=None, max_length=36)
+    last_error: Optional[str] = None
+    created_at: dt = Field(default_factory=dt.utcnow, nullable=False)
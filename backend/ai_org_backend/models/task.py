@@ -3,6 +3,7 @@ from datetime import datetime as dt
 from typing import Optional, TYPE_CHECKING, List
 from enum import Enum
 
+from sqlalchemy import Index
 from sqlmodel import SQLModel, Field, Relationship
 
 if TYPE_CHECKING:
@@ -28,6 +29,13 @@ class TaskStatus(str, Enum):
 class Task(SQLModel, table=True):
     """Core work item tracked in SQL."""
 
+    # readiness / backlog queries filter by tenant and status; graph ingest by
+    # tenant and change time
+    __table_args__ = (
+        Index("ix_task_tenant_status", "tenant_id", "status"),
+        Index("ix_task_tenant_updated", "tenant_id", "updated_at"),
+    )
+
     id: str = Field(
         default_factory=lambda: str(uuid.uuid4())[:8], 
         primary_key=True
@@ -54,6 +62,10 @@ class Task(SQLModel, table=True):
     
     # Timestamps
     created_at: dt = Field(default_factory=dt.utcnow, nullable=False)
+    # bumped on every ORM/Core UPDATE; drives incremental graph ingest
+    updated_at: dt = Field(
+        default_factory=dt.utcnow, nullable=False, sa_column_kwargs={"onupdate": dt.utcnow}
+    )
 
     # Relationships
     tenant: "Tenant" = Relationship(back_populates="tasks")
@@ -11,8 +11,8 @@ class TaskDependency(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     
     # CORRECTED: Use the original field names from the existing database
-    from_id: str = Field(foreign_key="task.id", nullable=False)
-    to_id: str = Field(foreign_key="task.id", nullable=False)
+    from_id: str = Field(foreign_key="task.id", nullable=False, index=True)
+    to_id: str = Field(foreign_key="task.id", nullable=False, index=True)
     
     # ADD: The missing dependency_type field (this requires DB migration)
     dependency_type: str = Field(max_length=50, nullable=False, default="blocks")
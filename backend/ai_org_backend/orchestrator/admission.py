@@ -0,0 +1,213 @@
+"""
+Backpressure-aware admission control per role queue.
+
+The scheduler asks :class:`AdmissionController` before sending a task to a
+``{tenant}:{role}`` Celery queue. In-flight work (sent, not yet finished) is
+tracked per tenant and role from the scheduler's own dispatches and the task
+events that follow (a finished status such as ``done``/``failed`` releases
+the slot, the periodic SQL reconcile catches everything else); the
+Celery queue length in Redis is used as a floor so work queued by an earlier
+scheduler process is not ignored. Tasks over the cap of their role are held
+back (in dispatch order) and offered again once a slot frees.
+
+Caps are per scheduler replica::
+
+    ROLE_CONCURRENCY="dev=8,qa=4,ux_ui=4"   # per role, all tenants
+    ROLE_CONCURRENCY_DEFAULT=8               # roles not listed
+    TENANT_ROLE_CONCURRENCY=0                # per tenant and role, 0 = no extra cap
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import time
+from collections import defaultdict, deque
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple
+
+from prometheus_client import Gauge, Histogram
+from sqlmodel import Session, col, select
+
+from ai_org_backend.models import Task
+from ai_org_backend.models.task import TaskStatus
+from ai_org_backend.services.redis_client import get_redis
+
+
+def _parse_caps(raw: str) -> Dict[str, int]:
+    caps: Dict[str, int] = {}
+    for part in raw.split(","):
+        role, _, n = part.partition("=")
+        if role.strip() and n.strip().isdigit():
+            caps[role.strip()] = int(n)
+    return caps
+
+
+ROLE_CAPS = _parse_caps(os.getenv("ROLE_CONCURRENCY", ""))
+DEFAULT_ROLE_CAP = int(os.getenv("ROLE_CONCURRENCY_DEFAULT", "8"))
+TENANT_ROLE_CAP = int(os.getenv("TENANT_ROLE_CONCURRENCY", "0"))
+
+DISPATCH_START_LAT = Histogram(
+    "ai_dispatch_start_latency_seconds",
+    "Time from scheduler dispatch until a worker starts the task",
+    ["role"],
+    buckets=(0.1, 0.5, 1, 2, 5, 10, 30, 60, 120, 300, 900),
+)
+INFLIGHT_GA = Gauge("ai_tasks_inflight", "Tasks dispatched and not yet finished", ["role"])
+HELD_GA = Gauge("ai_tasks_held", "Ready tasks held back by admission control", ["role"])
+
+
+def _inflight_key(tenant_id: str) -> str:
+    return f"ai_org:tenant:{tenant_id}:inflight"
+
+
+class _TenantObserver:
+    """Adapter so the controller can be registered as a ``ReadyQueue`` observer."""
+
+    def __init__(self, ctl: "AdmissionController", tenant_id: str):
+        self.ctl = ctl
+        self.tenant_id = tenant_id
+
+    def apply(self, event: Dict[str, Any]) -> None:
+        self.ctl.apply(self.tenant_id, event)
+
+    def rebuild(self, session: Session) -> None:
+        self.ctl.reconcile(self.tenant_id, session)
+
+
+class AdmissionController:
+    """In-flight counts and held-back tasks per ``(tenant, role)``."""
+
+    def __init__(
+        self,
+        role_caps: Optional[Dict[str, int]] = None,
+        default_cap: int = DEFAULT_ROLE_CAP,
+        tenant_cap: int = TENANT_ROLE_CAP,
+    ):
+        self.role_caps = dict(ROLE_CAPS if role_caps is None else role_caps)
+        self.default_cap = default_cap
+        self.tenant_cap = tenant_cap
+        # tenant → task id → (role, dispatched_at)
+        self.inflight: Dict[str, Dict[str, Tuple[str, float]]] = defaultdict(dict)
+        self.held: Dict[Tuple[str, str], Deque[Dict[str, Any]]] = defaultdict(deque)
+        self.depth: Dict[Tuple[str, str], int] = {}
+        self._loaded: set[str] = set()
+
+    # ---------- counts ----------
+    def cap(self, role: str) -> int:
+        return self.role_caps.get(role, self.default_cap)
+
+    def role_inflight(self, role: str) -> int:
+        tenants = set(self.inflight) | {t for t, _ in self.depth}
+        return sum(self.tenant_inflight(t, role) for t in tenants)
+
+    def tenant_inflight(self, tenant_id: str, role: str) -> int:
+        tracked = sum(1 for r, _ in self.inflight.get(tenant_id, {}).values() if r == role)
+        return max(tracked, self.depth.get((tenant_id, role), 0))
+
+    def has_capacity(self, tenant_id: str, role: str) -> bool:
+        if self.role_inflight(role) >= self.cap(role):
+            return False
+        return not self.tenant_cap or self.tenant_inflight(tenant_id, role) < self.tenant_cap
+
+    def refresh_depths(self, pairs: Iterable[Tuple[str, str]]) -> None:
+        """Read Celery queue lengths (``{tenant}:{role}`` lists) in one round trip."""
+        pairs = list(pairs)
+        r = get_redis()
+        if r is None or not pairs:
+            return
+        try:
+            pipe = r.pipeline(transaction=False)
+            for tenant_id, role in pairs:
+                pipe.llen(f"{tenant_id}:{role}")
+            for pair, n in zip(pairs, pipe.execute()):
+                self.depth[pair] = int(n or 0)
+        except Exception as exc:  # pragma: no cover
+            logging.getLogger(__name__).warning("Queue depth read failed: %s", exc)
+
+    # ---------- dispatch bookkeeping ----------
+    def acquire(self, tenant_id: str, role: str, task_id: str) -> None:
+        now = time.time()
+        self.inflight[tenant_id][task_id] = (role, now)
+        r = get_redis()
+        if r is not None:
+            try:
+                r.hset(_inflight_key(tenant_id), task_id, json.dumps([role, now]))
+            except Exception:  # pragma: no cover
+                pass
+
+    def release(self, tenant_id: str, task_id: str) -> None:
+        if self.inflight.get(tenant_id, {}).pop(task_id, None) is None:
+            return
+        r = get_redis()
+        if r is not None:
+            try:
+                r.hdel(_inflight_key(tenant_id), task_id)
+            except Exception:  # pragma: no cover
+                pass
+
+    def hold(self, tenant_id: str, role: str, rec: Dict[str, Any]) -> None:
+        self.held[(tenant_id, role)].append(rec)
+
+    def take_held(self) -> List[Tuple[str, Dict[str, Any], str]]:
+        """Remove and return all held ``(tenant, task, role)`` in hold order."""
+        out = [(t, rec, role) for (t, role), q in self.held.items() for rec in q]
+        self.held.clear()
+        return out
+
+    def discard_tenant(self, tenant_id: str) -> None:
+        self.inflight.pop(tenant_id, None)
+        self._loaded.discard(tenant_id)
+        for key in [k for k in self.held if k[0] == tenant_id]:
+            del self.held[key]
+        for key in [k for k in self.depth if k[0] == tenant_id]:
+            del self.depth[key]
+
+    def export(self) -> None:
+        roles = {r for recs in self.inflight.values() for r, _ in recs.values()}
+        roles |= {r for _, r in self.held} | set(self.role_caps)
+        for role in roles:
+            INFLIGHT_GA.labels(role).set(self.role_inflight(role))
+            HELD_GA.labels(role).set(sum(len(q) for (_, r), q in self.held.items() if r == role))
+
+    # ---------- task events ----------
+    def observer(self, tenant_id: str) -> _TenantObserver:
+        return _TenantObserver(self, tenant_id)
+
+    def apply(self, tenant_id: str, event: Dict[str, Any]) -> None:
+        kind = event.get("type")
+        if kind == "start":
+            rec = self.inflight.get(tenant_id, {}).get(event["id"])
+            if rec:
+                started = event.get("ts", time.time())
+                DISPATCH_START_LAT.labels(rec[0]).observe(max(started - rec[1], 0.0))
+        elif kind == "task" and event.get("status") not in (TaskStatus.DOING, TaskStatus.TODO):
+            # todo events may predate the dispatch; reconcile catches real resets
+            self.release(tenant_id, event["id"])
+
+    def reconcile(self, tenant_id: str, session: Session) -> None:
+        """Restore persisted in-flight entries and drop tasks no longer running."""
+        if tenant_id not in self._loaded:
+            r = get_redis()
+            if r is not None:
+                try:
+                    for task_id, raw in r.hgetall(_inflight_key(tenant_id)).items():
+                        task_id = task_id.decode() if isinstance(task_id, bytes) else task_id
+                        role, ts = json.loads(raw)
+                        self.inflight[tenant_id].setdefault(task_id, (role, ts))
+                except Exception as exc:  # pragma: no cover
+                    logging.getLogger(__name__).warning("In-flight restore failed: %s", exc)
+            self._loaded.add(tenant_id)
+        ids = list(self.inflight.get(tenant_id, {}))
+        if not ids:
+            return
+        running = set(
+            session.exec(
+                select(Task.id).where(col(Task.id).in_(ids), Task.status == TaskStatus.DOING)
+            ).all()
+        )
+        for task_id in ids:
+            if task_id not in running:
+                self.release(tenant_id, task_id)
+
+
+__all__ = ["AdmissionController", "DISPATCH_START_LAT"]
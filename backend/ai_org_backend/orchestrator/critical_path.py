@@ -0,0 +1,235 @@
+"""
+Incremental critical-path and blocked-task engine.
+
+Replaces the ``CRIT_Q`` / ``BLOCKED_Q`` Neo4j scans. The dependency graph is
+loaded once via ``_build_graph``; afterwards the engine is fed the same task
+and edge events as the scheduler's :class:`ReadyQueue` and only recomputes the
+nodes an event can affect:
+
+* ``up[n]``   – longest chain (in edges) of open tasks ending in ``n``
+* ``down[n]`` – longest chain of open tasks starting in ``n``
+
+Both are computed by DP in topological order: a full load sorts the whole
+graph once, an event sorts only the cone it can affect (descendants for
+``up``, ancestors for ``down``) and recomputes the nodes whose inputs changed.
+A dependency cycle makes the sort fail and disables the critical path until
+the next rebuild. The critical path length is ``max(up)``, read from a
+histogram in O(distinct lengths); a task's slack is
+``critical - (up[n] + down[n])``.
+"""
+from __future__ import annotations
+
+import logging
+from collections import Counter, deque
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+from networkx import DiGraph, NetworkXUnfeasible, topological_sort
+
+from ai_org_backend.models.task import TaskStatus
+from ai_org_backend.orchestrator.ready_queue import is_gating
+
+# finished tasks drop out of the remaining critical path
+CLOSED = {TaskStatus.DONE, TaskStatus.CANCELLED, TaskStatus.SKIPPED}
+
+
+class CriticalPathEngine:
+    """Per-tenant longest-path / blocked-count index."""
+
+    def __init__(self, tenant_id: str):
+        self.tenant_id = tenant_id
+        self.g = DiGraph()
+        self.up: Dict[str, int] = {}
+        self.down: Dict[str, int] = {}
+        self._hist: Counter[int] = Counter()
+        self.blocked: Set[str] = set()
+        self.dirty = True  # metrics changed since last export
+        self._broken = False  # cycle detected → no critical path
+
+    # ---------- helpers ----------
+    def _status(self, n: str) -> str:
+        return self.g.nodes[n].get("status", TaskStatus.TODO)
+
+    def _open(self, n: str) -> bool:
+        return n in self.g and self._status(n) not in CLOSED
+
+    def _calc_up(self, n: str) -> int:
+        if not self._open(n):
+            return -1
+        return max(
+            (self.up.get(p, -1) + 1 for p in self.g.predecessors(n) if self._open(p)), default=0
+        )
+
+    def _calc_down(self, n: str) -> int:
+        if not self._open(n):
+            return -1
+        return max(
+            (self.down.get(s, -1) + 1 for s in self.g.successors(n) if self._open(s)), default=0
+        )
+
+    def _set_up(self, n: str, v: int) -> None:
+        old = self.up.get(n, -1)
+        if old >= 0:
+            self._hist[old] -= 1
+            if not self._hist[old]:
+                del self._hist[old]
+        if v >= 0:
+            self._hist[v] += 1
+        self.up[n] = v
+
+    def _cone(self, seeds: List[str], nxt: Callable[[str], Iterable[str]]) -> Set[str]:
+        """*seeds* plus everything reachable from them via *nxt*."""
+        seen = set(seeds)
+        work = deque(seeds)
+        while work:
+            for m in nxt(work.popleft()):
+                if m not in seen:
+                    seen.add(m)
+                    work.append(m)
+        return seen
+
+    def _cycle(self) -> None:
+        logging.getLogger(__name__).warning(
+            "Dependency cycle in tenant %s; critical path disabled", self.tenant_id
+        )
+        self._broken = True
+
+    def _recompute(self, order: List[str], seeds: Iterable[str]) -> None:
+        """Recompute ``up`` along topological *order* and ``down`` against it.
+
+        Only seeds and nodes next to a changed value are recomputed.
+        """
+        todo = set(seeds)
+        for n in order:
+            if n in todo:
+                v = self._calc_up(n)
+                if v != self.up.get(n):
+                    self._set_up(n, v)
+                    todo.update(self.g.successors(n))
+        todo = set(seeds)
+        for n in reversed(order):
+            if n in todo:
+                v = self._calc_down(n)
+                if v != self.down.get(n):
+                    self.down[n] = v
+                    todo.update(self.g.predecessors(n))
+        self.dirty = True
+
+    def _propagate(self, seeds: Iterable[str]) -> None:
+        """Recompute ``up`` downstream and ``down`` upstream of *seeds*."""
+        if self._broken:
+            return
+        roots = [n for n in seeds if n in self.g]
+        cone = self._cone(roots, self.g.successors) | self._cone(roots, self.g.predecessors)
+        try:
+            order = list(topological_sort(self.g.subgraph(cone)))
+        except NetworkXUnfeasible:
+            self._cycle()
+            return
+        self._recompute(order, roots)
+
+    def _refresh_blocked(self, n: str) -> None:
+        # same rule as ReadyQueue: any gating predecessor not ``done`` blocks
+        gating_open = any(
+            self._status(p) != TaskStatus.DONE
+            for p in self.g.predecessors(n)
+            if is_gating(self.g.edges[p, n].get("kind"))
+        )
+        if n in self.g and self._status(n) == TaskStatus.TODO and gating_open:
+            if n not in self.blocked:
+                self.blocked.add(n)
+                self.dirty = True
+        elif n in self.blocked:
+            self.blocked.discard(n)
+            self.dirty = True
+
+    # ---------- loading ----------
+    def load_graph(self, g: DiGraph) -> None:
+        """Full DP over *g* (nodes carry ``obj`` = Task, as built by ``_build_graph``)."""
+        self.g = DiGraph()
+        for n, data in g.nodes(data=True):
+            obj = data.get("obj")
+            status = obj.status if obj is not None else data.get("status", TaskStatus.TODO)
+            status = getattr(status, "value", status)
+            self.g.add_node(n, status=status)
+        for a, b, data in g.edges(data=True):
+            self.g.add_edge(a, b, kind=data.get("kind"))
+        self.up.clear()
+        self.down.clear()
+        self._hist.clear()
+        self.blocked.clear()
+        self._broken = False
+        try:
+            order = list(topological_sort(self.g))
+        except NetworkXUnfeasible:
+            self._cycle()
+        else:
+            self._recompute(order, order)
+        for n in self.g.nodes:
+            self._refresh_blocked(n)
+        self.dirty = True
+
+    def rebuild(self, session: Any) -> None:
+        from ai_org_backend.orchestrator.graph_orchestrator import _build_graph
+
+        self.load_graph(_build_graph(session, self.tenant_id))
+
+    # ---------- events ----------
+    def apply(self, event: Dict[str, Any]) -> None:
+        kind = event.get("type")
+        if kind == "task":
+            n = event["id"]
+            if n in self.g and self._status(n) == event.get("status"):
+                return
+            self.g.add_node(n, status=event.get("status", TaskStatus.TODO))
+            self._propagate([n])
+            self._refresh_blocked(n)
+            for s in self.g.successors(n):
+                self._refresh_blocked(s)
+        elif kind == "edge":
+            a, b = event["from"], event["to"]
+            if self.g.has_edge(a, b):
+                return
+            for n in (a, b):
+                if n not in self.g:
+                    # placeholder until its task event arrives (treated as resolved)
+                    self.g.add_node(n, status=TaskStatus.DONE)
+            self.g.add_edge(a, b, kind=event.get("kind"))
+            self._propagate([a, b])
+            self._refresh_blocked(b)
+
+    # ---------- queries ----------
+    def critical_length(self) -> int:
+        """Edges on the longest chain of open tasks (``CRIT_Q``'s ``l``)."""
+        if self._broken or not self._hist:
+            return 0
+        return max(self._hist)
+
+    def critical_path(self) -> List[str]:
+        """Task ids along one critical path, in dependency order."""
+        length = self.critical_length()
+        if not length:
+            return []
+        n: Optional[str] = next(
+            (x for x, v in self.up.items() if v == 0 and self.down.get(x, -1) == length), None
+        )
+        path = []
+        while n is not None:
+            path.append(n)
+            rest = self.down[n] - 1
+            n = next(
+                (s for s in self.g.successors(n) if self._open(s) and self.down.get(s) == rest),
+                None,
+            )
+        return path
+
+    def slack(self, n: str) -> int:
+        """How many edges task *n* could slip without extending the critical path."""
+        if not self._open(n) or self._broken:
+            return 0
+        return max(self.critical_length() - (self.up.get(n, 0) + self.down.get(n, 0)), 0)
+
+    def blocked_count(self) -> int:
+        return len(self.blocked)
+
+
+__all__ = ["CriticalPathEngine"]
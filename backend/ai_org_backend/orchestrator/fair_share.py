@@ -0,0 +1,110 @@
+"""
+Weighted fair queuing of ready tasks across tenants.
+
+Start-time fair queuing: every tenant carries a virtual finish tag. The next
+task dispatched is the head of the tenant with the smallest
+``max(V, finish[tenant]) + cost / weight``. Weights grow with the tenant's
+remaining budget (log-damped so large accounts cannot monopolise the
+scheduler) and with the task's ``business_value``. Idle tenants are clamped to
+the current virtual time, so they cannot hoard credit, and a tenant with
+backlog is always served eventually.
+
+Inside one tenant's backlog tasks are FIFO unless a ``priority`` callable is
+given; then each drain serves the tenant's highest-priority task first.
+"""
+from __future__ import annotations
+
+import heapq
+import math
+import time
+from collections import defaultdict, deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+MIN_WEIGHT = 0.05
+
+
+def tenant_weight(budget_left: float, business_value: float) -> float:
+    """Share weight for one task of a tenant."""
+    return max(math.log1p(max(budget_left, 0.0)) * max(business_value, 0.1), MIN_WEIGHT)
+
+
+def task_cost(rec: Dict[str, Any]) -> float:
+    """Service units of a task (1 per dispatch plus planned kilo-tokens)."""
+    return 1.0 + (rec.get("tokens_plan") or 0) / 1000.0
+
+
+# (tenant_id, task, seconds waiting) -> score, higher is served first
+PriorityFn = Callable[[str, Dict[str, Any], float], float]
+
+
+class FairQueue:
+    """Per-tenant backlogs drained in weighted-fair order."""
+
+    def __init__(self, priority: Optional[PriorityFn] = None) -> None:
+        self.vtime = 0.0
+        self.finish: Dict[str, float] = {}
+        self.backlog: Dict[str, Deque[Dict[str, Any]]] = defaultdict(deque)
+        self.budgets: Dict[str, float] = {}
+        self.priority = priority
+        self._queued: Dict[Tuple[str, str], float] = {}  # → enqueue time
+
+    def push(self, tenant_id: str, rec: Dict[str, Any]) -> None:
+        key = (tenant_id, rec["id"])
+        if key in self._queued:
+            return
+        self._queued[key] = time.time()
+        self.backlog[tenant_id].append(rec)
+
+    def set_budget(self, tenant_id: str, budget_left: float) -> None:
+        self.budgets[tenant_id] = budget_left
+
+    def discard_tenant(self, tenant_id: str) -> None:
+        for rec in self.backlog.pop(tenant_id, ()):
+            self._queued.pop((tenant_id, rec["id"]), None)
+        self.finish.pop(tenant_id, None)
+        self.budgets.pop(tenant_id, None)
+
+    def _tag(self, tenant_id: str) -> Tuple[float, float]:
+        rec = self.backlog[tenant_id][0]
+        start = max(self.vtime, self.finish.get(tenant_id, 0.0))
+        w = tenant_weight(self.budgets.get(tenant_id, 0.0), rec.get("business_value") or 0.0)
+        return start, start + task_cost(rec) / w
+
+    def _prioritise(self, priority: PriorityFn) -> None:
+        now = time.time()
+        for tenant_id, q in self.backlog.items():
+            if len(q) > 1:
+                scored = []
+                for i, rec in enumerate(q):
+                    waited = now - self._queued.get((tenant_id, rec["id"]), now)
+                    scored.append((priority(tenant_id, rec, waited), i, rec))
+                scored.sort(key=lambda x: (-x[0], x[1]))  # stable for equal scores
+                self.backlog[tenant_id] = deque(rec for _, _, rec in scored)
+
+    def drain(self, limit: Optional[int] = None) -> List[Tuple[str, Dict[str, Any]]]:
+        """Pop up to *limit* ``(tenant_id, task)`` pairs in fair order."""
+        if self.priority is not None:
+            self._prioritise(self.priority)
+        heap: List[Tuple[float, float, str]] = []
+        for tenant_id, q in self.backlog.items():
+            if q:
+                start, fin = self._tag(tenant_id)
+                heapq.heappush(heap, (fin, start, tenant_id))
+        out: List[Tuple[str, Dict[str, Any]]] = []
+        while heap and (limit is None or len(out) < limit):
+            fin, start, tenant_id = heapq.heappop(heap)
+            rec = self.backlog[tenant_id].popleft()
+            self._queued.pop((tenant_id, rec["id"]), None)
+            self.vtime = start
+            self.finish[tenant_id] = fin
+            out.append((tenant_id, rec))
+            if self.backlog[tenant_id]:
+                start, fin = self._tag(tenant_id)
+                heapq.heappush(heap, (fin, start, tenant_id))
+        return out
+
+    def __len__(self) -> int:
+        return len(self._queued)
+
+
+__all__ = ["FairQueue", "PriorityFn", "task_cost", "tenant_weight"]
@@ -197,7 +197,7 @@ def seed_if_empty(purpose_name: str = PURPOSE) -> None:
     if blueprint_id:
         register_artefact(blueprint_id, blueprint.encode("utf-8"), filename="blueprints/architecture_blueprint.md")
         repo.update(blueprint_id, status="done", owner="Architect")
-    from ai_org_backend.scripts.seed_graph import ingest
+    from ai_org_backend.services.graph_ingest import ingest
     ingest(TENANT)
     print(
         f"[SEED] Seeding completed: added {len(tasks)} tasks for purpose '{purpose.name}'."
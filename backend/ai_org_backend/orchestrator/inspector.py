@@ -1,7 +1,11 @@
 from __future__ import annotations
 
+from collections import defaultdict
+from typing import Dict, Iterable, Optional
+
 from prometheus_client import Counter, Gauge
-from sqlmodel import Session, select
+from sqlalchemy import func
+from sqlmodel import Session, col, select
 
 from ai_org_backend.db import engine
 from ai_org_backend.main import DEFAULT_BUDGET, pool
@@ -29,6 +33,11 @@ PROM_TASK_FAILED = Counter(
     "Number of tasks that failed",
     ["tenant"]
 )
+PROM_TASKS_BY_STATUS = Gauge(
+    "ai_tasks_by_status",
+    "Number of tasks per status",
+    ["tenant", "status"],
+)
 insights_generated_total = Counter(
     "ai_insights_total",
     "Insights generated",
@@ -37,15 +46,46 @@ insights_generated_total = Counter(
 
 def todo_count(tenant: str) -> int:
     with Session(engine) as s:
-        return (
-            s.exec(select(Task).where(Task.tenant_id == tenant, Task.status == TaskStatus.TODO))
-        ).count()
+        return s.exec(
+            select(func.count())
+            .select_from(Task)
+            .where(Task.tenant_id == tenant, Task.status == TaskStatus.TODO)
+        ).one()
+
+
+def status_counts(tenants: Optional[Iterable[str]] = None) -> Dict[str, Dict[str, int]]:
+    """``{tenant: {status: n}}`` for all (or the given) tenants in one GROUP BY."""
+    q = select(Task.tenant_id, Task.status, func.count()).group_by(Task.tenant_id, Task.status)
+    if tenants is not None:
+        q = q.where(col(Task.tenant_id).in_(list(tenants)))
+    out: Dict[str, Dict[str, int]] = defaultdict(dict)
+    with Session(engine) as s:
+        for tenant, status, n in s.exec(q):
+            out[tenant][str(status)] = n
+    return out
+
+
+def export_status_counts(counts: Dict[str, Dict[str, int]], tenants: Iterable[str]) -> None:
+    """Set ``ai_tasks_by_status`` for every tenant/status (0 for empty statuses)."""
+    for tenant in tenants:
+        per = counts.get(tenant, {})
+        for status in {s.value for s in TaskStatus} | set(per):
+            PROM_TASKS_BY_STATUS.labels(tenant, status).set(per.get(status, 0))
 
 
 def budget_left(tenant: str) -> float:
     return float(pool.hget("budget", tenant) or DEFAULT_BUDGET)
 
 
+def budgets_left(tenants: Iterable[str]) -> Dict[str, float]:
+    """Budget of many tenants in one Redis round trip (HMGET)."""
+    tenants = list(tenants)
+    if not tenants:
+        return {}
+    vals = pool.hmget("budget", tenants)
+    return {t: float(v or DEFAULT_BUDGET) for t, v in zip(tenants, vals)}
+
+
 def alert(msg: str, kind: str = "orch") -> None:
     print(f"⚠️  [{kind.upper()}] {msg}")
     PROM_ALERT_CNT.labels(kind).inc()
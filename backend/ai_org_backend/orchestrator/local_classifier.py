@@ -0,0 +1,249 @@
+"""
+Offline role classifier for task routing.
+
+Nearest-centroid model over hashed word uni/bi-gram and character trigram
+features, trained on historical routing decisions (``Task.owner`` written by
+the agent that processed the task). Prediction is a handful of sparse dot
+products and runs in microseconds on CPU; ``router.classify_role`` only falls
+back to the LLM when the model's confidence is below ``LOCAL_CONFIDENCE``.
+
+CLI::
+
+    python -m ai_org_backend.orchestrator.local_classifier retrain
+    python -m ai_org_backend.orchestrator.local_classifier report
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import os
+import re
+import time
+import zlib
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlmodel import Session, col, select
+
+from ai_org_backend.db import engine
+from ai_org_backend.models import Task
+
+MODEL_PATH = Path(os.getenv("ROLE_MODEL_PATH", str(Path.cwd() / "role_classifier.json")))
+LOCAL_CONFIDENCE = float(os.getenv("ROLE_LOCAL_CONFIDENCE", "0.8"))
+N_FEATURES = 1 << 16
+# softmax temperature over cosine similarities
+TEMPERATURE = 0.05
+HOLDOUT_BUCKETS = 5  # every 5th description (by hash) is held out
+
+# Task.owner values written by the agents → routing role
+OWNER_ROLES = {
+    "dev": "dev",
+    "qa": "qa",
+    "ux/ui": "ux_ui",
+    "ux_ui": "ux_ui",
+    "telemetry": "telemetry",
+    "repo": "repo",
+}
+
+_TOKEN_RX = re.compile(r"[a-z0-9_]+")
+Vector = Dict[int, float]
+
+
+def _h(s: str) -> int:
+    return zlib.crc32(s.encode("utf-8")) % N_FEATURES
+
+
+def featurize(text: str) -> Vector:
+    """L2-normalised sparse vector of hashed n-gram counts."""
+    text = " ".join((text or "").lower().split())
+    words = _TOKEN_RX.findall(text)
+    feats: Dict[int, float] = defaultdict(float)
+    for w in words:
+        feats[_h("w:" + w)] += 1
+    for a, b in zip(words, words[1:]):
+        feats[_h(f"b:{a} {b}")] += 1
+    padded = f" {text} "
+    for i in range(len(padded) - 2):
+        feats[_h("c:" + padded[i: i + 3])] += 0.5
+    norm = math.sqrt(sum(v * v for v in feats.values())) or 1.0
+    return {k: v / norm for k, v in feats.items()}
+
+
+class LocalRoleClassifier:
+    """Nearest-centroid classifier with softmax confidence."""
+
+    def __init__(self, centroids: Dict[str, Vector], trained_on: int = 0):
+        self.centroids = centroids
+        self.trained_on = trained_on
+
+    @classmethod
+    def train(cls, samples: Iterable[Tuple[str, str]]) -> "LocalRoleClassifier":
+        sums: Dict[str, Dict[int, float]] = defaultdict(lambda: defaultdict(float))
+        n = 0
+        for desc, role in samples:
+            for k, v in featurize(desc).items():
+                sums[role][k] += v
+            n += 1
+        centroids: Dict[str, Vector] = {}
+        for role, vec in sums.items():
+            norm = math.sqrt(sum(v * v for v in vec.values())) or 1.0
+            centroids[role] = {k: v / norm for k, v in vec.items()}
+        return cls(centroids, trained_on=n)
+
+    def scores(self, desc: str) -> Dict[str, float]:
+        x = featurize(desc)
+        return {
+            role: sum(v * c.get(k, 0.0) for k, v in x.items())
+            for role, c in self.centroids.items()
+        }
+
+    def predict(self, desc: str) -> Tuple[Optional[str], float]:
+        """Return ``(role, confidence)``; ``(None, 0.0)`` for an empty model."""
+        sims = self.scores(desc)
+        if not sims:
+            return None, 0.0
+        top = max(sims.values())
+        exp = {r: math.exp((s - top) / TEMPERATURE) for r, s in sims.items()}
+        best = max(exp, key=exp.__getitem__)
+        return best, exp[best] / sum(exp.values())
+
+    # ---------- persistence ----------
+    def save(self, path: Path = MODEL_PATH) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = {
+            "n_features": N_FEATURES,
+            "trained_on": self.trained_on,
+            "centroids": {
+                r: {str(k): round(v, 6) for k, v in c.items()} for r, c in self.centroids.items()
+            },
+        }
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(data), encoding="utf-8")
+        tmp.replace(path)
+
+    @classmethod
+    def load(cls, path: Path = MODEL_PATH) -> Optional["LocalRoleClassifier"]:
+        if not path.exists():
+            return None
+        data = json.loads(path.read_text(encoding="utf-8"))
+        if data.get("n_features") != N_FEATURES:
+            return None  # hashed with a different feature space
+        centroids = {r: {int(k): v for k, v in c.items()} for r, c in data["centroids"].items()}
+        return cls(centroids, trained_on=data.get("trained_on", 0))
+
+
+_model: Optional[LocalRoleClassifier] = None
+_model_mtime = 0.0
+
+
+def get_model() -> Optional[LocalRoleClassifier]:
+    """Return the persisted model, reloading it after a retrain."""
+    global _model, _model_mtime
+    try:
+        mtime = MODEL_PATH.stat().st_mtime
+    except OSError:
+        return None
+    if _model is None or mtime != _model_mtime:
+        _model = LocalRoleClassifier.load(MODEL_PATH)
+        _model_mtime = mtime
+    return _model
+
+
+# ---------- training data / evaluation ----------
+def load_history(
+    session: Session, allowed_roles: Optional[Sequence[str]] = None
+) -> List[Tuple[str, str]]:
+    """``(description, role)`` pairs from tasks an agent has processed."""
+    rows = session.exec(
+        select(Task.description, Task.owner).where(col(Task.owner).is_not(None))
+    ).all()
+    out = []
+    for desc, owner in rows:
+        role = OWNER_ROLES.get(str(owner).strip().lower())
+        if role and desc and (allowed_roles is None or role in allowed_roles):
+            out.append((desc, role))
+    return out
+
+
+def split_holdout(
+    samples: Sequence[Tuple[str, str]],
+) -> Tuple[List[Tuple[str, str]], List[Tuple[str, str]]]:
+    """Deterministic split by description hash (stable across retrains)."""
+    train: List[Tuple[str, str]] = []
+    test: List[Tuple[str, str]] = []
+    for s in samples:
+        (test if zlib.crc32(s[0].encode("utf-8")) % HOLDOUT_BUCKETS == 0 else train).append(s)
+    return train, test
+
+
+def evaluate(
+    model: LocalRoleClassifier,
+    samples: Sequence[Tuple[str, str]],
+    threshold: float = LOCAL_CONFIDENCE,
+) -> Dict[str, float]:
+    """Accuracy, confident coverage and per-prediction latency on *samples*."""
+    if not samples:
+        return {"n": 0}
+    correct = confident = confident_correct = 0
+    lat: List[float] = []
+    for desc, role in samples:
+        t0 = time.perf_counter()
+        pred, conf = model.predict(desc)
+        lat.append((time.perf_counter() - t0) * 1e6)
+        correct += pred == role
+        if conf >= threshold:
+            confident += 1
+            confident_correct += pred == role
+    lat.sort()
+    n = len(samples)
+    return {
+        "n": n,
+        "accuracy": correct / n,
+        "coverage": confident / n,  # share answered without LLM
+        "confident_accuracy": confident_correct / confident if confident else 0.0,
+        "latency_p50_us": lat[n // 2],
+        "latency_p99_us": lat[min(n - 1, int(n * 0.99))],
+    }
+
+
+def _print_report(title: str, rep: Dict[str, float]) -> None:
+    if not rep.get("n"):
+        print(f"{title}: no held-out samples")
+        return
+    print(
+        f"{title}: n={rep['n']} accuracy={rep['accuracy']:.3f} "
+        f"coverage@{LOCAL_CONFIDENCE:.2f}={rep['coverage']:.3f} "
+        f"confident_accuracy={rep['confident_accuracy']:.3f} "
+        f"p50={rep['latency_p50_us']:.1f}µs p99={rep['latency_p99_us']:.1f}µs"
+    )
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Train / evaluate the local role classifier")
+    ap.add_argument("command", choices=["retrain", "report"])
+    ap.add_argument("--out", default=str(MODEL_PATH), help="model file")
+    ns = ap.parse_args()
+
+    with Session(engine) as db:
+        history = load_history(db)
+    train_set, test_set = split_holdout(history)
+    print(
+        f"History: {len(history)} routed tasks "
+        f"({len(train_set)} train / {len(test_set)} held out)"
+    )
+    # the shipped model sees all history, so accuracy is measured on a model
+    # trained without the held-out split
+    _print_report("held-out", evaluate(LocalRoleClassifier.train(train_set), test_set))
+    if ns.command == "retrain":
+        final = LocalRoleClassifier.train(history)
+        final.save(Path(ns.out))
+        print(f"✅  Saved model ({len(final.centroids)} roles) to {ns.out}")
+    else:
+        current = LocalRoleClassifier.load(Path(ns.out))
+        if current is None:
+            raise SystemExit(f"No model at {ns.out}; run 'retrain' first")
+        _print_report(
+            f"shipped model (in-sample, {current.trained_on} tasks)", evaluate(current, history)
+        )
@@ -0,0 +1,46 @@
+"""
+Dispatch priority for ready tasks.
+
+Within a tenant, ready tasks are ordered by value density
+
+    business_value * purpose_relevance / kilo-tokens planned
+
+boosted for tasks on (or close to) the critical path. Aging is additive:
+every ``AGING_S`` seconds of waiting adds ``AGING_WEIGHT`` to the score, so
+even a task of value 0 overtakes fresh work of score ``S`` after waiting
+``S * AGING_S / AGING_WEIGHT`` and cannot starve behind a stream of better
+tasks. Because the scheduler admits tasks against the
+remaining budget in this order and skips the ones that no longer fit, the
+budget is filled greedily by value per dollar.
+"""
+from __future__ import annotations
+
+import os
+from typing import Any, Dict
+
+# purpose_relevance defaults to 0.0 for tasks the planner did not score
+RELEVANCE_FLOOR = 0.1
+# tasks without a token plan are costed like a small task
+MIN_TOKENS = 200
+# slack 0 (critical) multiplies the score by 1 + CRIT_BOOST
+CRIT_BOOST = float(os.getenv("PRIORITY_CRIT_BOOST", "1.0"))
+# every AGING_S seconds of waiting adds AGING_WEIGHT to the score
+AGING_S = float(os.getenv("PRIORITY_AGING_S", "300"))
+AGING_WEIGHT = float(os.getenv("PRIORITY_AGING_WEIGHT", "1.0"))
+
+
+def value_density(rec: Dict[str, Any]) -> float:
+    """Expected value per 1000 planned tokens."""
+    relevance = max(rec.get("purpose_relevance") or 0.0, RELEVANCE_FLOOR)
+    value = (rec.get("business_value") or 0.0) * relevance
+    return value * 1000.0 / max(rec.get("tokens_plan") or 0, MIN_TOKENS)
+
+
+def priority_score(rec: Dict[str, Any], slack: int = 0, waited_s: float = 0.0) -> float:
+    """Higher runs first. *slack* in edges (0 = critical), *waited_s* since ready."""
+    crit = 1.0 + CRIT_BOOST / (1.0 + max(slack, 0))
+    aging = max(waited_s, 0.0) / AGING_S * AGING_WEIGHT if AGING_S > 0 else 0.0
+    return value_density(rec) * crit + aging
+
+
+__all__ = ["priority_score", "value_density"]
@@ -0,0 +1,350 @@
+"""
+Event-driven ready queue for the scheduler.
+
+Instead of polling Neo4j with ``LEAF_Q`` the scheduler keeps, per task, the
+number of unresolved FINISH_START predecessors in memory. ``Repo`` publishes
+task events (status changes, new tasks, new edges) to a per-tenant Redis list;
+the scheduler drains those events every tick and only touches the tasks that
+actually changed. A task becomes ready the moment its last gating predecessor
+reports ``done``.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from datetime import datetime, timedelta
+from typing import Any, Deque, Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import exists, func
+from sqlalchemy.orm import aliased
+from sqlmodel import Session, col, select
+
+from ai_org_backend.models import Task, TaskDependency
+from ai_org_backend.models.task import TaskStatus
+from ai_org_backend.services.redis_client import get_redis
+
+# "blocks" is the SQL column default for TaskDependency.dependency_type and is
+# treated like FINISH_START (same as a missing r.kind in LEAF_Q).
+GATING_KINDS = {"FINISH_START", "BLOCKS"}
+# Full rebuild from SQL as safety net for writes that bypass Repo.
+RECONCILE_INTERVAL_S = float(os.getenv("READY_QUEUE_RECONCILE_S", "300"))
+# Overlap for the created_at watermark scan (clock skew / late commits).
+WATERMARK_SLACK = timedelta(seconds=5)
+DRAIN_BATCH = 1000
+
+_mem_lock = threading.Condition()
+_MEM_EVENTS: Dict[str, Deque[str]] = defaultdict(deque)
+
+
+def _events_key(tenant_id: str) -> str:
+    return f"ai_org:tenant:{tenant_id}:task_events"
+
+
+def is_gating(kind: Optional[str]) -> bool:
+    return (kind or "FINISH_START").strip().upper() in GATING_KINDS
+
+
+def task_snapshot(task: Task) -> Dict[str, Any]:
+    """Return the fields the scheduler needs to dispatch *task*."""
+    return {
+        "id": task.id,
+        "status": str(task.status),
+        "description": task.description,
+        "tokens_plan": task.tokens_plan or 0,
+        "business_value": task.business_value,
+        "purpose_relevance": task.purpose_relevance,
+    }
+
+
+# ---------- SQL readiness ----------
+def unresolved_exists(task_id_col: Any) -> Any:
+    """EXISTS clause: *task_id_col* has a gating predecessor that is not done.
+
+    Served by ``ix_taskdependency_to_id`` plus the predecessor's primary key.
+    """
+    pred = aliased(Task)
+    return exists().where(
+        TaskDependency.to_id == task_id_col,
+        col(pred.id) == col(TaskDependency.from_id),
+        col(pred.status) != TaskStatus.DONE,
+        func.upper(func.coalesce(TaskDependency.dependency_type, "FINISH_START")).in_(GATING_KINDS),
+    )
+
+
+def ready_tasks(
+    session: Session, tenant_id: str, limit: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """Snapshots of every ready task of *tenant_id* in one anti-join query.
+
+    SQL is authoritative; this is the set-based equivalent of ``LEAF_Q`` (and
+    of the in-memory ``ReadyQueue``). The outer scan uses
+    ``ix_task_tenant_status``.
+    """
+    stmt = (
+        select(  # type: ignore[call-overload]  # sqlmodel types at most 4 columns
+            Task.id,
+            Task.status,
+            Task.description,
+            Task.tokens_plan,
+            Task.business_value,
+            Task.purpose_relevance,
+        )
+        .where(
+            Task.tenant_id == tenant_id,
+            Task.status == TaskStatus.TODO,
+            ~unresolved_exists(Task.id),
+        )
+        .order_by(Task.created_at)
+    )
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    return [
+        {
+            "id": r.id,
+            "status": str(r.status),
+            "description": r.description,
+            "tokens_plan": r.tokens_plan or 0,
+            "business_value": r.business_value,
+            "purpose_relevance": r.purpose_relevance,
+        }
+        for r in session.exec(stmt)
+    ]
+
+
+# ---------- event bus ----------
+def publish_event(tenant_id: str, event: Dict[str, Any]) -> None:
+    """Append *event* to the tenant's task event list (Redis or in-memory)."""
+    payload = json.dumps(event)
+    r = get_redis()
+    if r is not None:
+        try:
+            r.rpush(_events_key(tenant_id), payload)
+            return
+        except Exception as exc:  # pragma: no cover - fall back to memory
+            logging.getLogger(__name__).warning("Task event publish failed: %s", exc)
+    with _mem_lock:
+        _MEM_EVENTS[tenant_id].append(payload)
+        _mem_lock.notify_all()
+
+
+def publish_task(task: Task) -> None:
+    publish_event(task.tenant_id, {"type": "task", **task_snapshot(task)})
+
+
+def publish_edge(tenant_id: str, from_id: str, to_id: str, kind: Optional[str]) -> None:
+    publish_event(tenant_id, {"type": "edge", "from": from_id, "to": to_id, "kind": kind})
+
+
+def drain_events(tenant_id: str, limit: int = DRAIN_BATCH) -> List[Dict[str, Any]]:
+    """Pop up to *limit* pending events for *tenant_id*."""
+    raw: List[str] = []
+    r = get_redis()
+    if r is not None:
+        try:
+            pipe = r.pipeline()  # MULTI/EXEC → read + trim is atomic
+            pipe.lrange(_events_key(tenant_id), 0, limit - 1)
+            pipe.ltrim(_events_key(tenant_id), limit, -1)
+            raw, _ = pipe.execute()
+        except Exception as exc:  # pragma: no cover
+            logging.getLogger(__name__).warning("Task event drain failed: %s", exc)
+    with _mem_lock:
+        q = _MEM_EVENTS.get(tenant_id)
+        while q and len(raw) < limit:
+            raw.append(q.popleft())
+    return [json.loads(x) for x in raw]
+
+
+def wait_for_events(tenant_ids: Iterable[str], timeout: float) -> List[tuple[str, Dict[str, Any]]]:
+    """Block up to *timeout* seconds until any tenant has a new event.
+
+    Returns the ``(tenant_id, event)`` pairs consumed while waiting so the
+    caller can apply them; remaining events are left for :func:`drain_events`.
+    """
+    tenant_ids = list(tenant_ids)
+    if not tenant_ids:
+        time.sleep(timeout)
+        return []
+    r = get_redis()
+    if r is not None:
+        try:
+            keys = {_events_key(t): t for t in tenant_ids}
+            res = r.blpop(list(keys), timeout=max(1, int(timeout)))
+            if not res:
+                return []
+            key, payload = res
+            return [(keys[key], json.loads(payload))]
+        except Exception as exc:  # pragma: no cover
+            logging.getLogger(__name__).warning("Task event wait failed: %s", exc)
+    with _mem_lock:
+        if not any(_MEM_EVENTS.get(t) for t in tenant_ids):
+            _mem_lock.wait(timeout)
+    return []
+
+
+# ---------- ready queue ----------
+class ReadyQueue:
+    """In-memory readiness index for one tenant.
+
+    ``pending[t]`` counts gating predecessors of ``t`` that are known and not
+    ``done``. Unknown predecessors count as resolved, matching the SQL join in
+    ``_ready_for_execution`` and the Neo4j ``LEAF_Q`` semantics.
+    """
+
+    def __init__(self, tenant_id: str, observers: Iterable[Any] = ()):
+        self.tenant_id = tenant_id
+        # secondary indexes fed the same events (``apply``/``rebuild``)
+        self.observers: List[Any] = list(observers)
+        self.tasks: Dict[str, Dict[str, Any]] = {}
+        self.pending: Dict[str, int] = {}
+        self.succ: Dict[str, Set[str]] = defaultdict(set)
+        self.pred: Dict[str, Set[str]] = defaultdict(set)
+        self._ready: Dict[str, None] = {}  # insertion ordered set
+        self._watermark: Optional[datetime] = None
+        self._last_rebuild = 0.0
+
+    # ---------- helpers ----------
+    def _blocking(self, task_id: str) -> bool:
+        t = self.tasks.get(task_id)
+        return t is not None and t["status"] != TaskStatus.DONE
+
+    def _refresh(self, task_id: str) -> None:
+        t = self.tasks.get(task_id)
+        if t and t["status"] == TaskStatus.TODO and self.pending.get(task_id, 0) <= 0:
+            self._ready[task_id] = None
+        else:
+            self._ready.pop(task_id, None)
+
+    def _shift_successors(self, task_id: str, delta: int) -> None:
+        for s in self.succ.get(task_id, ()):
+            self.pending[s] = self.pending.get(s, 0) + delta
+            self._refresh(s)
+
+    # ---------- mutations ----------
+    def upsert_task(self, snap: Dict[str, Any]) -> None:
+        tid = snap["id"]
+        prev = self.tasks.get(tid)
+        was_blocking = self._blocking(tid)
+        if prev is None:
+            self.tasks[tid] = dict(snap)
+            self.pending[tid] = sum(1 for p in self.pred.get(tid, ()) if self._blocking(p))
+        else:
+            prev.update(snap)
+        is_blocking = self._blocking(tid)
+        if was_blocking != is_blocking:
+            self._shift_successors(tid, 1 if is_blocking else -1)
+        self._refresh(tid)
+
+    def add_edge(self, from_id: str, to_id: str, kind: Optional[str]) -> None:
+        if not is_gating(kind) or from_id in self.pred.get(to_id, ()):
+            return
+        self.succ[from_id].add(to_id)
+        self.pred[to_id].add(from_id)
+        if to_id in self.tasks and self._blocking(from_id):
+            self.pending[to_id] = self.pending.get(to_id, 0) + 1
+            self._refresh(to_id)
+
+    def apply(self, event: Dict[str, Any]) -> None:
+        kind = event.get("type")
+        if kind == "task":
+            self.upsert_task({k: v for k, v in event.items() if k != "type"})
+        elif kind == "edge":
+            self.add_edge(event["from"], event["to"], event.get("kind"))
+        for obs in self.observers:
+            obs.apply(event)
+
+    # ---------- loading ----------
+    def rebuild(self, session: Session) -> None:
+        """Rebuild the full index from SQL (startup and periodic reconcile)."""
+        tasks = session.exec(select(Task).where(Task.tenant_id == self.tenant_id)).all()
+        deps = session.exec(
+            select(TaskDependency)
+            .join(Task, col(Task.id) == col(TaskDependency.to_id))
+            .where(Task.tenant_id == self.tenant_id)
+        ).all()
+        self.tasks.clear()
+        self.pending.clear()
+        self.succ.clear()
+        self.pred.clear()
+        self._ready.clear()
+        for d in deps:
+            if is_gating(d.dependency_type):
+                self.succ[d.from_id].add(d.to_id)
+                self.pred[d.to_id].add(d.from_id)
+        for t in tasks:
+            self.tasks[t.id] = task_snapshot(t)
+        for t in tasks:
+            self.pending[t.id] = sum(1 for p in self.pred.get(t.id, ()) if self._blocking(p))
+            self._refresh(t.id)
+        self._watermark = max((t.created_at for t in tasks), default=None)
+        self._last_rebuild = time.time()
+        for obs in self.observers:
+            obs.rebuild(session)
+
+    def _scan_new(self, session: Session) -> None:
+        """Pick up tasks inserted without going through ``Repo`` (agents, API)."""
+        if self._watermark is None:
+            return
+        since = self._watermark - WATERMARK_SLACK
+        new = session.exec(
+            select(Task).where(Task.tenant_id == self.tenant_id, Task.created_at >= since)
+        ).all()
+        if not new:
+            return
+        ids = [t.id for t in new]
+        deps = session.exec(select(TaskDependency).where(col(TaskDependency.to_id).in_(ids))).all()
+        for d in deps:
+            self.apply(
+                {"type": "edge", "from": d.from_id, "to": d.to_id, "kind": d.dependency_type}
+            )
+        for t in new:
+            if t.id not in self.tasks:
+                self.apply({"type": "task", **task_snapshot(t)})
+        self._watermark = max(self._watermark, max(t.created_at for t in new))
+
+    def sync(self, session: Session, events: Iterable[Dict[str, Any]] = ()) -> None:
+        """Apply queued events and new rows; cost is O(changed tasks)."""
+        if not self._last_rebuild or time.time() - self._last_rebuild > RECONCILE_INTERVAL_S:
+            drain_events(self.tenant_id)  # superseded by the rebuild
+            self.rebuild(session)
+            return
+        for e in events:
+            self.apply(e)
+        while True:
+            batch = drain_events(self.tenant_id)
+            for e in batch:
+                self.apply(e)
+            if len(batch) < DRAIN_BATCH:
+                break
+        self._scan_new(session)
+
+    # ---------- consumption ----------
+    def pop_ready(self) -> List[Dict[str, Any]]:
+        """Return snapshots of all ready tasks and clear the ready set.
+
+        Popped tasks re-enter the set only on a later status event, so the
+        caller must move each of them out of ``todo`` (dispatch or skip).
+        """
+        out = [self.tasks[t] for t in self._ready if t in self.tasks]
+        self._ready.clear()
+        return out
+
+    def __len__(self) -> int:
+        return len(self._ready)
+
+
+__all__ = [
+    "ReadyQueue",
+    "drain_events",
+    "is_gating",
+    "publish_edge",
+    "publish_event",
+    "publish_task",
+    "ready_tasks",
+    "task_snapshot",
+    "unresolved_exists",
+    "wait_for_events",
+]
@@ -0,0 +1,177 @@
+"""
+Delayed retry queue for failed tasks.
+
+When a task is marked ``failed`` (``Repo.update``) it is put into a Redis
+sorted set scored by the time of its next attempt. The delay grows
+exponentially with the attempt number and is jittered (``base * 2**attempt``,
+drawn uniformly from its upper half), with base/cap per error class, so a
+provider outage that fails hundreds of tasks at once does not come back as a
+retry storm. The scheduler pops only entries that are due: O(log n + due)
+instead of scanning the task table every tick.
+
+Without Redis the queue is a heap in the process that scheduled the retry;
+for failures recorded by a Celery worker that is not the scheduler. The
+scheduler therefore also re-queues failed tasks from SQL every
+``SCHEDULER_RETRY_RECOVER_S`` (``keep_existing=True``, delay measured from the
+task's ``updated_at``), which is a no-op for entries that are already queued.
+"""
+from __future__ import annotations
+
+import heapq
+import logging
+import os
+import random
+import re
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from ai_org_backend.services.redis_client import get_redis
+
+MAX_RETRIES = int(os.getenv("TASK_MAX_RETRIES", "2"))  # total automatic attempts
+RETRY_KEY = "ai_org:retry_queue"
+
+# error class → (base delay s, max delay s)
+BACKOFF: Dict[str, Tuple[float, float]] = {
+    "llm": (30.0, 900.0),  # rate limits / provider outages
+    "budget": (300.0, 3600.0),  # wait for a top-up rather than hammering
+    "sandbox_timeout": (60.0, 1200.0),
+    "default": (30.0, 600.0),
+}
+
+_CLASS_RX = [
+    ("sandbox_timeout", re.compile(r"time(d)?\s*out|timeout", re.I)),
+    ("budget", re.compile(r"budget|insufficient (funds|balance)|quota exceeded", re.I)),
+    ("llm", re.compile(r"openai|rate.?limit|\b429\b|\b50[234]\b|api ?error|llm", re.I)),
+]
+
+# ZRANGEBYSCORE + ZREM in one step so concurrent schedulers never pop the same entry
+_POP_DUE = """
+local due = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, ARGV[2])
+if #due > 0 then redis.call('ZREM', KEYS[1], unpack(due)) end
+return due
+"""
+
+_mem_lock = threading.Lock()
+_MEM_HEAP: List[Tuple[float, str]] = []
+_MEM_DUE: Dict[str, float] = {}
+
+
+def classify_error(notes: Optional[str]) -> str:
+    """Map a failure note to an error class of :data:`BACKOFF`."""
+    for name, rx in _CLASS_RX:
+        if notes and rx.search(notes):
+            return name
+    return "default"
+
+
+def backoff_delay(error_class: str, attempt: int, rng: Optional[random.Random] = None) -> float:
+    """Seconds until retry *attempt* (0-based) of a task failed with *error_class*."""
+    base, cap = BACKOFF.get(error_class, BACKOFF["default"])
+    ceiling = min(cap, base * (2 ** max(attempt, 0)))
+    return (rng or random).uniform(ceiling / 2, ceiling)
+
+
+def _member(tenant_id: str, task_id: str) -> str:
+    return f"{tenant_id}|{task_id}"
+
+
+def schedule_retry(
+    tenant_id: str,
+    task_id: str,
+    notes: Optional[str],
+    attempt: int,
+    failed_at: Optional[float] = None,
+    keep_existing: bool = False,
+) -> Optional[float]:
+    """Queue the next attempt of a failed task; returns the due timestamp.
+
+    The backoff counts from *failed_at* (default now). With *keep_existing*
+    an entry that is already queued keeps its due time (recovery sweeps).
+    Returns ``None`` if nothing was queued: *attempt* reached ``MAX_RETRIES``
+    or, with *keep_existing*, the task was queued already.
+    """
+    if attempt >= MAX_RETRIES:
+        return None
+    err = classify_error(notes)
+    due = (failed_at or time.time()) + backoff_delay(err, attempt)
+    member = _member(tenant_id, task_id)
+    queued: Optional[bool] = None
+    r = get_redis()
+    if r is not None:
+        try:
+            queued = bool(r.zadd(RETRY_KEY, {member: due}, nx=keep_existing)) or not keep_existing
+        except Exception as exc:  # pragma: no cover - fall back to memory
+            logging.getLogger(__name__).warning("Retry queue write failed: %s", exc)
+    if queued is None:
+        with _mem_lock:
+            queued = not (keep_existing and member in _MEM_DUE)
+            if queued:
+                _MEM_DUE[member] = due
+                heapq.heappush(_MEM_HEAP, (due, member))
+    if not queued:
+        return None
+    logging.getLogger(__name__).info(
+        "Retry %s/%s for task %s (%s) in %.0fs",
+        attempt + 1, MAX_RETRIES, task_id, err, due - time.time(),
+    )
+    return due
+
+
+def cancel_retry(tenant_id: str, task_id: str) -> None:
+    member = _member(tenant_id, task_id)
+    r = get_redis()
+    if r is not None:
+        try:
+            r.zrem(RETRY_KEY, member)
+        except Exception:  # pragma: no cover
+            pass
+    with _mem_lock:
+        _MEM_DUE.pop(member, None)  # heap entry is skipped lazily
+
+
+def pop_due(now: Optional[float] = None, limit: int = 100) -> List[Tuple[str, str]]:
+    """Remove and return up to *limit* due ``(tenant_id, task_id)`` entries."""
+    now = time.time() if now is None else now
+    members: List[str] = []
+    r = get_redis()
+    if r is not None:
+        try:
+            members = list(r.eval(_POP_DUE, 1, RETRY_KEY, now, limit))
+        except Exception as exc:  # pragma: no cover
+            logging.getLogger(__name__).warning("Retry queue pop failed: %s", exc)
+    with _mem_lock:
+        while _MEM_HEAP and _MEM_HEAP[0][0] <= now and len(members) < limit:
+            due, member = heapq.heappop(_MEM_HEAP)
+            if _MEM_DUE.get(member) == due:
+                del _MEM_DUE[member]
+                members.append(member)
+    out = []
+    for m in members:
+        m = m.decode() if isinstance(m, bytes) else m
+        tenant_id, _, task_id = m.partition("|")
+        out.append((tenant_id, task_id))
+    return out
+
+
+def pending_count() -> int:
+    r = get_redis()
+    if r is not None:
+        try:
+            return int(r.zcard(RETRY_KEY))
+        except Exception:  # pragma: no cover
+            pass
+    with _mem_lock:
+        return len(_MEM_DUE)
+
+
+__all__ = [
+    "BACKOFF",
+    "MAX_RETRIES",
+    "backoff_delay",
+    "cancel_retry",
+    "classify_error",
+    "pending_count",
+    "pop_due",
+    "schedule_retry",
+]
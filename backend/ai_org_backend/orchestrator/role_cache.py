@@ -0,0 +1,124 @@
+"""
+Persistent cache for role-routing decisions.
+
+Entries are keyed by the SHA-256 of the normalised task description (plus a
+prompt/role-set version, so editing ``orchestrator.j2`` or the agent list
+invalidates old answers). Redis keys carry a sliding TTL; a sorted set of
+last-access times bounds the cache to ``ROLE_CACHE_MAX`` entries by evicting
+the least recently used ones. Without Redis an in-process LRU is used.
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+
+from ai_org_backend.services.redis_client import get_redis
+
+ROLE_CACHE_TTL_S = int(os.getenv("ROLE_CACHE_TTL_S", str(7 * 24 * 3600)))
+ROLE_CACHE_MAX = int(os.getenv("ROLE_CACHE_MAX", "50000"))
+
+_PREFIX = "ai_org:role_cache:"
+_LRU_KEY = "ai_org:role_cache_lru"
+_WS_RX = re.compile(r"\s+")
+
+
+def normalize(desc: str) -> str:
+    """Lower-case, trim and collapse whitespace so trivial variants share a key."""
+    return _WS_RX.sub(" ", desc or "").strip().lower()
+
+
+class RoleCache:
+    """Description → role cache with TTL and LRU eviction."""
+
+    def __init__(
+        self, version: str = "", ttl_s: int = ROLE_CACHE_TTL_S, max_entries: int = ROLE_CACHE_MAX
+    ):
+        self.version = version
+        self.ttl_s = ttl_s
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._mem: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+
+    def key(self, desc: str) -> str:
+        return hashlib.sha256(f"{self.version}|{normalize(desc)}".encode("utf-8")).hexdigest()
+
+    # ---------- read ----------
+    def get_many(self, keys: Iterable[str]) -> Dict[str, str]:
+        keys = list(dict.fromkeys(keys))
+        if not keys:
+            return {}
+        r = get_redis()
+        if r is not None:
+            try:
+                vals = r.mget([_PREFIX + k for k in keys])
+                hits = {k: v for k, v in zip(keys, vals) if v}
+                if hits:
+                    now = time.time()
+                    pipe = r.pipeline(transaction=False)
+                    for k in hits:
+                        pipe.expire(_PREFIX + k, self.ttl_s)  # sliding TTL
+                    pipe.zadd(_LRU_KEY, {k: now for k in hits})
+                    pipe.execute()
+                return hits
+            except Exception as exc:  # pragma: no cover - fall back to memory
+                logging.getLogger(__name__).warning("Role cache read failed: %s", exc)
+        now = time.time()
+        hits = {}
+        with self._lock:
+            for k in keys:
+                item = self._mem.get(k)
+                if not item:
+                    continue
+                if item[1] < now:
+                    del self._mem[k]
+                    continue
+                self._mem[k] = (item[0], now + self.ttl_s)
+                self._mem.move_to_end(k)
+                hits[k] = item[0]
+        return hits
+
+    def get(self, key: str) -> Optional[str]:
+        return self.get_many([key]).get(key)
+
+    # ---------- write ----------
+    def set_many(self, items: Dict[str, str]) -> None:
+        if not items:
+            return
+        r = get_redis()
+        if r is not None:
+            try:
+                now = time.time()
+                pipe = r.pipeline(transaction=False)
+                for k, role in items.items():
+                    pipe.set(_PREFIX + k, role, ex=self.ttl_s)
+                pipe.zadd(_LRU_KEY, {k: now for k in items})
+                pipe.zremrangebyscore(_LRU_KEY, 0, now - self.ttl_s)  # expired anyway
+                pipe.zcard(_LRU_KEY)
+                size = pipe.execute()[-1]
+                excess = int(size) - self.max_entries
+                if excess > 0:
+                    evicted = [k for k, _ in r.zpopmin(_LRU_KEY, excess)]
+                    if evicted:
+                        r.delete(*[_PREFIX + k for k in evicted])
+                return
+            except Exception as exc:  # pragma: no cover
+                logging.getLogger(__name__).warning("Role cache write failed: %s", exc)
+        expires = time.time() + self.ttl_s
+        with self._lock:
+            for k, role in items.items():
+                self._mem[k] = (role, expires)
+                self._mem.move_to_end(k)
+            while len(self._mem) > self.max_entries:
+                self._mem.popitem(last=False)
+
+    def set(self, key: str, role: str) -> None:
+        self.set_many({key: role})
+
+
+__all__ = ["RoleCache", "normalize"]
@@ -1,35 +1,54 @@
 from __future__ import annotations
 
+import hashlib
 import json
 from pathlib import Path
+from typing import Dict, List
+
 from jinja2 import Template
+from ai_org_backend.metrics import prom_counter
 from ai_org_backend.orchestrator.inspector import alert
+from ai_org_backend.orchestrator.local_classifier import LOCAL_CONFIDENCE, get_model
+from ai_org_backend.orchestrator.role_cache import RoleCache
 from ai_org_backend.utils.llm import chat_completion
 from ai_org_backend.main import AGENTS
 
 # Include repo agent for bootstrapping
 AGENT_ROLES = list(AGENTS.keys())  # Now includes 'repo' role
 
+# Load prompt templates once (not per routed task)
+_PROMPT_DIR = Path(__file__).resolve().parents[3] / "prompts"
+_TMPL_SRC = (_PROMPT_DIR / "orchestrator.j2").read_text(encoding="utf-8")
+_BATCH_TMPL_SRC = (_PROMPT_DIR / "orchestrator_batch.j2").read_text(encoding="utf-8")
+PROMPT_TMPL = Template(_TMPL_SRC)
+BATCH_PROMPT_TMPL = Template(_BATCH_TMPL_SRC)
+# max. descriptions per batched LLM call
+BATCH_SIZE = 25
 
-def classify_role(desc: str) -> str:
-    # Return "dev" by default if description is empty or whitespace
-    if not desc or not desc.strip():
-        return "dev"
+# Cached answers are invalidated when the prompt or the role set changes
+_CACHE_VERSION = hashlib.sha256(
+    (_TMPL_SRC + _BATCH_TMPL_SRC + ",".join(AGENT_ROLES)).encode("utf-8")
+).hexdigest()[:12]
+role_cache = RoleCache(version=_CACHE_VERSION)
 
-    # Prepare LLM prompt using Jinja2 template with all available roles
-    tmpl_path = Path(__file__).resolve().parents[3] / "prompts" / "orchestrator.j2"
-    prompt = Template(tmpl_path.read_text(encoding="utf-8")).render(
-        roles=AGENT_ROLES, description=desc
-    )
+ROUTING_DECISIONS = prom_counter(
+    "ai_role_routing_total", "Role routing decisions by source", ("source",)
+)
 
-    try:
-        # Get LLM classification (expecting a JSON with {"role": "..."} or a single role string)
-        result = chat_completion(prompt, max_tokens=10)
-    except Exception as e:
-        alert(str(e), "llm")
-        return "dev"
 
-    # Robust extraction of role from LLM output
+def _classify_local(desc: str) -> str | None:
+    """Role from the offline classifier if it is confident enough."""
+    model = get_model()
+    if model is None:
+        return None
+    role, confidence = model.predict(desc)
+    if role in AGENT_ROLES and confidence >= LOCAL_CONFIDENCE:
+        return role
+    return None
+
+
+def _parse_role(result: object) -> str:
+    """Robust extraction of a role from an LLM answer ('' if none)."""
     role = ""
     if result:
         result_str = str(result).strip()
@@ -42,12 +61,121 @@ def classify_role(desc: str) -> str:
                 role = ""
         if not role:
             # Fallback: take the first word from the first line of the response
-            first_line = result_str.splitlines()[0]
-            if first_line:
+            first_line = result_str.splitlines()[0] if result_str else ""
+            if first_line.strip():
                 role = first_line.strip().split()[0]
-    role = role.lower()
+    return role.strip("\"',.").lower()
+
+
+def _classify_uncached(desc: str) -> str | None:
+    """Single LLM round trip; ``None`` on LLM failure or an unknown role (not cached)."""
+    # Prepare LLM prompt using Jinja2 template with all available roles
+    prompt = PROMPT_TMPL.render(roles=AGENT_ROLES, description=desc)
+    try:
+        # Get LLM classification (expecting a JSON with {"role": "..."} or a single role string)
+        result = chat_completion(prompt, max_tokens=10)
+    except Exception as e:
+        alert(str(e), "llm")
+        return None
+    role = _parse_role(result)
     if role not in AGENT_ROLES:
         alert(f"Unknown role '{role}', defaulting to dev", "router")
+        return None
+    return role
+
+
+def classify_role(desc: str) -> str:
+    # Return "dev" by default if description is empty or whitespace
+    if not desc or not desc.strip():
+        return "dev"
+
+    local = _classify_local(desc)
+    if local:
+        ROUTING_DECISIONS.labels("local").inc()
+        return local
+    key = role_cache.key(desc)
+    cached = role_cache.get(key)
+    if cached in AGENT_ROLES:
+        ROUTING_DECISIONS.labels("cache").inc()
+        return cached
+    ROUTING_DECISIONS.labels("llm").inc()
+    role = _classify_uncached(desc)
+    if role is None:
         return "dev"
+    role_cache.set(key, role)
     return role
 
+
+def _classify_batch_llm(descs: List[str]) -> List[str | None] | None:
+    """Classify *descs* with one LLM call.
+
+    Unparsable entries come back as ``None``; the whole result is ``None`` if
+    the LLM call itself failed.
+    """
+    prompt = BATCH_PROMPT_TMPL.render(roles=AGENT_ROLES, descriptions=descs)
+    try:
+        result = chat_completion(prompt, max_tokens=12 * len(descs) + 10)
+    except Exception as e:
+        alert(str(e), "llm")
+        return None
+    text = str(result or "").strip()
+    try:
+        data = json.loads(text[text.index("["): text.rindex("]") + 1])
+    except (ValueError, json.JSONDecodeError):
+        return [None] * len(descs)
+    if not isinstance(data, list) or len(data) != len(descs):
+        return [None] * len(descs)
+    roles: List[str | None] = []
+    for item in data:
+        role = _parse_role(item.get("role") if isinstance(item, dict) else item)
+        roles.append(role if role in AGENT_ROLES else None)
+    return roles
+
+
+def classify_roles(descs: List[str]) -> List[str]:
+    """Classify all descriptions of one scheduler tick.
+
+    Confident local predictions and cache hits cost nothing; distinct misses
+    share one LLM call per ``BATCH_SIZE`` descriptions. Entries the batch
+    answer does not cover fall back to :func:`classify_role`.
+    """
+    keys = [role_cache.key(d) if d and d.strip() else "" for d in descs]
+    known: Dict[str, str] = {}
+    for k, d in zip(keys, descs):
+        if k and k not in known:
+            local = _classify_local(d)
+            if local:
+                known[k] = local
+                ROUTING_DECISIONS.labels("local").inc()
+    cached = role_cache.get_many(k for k in keys if k and k not in known)
+    for k, v in cached.items():
+        if v in AGENT_ROLES:
+            known[k] = v
+            ROUTING_DECISIONS.labels("cache").inc()
+    misses: Dict[str, str] = {}
+    for k, d in zip(keys, descs):
+        if k and k not in known:
+            misses.setdefault(k, d)
+
+    miss_keys = list(misses)
+    if miss_keys:
+        ROUTING_DECISIONS.labels("llm").inc(len(miss_keys))
+    for i in range(0, len(miss_keys), BATCH_SIZE):
+        chunk = miss_keys[i: i + BATCH_SIZE]
+        single, llm_down = len(chunk) == 1, False
+        if single:
+            roles = [_classify_uncached(misses[chunk[0]])]
+        else:
+            batch = _classify_batch_llm([misses[k] for k in chunk])
+            llm_down = batch is None
+            roles = batch or [None] * len(chunk)
+        fresh = {}
+        for k, role in zip(chunk, roles):
+            if role is None:
+                # retry single-shot only if the batch answer was unusable
+                role = "dev" if single or llm_down else classify_role(misses[k])
+            else:
+                fresh[k] = role
+            known[k] = role
+        role_cache.set_many(fresh)
+    return [known.get(k, "dev") if k else "dev" for k in keys]
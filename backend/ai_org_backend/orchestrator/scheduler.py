@@ -2,7 +2,11 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import os
 import time
+from collections import defaultdict
+from datetime import timezone
+from typing import Dict, List, Tuple
 
 from ai_org_backend.db import engine
 from ai_org_backend.main import (  # import orchestrator dependencies
@@ -11,122 +15,254 @@ from ai_org_backend.main import (  # import orchestrator dependencies
     Repo,
     celery,
 )
-from ai_org_backend.models import Task, TaskDependency
+from ai_org_backend.models import Task
 from ai_org_backend.models.task import TaskStatus
-from ai_org_backend.orchestrator.graph_orchestrator import (
-    BLOCKED_Q,
-    CRIT_Q,
-    LEAF_Q,
-    TENANT,
-    cypher,
-    seed_if_empty,
-)
+from ai_org_backend.orchestrator.graph_orchestrator import TENANT, seed_if_empty
 from ai_org_backend.orchestrator.inspector import (
     PROM_BUDGET_BLOCKED,
     PROM_CRIT_PATH_LEN,
     PROM_TASK_BLOCKED,
     alert,
-    budget_left,
-    todo_count,
+    budgets_left,
+    export_status_counts,
+    status_counts,
+)
+from ai_org_backend.orchestrator.admission import AdmissionController
+from ai_org_backend.orchestrator.critical_path import CriticalPathEngine
+from ai_org_backend.orchestrator.fair_share import FairQueue
+from ai_org_backend.orchestrator.priority import priority_score
+from ai_org_backend.orchestrator.ready_queue import (
+    ReadyQueue,
+    unresolved_exists,
+    wait_for_events,
 )
-from ai_org_backend.orchestrator.router import classify_role
-from sqlmodel import Session, select
+from ai_org_backend.orchestrator.retry_queue import MAX_RETRIES, pop_due, schedule_retry
+from ai_org_backend.orchestrator.router import classify_roles
+from ai_org_backend.orchestrator.sharding import ShardLeases
+from ai_org_backend.services import outbox
+from sqlmodel import Session, col, select
 
-# ╭────────────────── Retry settings ──────────────────╮
-MAX_RETRIES = 2  # total automatic attempts
-RETRY_DELAY_S = 30  # wait 30s after fail before retry
+# max. wait for task events between ticks (dispatch happens as soon as one arrives)
+TICK_S = 2
+# ╭────────────────── Multi-tenant dispatch ──────────────────╮
+# upper bound of tasks sent per tick across all tenants (fair-share order)
+DISPATCH_PER_TICK = int(os.getenv("SCHEDULER_DISPATCH_PER_TICK", "50"))
+TENANT_REFRESH_S = 30  # how often new tenants are discovered from SQL
+# how often failed tasks missing from the retry queue are re-queued from SQL
+RETRY_RECOVER_S = float(os.getenv("SCHEDULER_RETRY_RECOVER_S", "60"))
 
 
-def _retry_failed_tasks() -> None:
-    """Requeue failed tasks that have remaining retries."""
-    now = time.time()
+def _kick_outbox() -> None:
+    """Wake the outbox workers for entries nobody asked for (retries, non-agent writers)."""
+    try:
+        with Session(engine) as db:
+            if outbox.due_count(db):
+                outbox.kick()
+    except Exception as exc:  # pragma: no cover
+        logging.getLogger(__name__).warning("Outbox sweep failed: %s", exc)
+
+
+def _recover_failed_tasks(tenants: List[str]) -> None:
+    """Queue retries for failed tasks of *tenants* missing from the retry queue.
+
+    Runs periodically: without Redis, retries scheduled by Celery workers land
+    in the worker's memory and never reach this process.
+    """
+    if not tenants:
+        return
     with Session(engine) as db:
-        q = select(Task).where(Task.status == "failed", Task.retries < MAX_RETRIES)
-        for t in db.exec(q):
-            age = now - t.updated_at.timestamp()
-            if age < RETRY_DELAY_S:
-                continue
+        rows = db.exec(
+            select(  # type: ignore[call-overload]  # sqlmodel types at most 4 columns
+                Task.tenant_id, Task.id, Task.notes, Task.retries, Task.updated_at
+            ).where(
+                col(Task.tenant_id).in_(tenants),
+                Task.status == "failed",
+                Task.retries < MAX_RETRIES,
+            )
+        ).all()
+    for tenant, task_id, notes, retries, failed_at in rows:
+        failed_ts = failed_at.replace(tzinfo=timezone.utc).timestamp() if failed_at else None
+        schedule_retry(tenant, task_id, notes, retries, failed_at=failed_ts, keep_existing=True)
 
-            t.status = "todo"
-            t.retries += 1
-            base_note = (t.notes or "").split("| auto-retry")[0].strip()
-            retry_msg = f"auto-retry {t.retries}/{MAX_RETRIES}"
-            t.notes = f"{base_note} | {retry_msg}" if base_note else retry_msg
-            db.add(t)
-            logging.info(f"Orchestrator: Task {t.id} requeued for retry {t.retries}/{MAX_RETRIES}")
-        db.commit()
+
+def _retry_failed_tasks() -> None:
+    """Requeue failed tasks whose backoff has elapsed (only due entries are read)."""
+    for tenant, task_id in pop_due():
+        repo = Repo(tenant)
+        t = repo.get(task_id)
+        if t is None or t.status != "failed" or t.retries >= MAX_RETRIES:
+            continue  # resolved manually or out of retries
+        retries = t.retries + 1
+        base_note = (t.notes or "").split("| auto-retry")[0].strip()
+        retry_msg = f"auto-retry {retries}/{MAX_RETRIES}"
+        repo.update(
+            task_id,
+            status="todo",
+            retries=retries,
+            notes=f"{base_note} | {retry_msg}" if base_note else retry_msg,
+        )
+        logging.info(f"Orchestrator: Task {task_id} requeued for retry {retries}/{MAX_RETRIES}")
 
 
 def _ready_for_execution(task: Task, session: Session) -> bool:
-    """Return True if a task has no unresolved prerequisites."""
-    unresolved = session.exec(
-        select(TaskDependency)
-        .where(TaskDependency.to_id == task.id)
-        .join(Task, Task.id == TaskDependency.from_id)
-        .where(Task.status != TaskStatus.DONE)
-    ).first()
-    return unresolved is None
+    """Return True if a task has no unresolved prerequisites.
+
+    Single-task check; use ``ready_tasks`` to get all ready tasks of a tenant.
+    """
+    return not session.exec(select(unresolved_exists(task.id))).one()
+
+
+def _known_tenants() -> List[str]:
+    """All tenants with tasks, plus the bootstrap tenant used for seeding."""
+    with Session(engine) as session:
+        rows = session.exec(select(Task.tenant_id).distinct()).all()
+    return sorted(set(rows) | {TENANT})
+
+
+def _admit_budget(tenant: str, rec: dict, avail: Dict[str, float]) -> bool:
+    """Budget-gate one ready task; skipped tasks are marked ``budget_exceeded``."""
+    # Calculate cost estimate for this task
+    cost_est = (rec["tokens_plan"] or 0) * (TOKEN_PRICE_PER_1000 / 1000.0)
+    if avail[tenant] < cost_est:
+        # Skip task due to insufficient budget
+        Repo(tenant).update(rec["id"], status="budget_exceeded", notes="budget skip")
+        alert(f"Task {rec['id']} skipped due to insufficient budget", "budget")
+        return False
+    # Deduct planned cost from available budget
+    avail[tenant] -= cost_est
+    return True
+
+
+def _route(batch: List[Tuple[str, dict]]) -> List[Tuple[str, dict, str]]:
+    """Classify all drained tasks of one tick in one batch."""
+    roles = classify_roles([rec["description"] for _, rec in batch]) if batch else []
+    return [(tenant, rec, role) for (tenant, rec), role in zip(batch, roles)]
+
+
+def _dispatch(tenant: str, rec: dict, role: str, admission: AdmissionController) -> None:
+    admission.acquire(tenant, role, rec["id"])
+    Repo(tenant).update(rec["id"], status="doing")
+    celery.send_task(f"agent.{role}", args=[tenant, rec["id"]], queue=f"{tenant}:{role}")
 
 
 async def orchestrator() -> None:
     last = time.time()
-    while True:
-        # Pre-dispatch budget availability check
-        try:
-            avail_budget = budget_left(TENANT)
-        except Exception:
-            avail_budget = 0.0  # Redis down, treat as no budget
-        if avail_budget < 0:
-            avail_budget = 0.0
-        seed_if_empty()
-        # 1️⃣ retry failed tasks
-        _retry_failed_tasks()
-
-        # Iterate over ready tasks
-        for rec in cypher(LEAF_Q):
-            # Fetch full task details for tokens_plan
-            with Session(engine) as session:
-                task_obj = session.get(Task, rec["id"])
-            if not task_obj:
-                continue
-            # Calculate cost estimate for this task
-            cost_est = (task_obj.tokens_plan or 0) * (TOKEN_PRICE_PER_1000 / 1000.0)
-            if avail_budget < cost_est:
-                # Skip task due to insufficient budget
-                Repo(TENANT).update(task_obj.id, status="budget_exceeded", notes="budget skip")
-                alert(f"Task {task_obj.id} skipped due to insufficient budget", "budget")
-                continue
-            # Deduct planned cost from available budget and dispatch
-            avail_budget -= cost_est
-            role = classify_role(rec["d"])
-            Repo(TENANT).update(task_obj.id, status="doing")
-            celery.send_task(f"agent.{role}", args=[TENANT, rec["id"]], queue=f"{TENANT}:{role}")
-        if time.time() - last > 10:
-            blocked = cypher(BLOCKED_Q)[0]["blocked"]
-            crit = cypher(CRIT_Q)
-            PROM_TASK_BLOCKED.labels(TENANT).set(blocked)
-            if crit:
-                PROM_CRIT_PATH_LEN.labels(TENANT).set(crit[0]["l"])
-            # Update Prometheus metrics for budget
-            BUDGET_GA.labels(TENANT).set(budget_left(TENANT))
-            # Count tasks skipped due to budget
-            budget_blocked = 0
+    leases = ShardLeases()
+    queues: Dict[str, ReadyQueue] = {}
+    paths: Dict[str, CriticalPathEngine] = {}
+    admission = AdmissionController()
+
+    def _priority(tid: str, rec: dict, waited_s: float) -> float:
+        cp = paths.get(tid)
+        return priority_score(rec, cp.slack(rec["id"]) if cp else 0, waited_s)
+
+    fair = FairQueue(priority=_priority)
+    known: List[str] = []
+    known_at = 0.0
+    recovered_at = 0.0
+    events: List[Tuple[str, dict]] = []
+    try:
+        while True:
+            # Shard ownership: serve only tenants whose shard lease we hold
+            if time.time() - known_at > TENANT_REFRESH_S:
+                known = _known_tenants()
+                known_at = time.time()
+            leases.refresh()
+            tenants = leases.filter(known)
+            for tid in list(queues):
+                if tid not in tenants:
+                    queues.pop(tid)
+                    paths.pop(tid, None)
+                    fair.discard_tenant(tid)
+                    admission.discard_tenant(tid)
+            for tid in tenants:
+                if tid not in queues:
+                    # critical path + in-flight tracking are fed the ready queue's events
+                    paths[tid] = CriticalPathEngine(tid)
+                    queues[tid] = ReadyQueue(tid, observers=[paths[tid], admission.observer(tid)])
+
+            if leases.owns(TENANT):
+                seed_if_empty()
+            # 1️⃣ retry failed tasks whose backoff has elapsed
+            if time.time() - recovered_at > RETRY_RECOVER_S:
+                _recover_failed_tasks(tenants)
+                recovered_at = time.time()
+            _retry_failed_tasks()
+
+            # Apply task events since the last tick and queue ready tasks per tenant
+            by_tenant: Dict[str, List[dict]] = defaultdict(list)
+            for tid, e in events:
+                by_tenant[tid].append(e)
             with Session(engine) as session:
-                budget_blocked = session.exec(
-                    select(Task).where(
-                        Task.tenant_id == TENANT, Task.status == TaskStatus.BUDGET_EXCEEDED
+                for tid, q in queues.items():
+                    q.sync(session, by_tenant.get(tid, ()))
+                    for rec in q.pop_ready():
+                        fair.push(tid, rec)
+
+            # Blocked / critical path gauges from the in-process graph (no Neo4j scan)
+            for tid, cp in paths.items():
+                if cp.dirty:
+                    PROM_TASK_BLOCKED.labels(tid).set(cp.blocked_count())
+                    PROM_CRIT_PATH_LEN.labels(tid).set(cp.critical_length())
+                    cp.dirty = False
+
+            # Pre-dispatch budget availability check (one Redis round trip for all tenants)
+            try:
+                budgets = budgets_left(queues)
+            except Exception:
+                budgets = {tid: 0.0 for tid in queues}  # Redis down, treat as no budget
+            avail: Dict[str, float] = {tid: max(b, 0.0) for tid, b in budgets.items()}
+            for tid, b in avail.items():
+                fair.set_budget(tid, b)
+
+            # 2️⃣ dispatch in weighted-fair order across tenants, by priority within a
+            # tenant; tasks that no longer fit are skipped so the budget is filled greedily.
+            # Held-back tasks go first; tasks over their role's concurrency cap are held.
+            def _still_todo(tid: str, rec: dict) -> bool:
+                snap = queues[tid].tasks.get(rec["id"]) if tid in queues else None
+                return snap is not None and snap["status"] == TaskStatus.TODO
+
+            candidates = [c for c in admission.take_held() if _still_todo(c[0], c[1])]
+            drained = [
+                (tid, rec) for tid, rec in fair.drain(DISPATCH_PER_TICK) if _still_todo(tid, rec)
+            ]
+            candidates += _route(drained)
+            admission.refresh_depths({(tid, role) for tid, _, role in candidates})
+            for tid, rec, role in candidates:
+                if not leases.confirm(tid):
+                    continue  # lease lost during this tick; the new owner picks the task up
+                if not admission.has_capacity(tid, role):
+                    admission.hold(tid, role, rec)
+                elif _admit_budget(tid, rec, avail):
+                    _dispatch(tid, rec, role, admission)
+            admission.export()
+
+            if time.time() - last > 10:
+                # One GROUP BY for all tenants; budgets come from this tick's read
+                counts = status_counts(queues)
+                export_status_counts(counts, queues)
+                for tid in queues:
+                    per = counts.get(tid, {})
+                    budget_blocked = per.get(TaskStatus.BUDGET_EXCEEDED.value, 0)
+                    BUDGET_GA.labels(tid).set(budgets[tid])
+                    PROM_BUDGET_BLOCKED.labels(tid).set(budget_blocked)
+                    print(
+                        f"ℹ️ [{tid}] todo:{per.get(TaskStatus.TODO.value, 0):>3} "
+                        f"budget_blocked:{budget_blocked:<2} budget:{budgets[tid]:.2f}$"
                     )
-                ).count()
-            PROM_BUDGET_BLOCKED.labels(TENANT).set(budget_blocked)
-            print(
-                f"ℹ️ todo:{todo_count(TENANT):>3} "
-                f"blocked:{blocked:<2} "
-                f"budget_blocked:{budget_blocked:<2} budget:{budget_left(TENANT):.2f}$"
-            )
-            last = time.time()
-        if budget_left(TENANT) < 1:
-            alert("Budget exhausted", "budget")
-        await asyncio.sleep(2)
+                    if budgets[tid] < 1:
+                        alert(f"Budget exhausted for tenant {tid}", "budget")
+                _kick_outbox()
+                last = time.time()
+            if len(fair):
+                # Dispatch cap reached: continue with the backlog right away
+                events = []
+                await asyncio.sleep(0)
+                continue
+            # Sleep until the next task event (or TICK_S) instead of a fixed poll
+            events = await asyncio.to_thread(wait_for_events, list(queues), TICK_S)
+    finally:
+        leases.release_all()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,184 @@
+"""
+Tenant sharding for scheduler replicas.
+
+Tenants are hashed onto ``SCHEDULER_SHARDS`` shards. Each scheduler replica
+heartbeats into a Redis sorted set and holds short-lived leases
+(``SET NX PX``) on roughly ``shards / replicas`` shards, renewing them every
+tick. When a replica joins, the others release their excess shards; when one
+dies its leases expire and the survivors pick them up. A tick can outlast the
+lease, so :meth:`ShardLeases.confirm` re-checks (and renews) the lease with the
+replica's token right before a tenant's task is dispatched.
+
+With Redis disabled (empty ``REDIS_URL``) a single replica owns every shard.
+While a configured Redis is unreachable, a replica keeps only the shards whose
+last renewal is younger than the lease TTL - another replica may own the rest.
+"""
+from __future__ import annotations
+
+import logging
+import math
+import os
+import socket
+import time
+import uuid
+import zlib
+from typing import Dict, Iterable, List, Set
+
+from ai_org_backend.services.redis_client import get_redis, redis_enabled
+
+NUM_SHARDS = int(os.getenv("SCHEDULER_SHARDS", "16"))
+LEASE_TTL_S = float(os.getenv("SCHEDULER_LEASE_TTL_S", "15"))
+
+REPLICAS_KEY = "ai_org:scheduler:replicas"
+
+# Only touch a lease that is still ours (compare-and-renew / compare-and-delete).
+_RENEW_LUA = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+  return redis.call('pexpire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+_RELEASE_LUA = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+  return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+def _shard_key(shard: int) -> str:
+    return f"ai_org:scheduler:shard:{shard}"
+
+
+def shard_of(tenant_id: str, num_shards: int = NUM_SHARDS) -> int:
+    """Stable shard number for *tenant_id* (independent of PYTHONHASHSEED)."""
+    return zlib.crc32(tenant_id.encode("utf-8")) % num_shards
+
+
+class ShardLeases:
+    """Lease bookkeeping for one scheduler replica."""
+
+    def __init__(
+        self,
+        replica_id: str | None = None,
+        num_shards: int = NUM_SHARDS,
+        ttl_s: float = LEASE_TTL_S,
+    ):
+        self.replica_id = (
+            replica_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        )
+        self.num_shards = num_shards
+        self.ttl_s = ttl_s
+        self.ttl_ms = int(ttl_s * 1000)
+        self.owned: Set[int] = set()
+        # shard -> monotonic time just before its last successful claim/renew
+        self._renewed: Dict[int, float] = {}
+
+    def _claim_order(self) -> List[int]:
+        # Start at a replica-specific offset so replicas don't race for shard 0.
+        start = zlib.crc32(self.replica_id.encode("utf-8")) % self.num_shards
+        return [(start + i) % self.num_shards for i in range(self.num_shards)]
+
+    def _drop(self, shard: int) -> None:
+        self.owned.discard(shard)
+        self._renewed.pop(shard, None)
+
+    def _expire_unconfirmed(self) -> None:
+        """Forget shards not renewed for a full TTL: their lease may be someone else's."""
+        now = time.monotonic()
+        for shard in list(self.owned):
+            if now - self._renewed.get(shard, -math.inf) >= self.ttl_s:
+                self._drop(shard)
+
+    def refresh(self) -> Set[int]:
+        """Heartbeat, renew, rebalance and return the set of owned shards."""
+        r = get_redis()
+        if r is None:
+            if redis_enabled():
+                self._expire_unconfirmed()
+            else:
+                self.owned = set(range(self.num_shards))
+            return self.owned
+        try:
+            now = time.time()
+            pipe = r.pipeline()
+            pipe.zadd(REPLICAS_KEY, {self.replica_id: now})
+            pipe.zremrangebyscore(REPLICAS_KEY, 0, now - self.ttl_ms / 1000.0)
+            pipe.zcard(REPLICAS_KEY)
+            replicas = max(1, int(pipe.execute()[-1]))
+            target = math.ceil(self.num_shards / replicas)
+
+            for shard in list(self.owned):
+                started = time.monotonic()
+                if r.eval(_RENEW_LUA, 1, _shard_key(shard), self.replica_id, self.ttl_ms):
+                    self._renewed[shard] = started
+                else:
+                    self._drop(shard)
+            while len(self.owned) > target:
+                shard = max(self.owned)
+                r.eval(_RELEASE_LUA, 1, _shard_key(shard), self.replica_id)
+                self._drop(shard)
+            for shard in self._claim_order():
+                if len(self.owned) >= target:
+                    break
+                if shard in self.owned:
+                    continue
+                started = time.monotonic()
+                if r.set(_shard_key(shard), self.replica_id, nx=True, px=self.ttl_ms):
+                    self.owned.add(shard)
+                    self._renewed[shard] = started
+        except Exception as exc:  # pragma: no cover - keep serving still-valid shards
+            logging.getLogger(__name__).warning("Shard lease refresh failed: %s", exc)
+            self._expire_unconfirmed()
+        return self.owned
+
+    def confirm(self, tenant_id: str) -> bool:
+        """Whether *tenant_id*'s shard is still ours; call right before dispatching.
+
+        A lease renewed less than half a TTL ago is valid without a round
+        trip; otherwise it is renewed with our token (compare-and-renew). A
+        lost lease drops the shard.
+        """
+        shard = shard_of(tenant_id, self.num_shards)
+        if shard not in self.owned:
+            return False
+        started = time.monotonic()
+        if started - self._renewed.get(shard, -math.inf) < self.ttl_s / 2:
+            return True
+        r = get_redis()
+        if r is None:
+            if not redis_enabled():
+                return True
+            self._expire_unconfirmed()
+            return shard in self.owned
+        try:
+            if r.eval(_RENEW_LUA, 1, _shard_key(shard), self.replica_id, self.ttl_ms):
+                self._renewed[shard] = started
+                return True
+        except Exception as exc:  # pragma: no cover
+            logging.getLogger(__name__).warning("Shard lease renew failed: %s", exc)
+            self._expire_unconfirmed()
+            return shard in self.owned
+        self._drop(shard)
+        return False
+
+    def owns(self, tenant_id: str) -> bool:
+        return shard_of(tenant_id, self.num_shards) in self.owned
+
+    def filter(self, tenant_ids: Iterable[str]) -> List[str]:
+        return [t for t in tenant_ids if self.owns(t)]
+
+    def release_all(self) -> None:
+        r = get_redis()
+        if r is not None:
+            try:
+                for shard in self.owned:
+                    r.eval(_RELEASE_LUA, 1, _shard_key(shard), self.replica_id)
+                r.zrem(REPLICAS_KEY, self.replica_id)
+            except Exception:  # pragma: no cover
+                pass
+        self.owned.clear()
+        self._renewed.clear()
+
+
+__all__ = ["NUM_SHARDS", "ShardLeases", "shard_of"]
@@ -1,14 +1,26 @@
 """
 Unified Repo helper.
 All Task updates go through here to keep SQL DB and Neo4j graph in sync.
+The graph is mirrored through the outbox (see ``graph_sync``): the entries
+commit with the SQL change and are delivered in batches by the outbox workers.
 """
 from __future__ import annotations
 
+import logging
 from typing import Any, Iterable, Optional
 
-from ai_org_backend.db import SessionLocal
+from ai_org_backend.db import SessionLocal, engine
 from ai_org_backend.models import Task, TaskDependency
-from ai_org_backend.services import graph_sync
+from ai_org_backend.orchestrator import ready_queue, retry_queue
+from ai_org_backend.services import graph_sync, outbox
+
+
+def _flush_graph() -> None:
+    """Wake the outbox workers (debounced); without a broker deliver in-line."""
+    try:
+        outbox.kick_or_drain(engine)
+    except Exception as exc:
+        logging.getLogger(__name__).warning("Graph mirror flush failed: %s", exc)
 
 
 class Repo:
@@ -41,23 +53,24 @@ class Repo:
                 if hasattr(obj, k):
                     setattr(obj, k, v)
             s.add(obj)
+            graph_sync.mirror_task(s, obj.tenant_id, obj.id)
             s.commit()
             s.refresh(obj)
 
-        # Mirror to graph (best-effort; never break request on graph failure)
+        # Notify the scheduler's ready queue (status transitions drive dispatch)
         try:
-            graph_sync.upsert_task(
-                obj.id,
-                desc=obj.description,
-                status=str(obj.status),
-                business_value=obj.business_value,
-                tokens_plan=obj.tokens_plan,
-                tokens_actual=obj.tokens_actual,
-                purpose_relevance=obj.purpose_relevance,
-            )
-        except Exception as e:
-            # Intentionally swallow to not block the pipeline; logs are handled by caller/logger
+            ready_queue.publish_task(obj)
+        except Exception:
             pass
+        # Failed → schedule the next automatic attempt (backoff per error class)
+        if fields.get("status") == "failed":
+            try:
+                retry_queue.schedule_retry(obj.tenant_id, obj.id, obj.notes, obj.retries)
+            except Exception:
+                pass
+
+        # Graph mirror is delivered by the outbox workers
+        _flush_graph()
 
         return obj
 
@@ -87,33 +100,27 @@ class Repo:
                 notes=notes or "",
             )
             s.add(t)
-            s.commit()
-            s.refresh(t)
+            s.flush()  # assigns the id
+            graph_sync.mirror_task(s, self.tenant_id, t.id)
 
             # Dependencies in SQL
             if depends_on:
                 for pid in depends_on:
                     s.add(TaskDependency(from_id=pid, to_id=t.id, dependency_type="FINISH_START"))
-                s.commit()
+                    graph_sync.mirror_dependency(s, self.tenant_id, pid, t.id, "FINISH_START")
+            s.commit()
+            s.refresh(t)
 
-        # Graph upserts (best-effort)
         try:
-            graph_sync.upsert_task(
-                t.id,
-                desc=t.description,
-                status=str(t.status),
-                business_value=t.business_value,
-                tokens_plan=t.tokens_plan,
-                tokens_actual=t.tokens_actual,
-                purpose_relevance=t.purpose_relevance,
-            )
             if depends_on:
                 for pid in depends_on:
-                    graph_sync.upsert_task(pid)  # ensure parent node exists
-                    graph_sync.upsert_dependency(pid, t.id, kind="FINISH_START")
+                    ready_queue.publish_edge(self.tenant_id, pid, t.id, "FINISH_START")
+            ready_queue.publish_task(t)
         except Exception:
             pass
 
+        _flush_graph()
+
         return t
 
     def link(self, from_id: str, to_id: str, *, kind: str = "FINISH_START") -> None:
@@ -122,8 +129,10 @@ class Repo:
         """
         with SessionLocal() as s:
             s.add(TaskDependency(from_id=from_id, to_id=to_id, dependency_type=kind))
+            graph_sync.mirror_dependency(s, self.tenant_id, from_id, to_id, kind)
             s.commit()
         try:
-            graph_sync.upsert_dependency(from_id, to_id, kind=kind)
+            ready_queue.publish_edge(self.tenant_id, from_id, to_id, kind)
         except Exception:
             pass
+        _flush_graph()
@@ -0,0 +1,125 @@
+"""
+Streamed, cached project archives (``/api/project.zip``).
+
+The zip is generated on the fly while it is sent: :func:`stream_zip` writes
+through :class:`zipfile.ZipFile` into a small in-memory buffer that is
+drained after every chunk, so memory stays at ``CHUNK_SIZE`` and nothing is
+written to the tenant workspace. The bytes are teed into a per-process unique
+temp file below ``<WORKSPACE>/.archives`` that is renamed to
+``<tenant>-<etag>.zip`` only once the stream completed, so concurrent
+downloads never see a half-written archive and repeat downloads of an
+unchanged project are served from that file without recompressing.
+
+The ETag (:func:`project_etag`) hashes path, size and mtime of every file in
+the tenant directory (without its ``.git``): a stat walk, no file is read.
+"""
+from __future__ import annotations
+
+import hashlib
+import io
+import os
+import tempfile
+import zipfile
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+ARCHIVE_DIR = ".archives"
+CHUNK_SIZE = 64 * 1024
+
+
+def _files(base_dir: Path) -> List[Tuple[str, os.stat_result]]:
+    out = []
+    for root, dirs, files in os.walk(base_dir):
+        # the tenant repository is not part of the project
+        dirs[:] = sorted(d for d in dirs if d != ".git")
+        for name in sorted(files):
+            p = Path(root) / name
+            out.append((p.relative_to(base_dir).as_posix(), p.stat()))
+    return out
+
+
+def project_etag(base_dir: Path) -> str:
+    """Strong ETag of the tenant directory contents."""
+    h = hashlib.sha256()
+    for rel, st in _files(base_dir):
+        h.update(f"{rel}\0{st.st_size}\0{st.st_mtime_ns}\n".encode("utf-8"))
+    return h.hexdigest()[:32]
+
+
+def cached_archive(cache_dir: Path, tenant_id: str, etag: str) -> Optional[Path]:
+    path = cache_dir / f"{tenant_id}-{etag}.zip"
+    return path if path.exists() else None
+
+
+class _Buffer(io.RawIOBase):
+    """Write-only, non-seekable sink that :class:`zipfile.ZipFile` streams into."""
+
+    def __init__(self) -> None:
+        self._chunks: List[bytes] = []
+        self._pos = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        self._chunks.append(bytes(b))
+        self._pos += len(b)
+        return len(b)
+
+    def tell(self) -> int:
+        return self._pos
+
+    def take(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def stream_zip(
+    base_dir: Path, tenant_id: str, etag: str, cache_dir: Optional[Path] = None
+) -> Iterator[bytes]:
+    """Yield a zip of *base_dir*; on completion keep it as the cached archive for *etag*."""
+    tmp = None
+    if cache_dir is not None:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=cache_dir, prefix=f".{tenant_id}-", suffix=".part")
+        tmp = os.fdopen(fd, "wb")
+    buf = _Buffer()
+
+    def _emit() -> Iterator[bytes]:
+        data = buf.take()
+        if data:
+            if tmp is not None:
+                tmp.write(data)
+            yield data
+
+    completed = False
+    try:
+        with zipfile.ZipFile(buf, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+            for rel, st in _files(base_dir):
+                path = base_dir / rel
+                info = zipfile.ZipInfo.from_file(path, rel)
+                info.compress_type = zipfile.ZIP_DEFLATED
+                zip64 = st.st_size > 2**31
+                with open(path, "rb") as src, zf.open(info, "w", force_zip64=zip64) as dst:
+                    for chunk in iter(lambda: src.read(CHUNK_SIZE), b""):
+                        dst.write(chunk)
+                        yield from _emit()
+                yield from _emit()
+        yield from _emit()
+        completed = True
+    finally:
+        if tmp is not None and cache_dir is not None:
+            tmp.close()
+            # keep only if nothing changed while streaming
+            if completed and project_etag(base_dir) == etag:
+                final = cache_dir / f"{tenant_id}-{etag}.zip"
+                os.replace(tmp_name, final)
+                for old in cache_dir.glob(f"{tenant_id}-{'?' * len(etag)}.zip"):
+                    if old != final:
+                        old.unlink(missing_ok=True)
+            else:  # client went away (or files changed): drop the partial archive
+                Path(tmp_name).unlink(missing_ok=True)
+
+
+__all__ = ["ARCHIVE_DIR", "cached_archive", "project_etag", "stream_zip"]
@@ -0,0 +1,186 @@
+"""
+Where artefact blobs live: the local disk or an S3-compatible bucket.
+
+Artefacts are addressed by sha256 (see :mod:`.blob_store`), so a backend only
+has to store and hand out immutable blobs:
+
+* :class:`LocalBackend` - the ``.blobs`` directory of the workspace; every
+  node has to share that filesystem (the default, ``ARTEFACT_STORE=local``).
+* :class:`S3Backend` - a bucket (AWS S3, MinIO, …; ``ARTEFACT_STORE=s3``).
+  Blobs are uploaded once when the artefact is registered (multipart above
+  ``ARTEFACT_S3_PART_MB``) and the local ``.blobs`` directory becomes a
+  read-through cache: a node fetches a blob on first use, verifies its hash
+  and serves later reads from disk. API replicas and workers then only share
+  the database and the bucket.
+
+Callers use :func:`get_backend` and never build paths into the workspace
+themselves; :meth:`BlobBackend.local_path` returns a local file (fetching it if
+needed) for ``FileResponse``, git and embedding.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from .blob_store import BlobStore
+
+try:  # optional: only needed for ARTEFACT_STORE=s3
+    import boto3
+except ImportError:  # pragma: no cover
+    boto3 = None
+
+ARTEFACT_STORE = os.getenv("ARTEFACT_STORE", "local")
+S3_BUCKET = os.getenv("ARTEFACT_S3_BUCKET", "")
+S3_PREFIX = os.getenv("ARTEFACT_S3_PREFIX", "blobs/")
+S3_ENDPOINT_URL = os.getenv("S3_ENDPOINT_URL") or None  # MinIO & co.
+S3_PART_SIZE = int(float(os.getenv("ARTEFACT_S3_PART_MB", "8")) * 1024 * 1024)
+
+
+class BlobBackend(ABC):
+    """Storage of immutable, sha256-addressed artefact blobs."""
+
+    def __init__(self, cache: BlobStore):
+        self.cache = cache
+
+    @abstractmethod
+    def exists(self, sha: str) -> bool:
+        """Whether blob *sha* is stored in the backend."""
+
+    @abstractmethod
+    def put(self, sha: str) -> None:
+        """Persist blob *sha*, already ingested into ``self.cache``."""
+
+    @abstractmethod
+    def local_path(self, sha: str) -> Optional[Path]:
+        """Local file with the content of *sha*, or ``None`` if the blob is unknown."""
+
+    def read(self, sha: str, limit: int = -1) -> Optional[bytes]:
+        path = self.local_path(sha)
+        if path is None:
+            return None
+        with open(path, "rb") as fh:
+            return fh.read(limit)
+
+
+class LocalBackend(BlobBackend):
+    """Blobs in the (shared) workspace filesystem."""
+
+    def exists(self, sha: str) -> bool:
+        return self.cache.exists(sha)
+
+    def put(self, sha: str) -> None:
+        pass  # the ingest already wrote it
+
+    def local_path(self, sha: str) -> Optional[Path]:
+        path = self.cache.path(sha)
+        return path if path.is_file() else None
+
+
+class S3Backend(BlobBackend):
+    """Blobs in an S3 bucket, with the local blob store as read-through cache."""
+
+    def __init__(self, cache: BlobStore, client: Any, bucket: str, prefix: str = S3_PREFIX,
+                 part_size: int = S3_PART_SIZE):
+        super().__init__(cache)
+        self.client = client
+        self.bucket = bucket
+        self.prefix = prefix
+        self.part_size = max(part_size, 5 * 1024 * 1024)  # S3 minimum for all but the last part
+
+    def key(self, sha: str) -> str:
+        return f"{self.prefix}{sha[:2]}/{sha}"
+
+    def exists(self, sha: str) -> bool:
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self.key(sha))
+            return True
+        except Exception as exc:
+            if _is_missing(exc):
+                return False
+            raise
+
+    def put(self, sha: str) -> None:
+        if self.exists(sha):  # content-addressed: uploaded before
+            return
+        path = self.cache.path(sha)
+        size = path.stat().st_size
+        with open(path, "rb") as fh:
+            if size <= self.part_size:
+                self.client.put_object(Bucket=self.bucket, Key=self.key(sha), Body=fh.read())
+            else:
+                self._put_multipart(sha, fh)
+
+    def _put_multipart(self, sha: str, fh) -> None:
+        key = self.key(sha)
+        upload_id = self.client.create_multipart_upload(Bucket=self.bucket, Key=key)["UploadId"]
+        try:
+            parts = []
+            for number, chunk in enumerate(iter(lambda: fh.read(self.part_size), b""), start=1):
+                res = self.client.upload_part(
+                    Bucket=self.bucket, Key=key, UploadId=upload_id, PartNumber=number, Body=chunk
+                )
+                parts.append({"PartNumber": number, "ETag": res["ETag"]})
+            self.client.complete_multipart_upload(
+                Bucket=self.bucket, Key=key, UploadId=upload_id, MultipartUpload={"Parts": parts}
+            )
+        except Exception:
+            self.client.abort_multipart_upload(Bucket=self.bucket, Key=key, UploadId=upload_id)
+            raise
+
+    def local_path(self, sha: str) -> Optional[Path]:
+        path = self.cache.path(sha)
+        if path.is_file():
+            return path
+        try:
+            obj = self.client.get_object(Bucket=self.bucket, Key=self.key(sha))
+        except Exception as exc:
+            if _is_missing(exc):
+                return None
+            raise
+        meta, blob, _ = self.cache.put(obj["Body"])
+        if meta.sha256 != sha:
+            blob.unlink(missing_ok=True)
+            raise ValueError(
+                f"blob {sha} from s3://{self.bucket}/{self.key(sha)} has sha256 {meta.sha256}"
+            )
+        return blob
+
+
+def _is_missing(exc: Exception) -> bool:
+    code = str(getattr(exc, "response", {}).get("Error", {}).get("Code", ""))
+    if code in {"404", "NoSuchKey", "NotFound"}:
+        return True
+    return isinstance(exc, (KeyError, FileNotFoundError))
+
+
+_backends: Dict[Path, BlobBackend] = {}
+_lock = threading.Lock()
+
+
+def get_backend(root: Path) -> BlobBackend:
+    """Configured backend for the blob store at *root* (one instance per root)."""
+    root = Path(root)
+    with _lock:
+        if root not in _backends:
+            cache = BlobStore(root)
+            if ARTEFACT_STORE == "s3":
+                if boto3 is None:
+                    raise RuntimeError("ARTEFACT_STORE=s3 requires boto3")
+                if not S3_BUCKET:
+                    raise RuntimeError("ARTEFACT_STORE=s3 requires ARTEFACT_S3_BUCKET")
+                client = boto3.client("s3", endpoint_url=S3_ENDPOINT_URL)
+                _backends[root] = S3Backend(cache, client, S3_BUCKET)
+            else:
+                if ARTEFACT_STORE != "local":
+                    logging.getLogger(__name__).warning(
+                        "Unknown ARTEFACT_STORE=%r, using local", ARTEFACT_STORE
+                    )
+                _backends[root] = LocalBackend(cache)
+        return _backends[root]
+
+
+__all__ = ["ARTEFACT_STORE", "BlobBackend", "LocalBackend", "S3Backend", "get_backend"]
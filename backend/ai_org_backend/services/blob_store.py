@@ -0,0 +1,142 @@
+"""
+Content-addressed blob store for artefacts.
+
+Every artefact is ingested once into ``<WORKSPACE>/.blobs/<sha[:2]>/<sha>``;
+the tenant path (``<WORKSPACE>/<tenant>/<file>``) is a hardlink to the blob
+(a copy where the filesystem cannot link). Identical bytes are therefore
+stored once no matter how often retries and fix tasks register them, and
+``register_artefact`` can tell from the hash alone that a file is already
+known to the tenant and skip re-embedding and re-committing it.
+
+Blobs are read-only; ``register_artefact`` replaces tenant paths by unlinking
+them first, so writing into a linked path in place never corrupts a blob.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import shutil
+import stat
+import tempfile
+from pathlib import Path
+from typing import BinaryIO, Dict, List, Optional, Tuple, Union
+
+from sqlalchemy import func
+from sqlmodel import Session, col, select
+
+from ai_org_backend.models import Artifact, Task
+from ai_org_backend.utils.ingest import IngestResult, hash_file, ingest
+
+BLOB_DIR = ".blobs"
+_READ_ONLY = stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH
+
+
+class BlobStore:
+    """Blobs below *root*, addressed by sha256."""
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+
+    def path(self, sha: str) -> Path:
+        return self.root / sha[:2] / sha
+
+    def exists(self, sha: str) -> bool:
+        return self.path(sha).exists()
+
+    def put(self, src: Union[Path, bytes, BinaryIO]) -> Tuple[IngestResult, Path, bool]:
+        """Ingest *src*; returns ``(metadata, blob path, newly stored)``."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.root, prefix=".ingest-")
+        os.close(fd)
+        tmp_path = Path(tmp)
+        try:
+            meta = ingest(src, tmp_path)
+            blob = self.path(meta.sha256)
+            if blob.exists():
+                return meta, blob, False
+            blob.parent.mkdir(exist_ok=True)
+            os.chmod(tmp_path, _READ_ONLY)
+            os.replace(tmp_path, blob)
+            return meta, blob, True
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+    def link(self, sha: str, tgt: Path) -> None:
+        """Make *tgt* refer to blob *sha*, replacing whatever is there."""
+        tgt.parent.mkdir(parents=True, exist_ok=True)
+        if tgt.exists() or tgt.is_symlink():
+            tgt.unlink()
+        try:
+            os.link(self.path(sha), tgt)
+        except OSError as exc:  # no hardlinks (other filesystem, FAT, …)
+            logging.getLogger(__name__).debug("Hardlink failed, copying blob: %s", exc)
+            shutil.copyfile(self.path(sha), tgt)
+
+    def holds(self, sha: str, path: Path) -> bool:
+        """True if *path* currently has the content of blob *sha*."""
+        if not path.exists():
+            return False
+        blob = self.path(sha)
+        try:
+            if blob.exists() and os.path.samefile(blob, path):
+                return True
+            if blob.exists() and blob.stat().st_size != path.stat().st_size:
+                return False
+        except OSError:
+            return False
+        return hash_file(path) == sha
+
+
+def find_artifact(session: Session, tenant_id: str, sha: str) -> Optional[Artifact]:
+    """Earliest artefact of *tenant_id* with content *sha*, if any."""
+    return session.exec(
+        select(Artifact)
+        .join(Task, col(Task.id) == col(Artifact.task_id))
+        .where(Task.tenant_id == tenant_id, Artifact.sha256 == sha)
+        .order_by(col(Artifact.created_at))
+        .limit(1)
+    ).first()
+
+
+def dedup_report(session: Session) -> List[Dict[str, object]]:
+    """Per tenant: artefacts, logical vs. stored bytes, dedup ratio, bytes saved."""
+    per_blob = (
+        select(
+            col(Task.tenant_id).label("tenant"),
+            Artifact.sha256,
+            func.count().label("n"),
+            func.max(Artifact.size).label("size"),
+        )
+        .join(Task, col(Task.id) == col(Artifact.task_id))
+        .group_by(Task.tenant_id, Artifact.sha256)
+        .subquery()
+    )
+    rows = session.exec(
+        select(  # type: ignore[call-overload]  # sqlmodel types at most 4 columns
+            per_blob.c.tenant,
+            func.sum(per_blob.c.n),
+            func.count(),
+            func.sum(per_blob.c.n * per_blob.c.size),
+            func.sum(per_blob.c.size),
+        )
+        .group_by(per_blob.c.tenant)
+        .order_by(per_blob.c.tenant)
+    ).all()
+    report = []
+    for tenant, artefacts, blobs, logical, stored in rows:
+        logical, stored = int(logical or 0), int(stored or 0)
+        report.append(
+            {
+                "tenant": tenant,
+                "artefacts": int(artefacts),
+                "blobs": int(blobs),
+                "logical_bytes": logical,
+                "stored_bytes": stored,
+                "dedup_ratio": logical / stored if stored else 1.0,
+                "bytes_saved": logical - stored,
+            }
+        )
+    return report
+
+
+__all__ = ["BLOB_DIR", "BlobStore", "dedup_report", "find_artifact"]
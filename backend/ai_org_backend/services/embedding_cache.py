@@ -0,0 +1,150 @@
+"""
+On-disk embedding cache keyed by ``(model, sha256(text))``.
+
+Overwrites, retries, duplicate artefacts and re-indexing embed the same text
+again and again; :class:`EmbeddingCache` remembers every vector in a local
+SQLite file (float32 blobs, WAL mode, so several worker processes on one node
+can share it). Reads refresh ``last_used``; once the file holds more than
+``EMBED_CACHE_MAX_MB`` of vectors the least recently used ~10 % are evicted.
+Hits and misses are exported as ``ai_embedding_cache_total{result}``.
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+from ai_org_backend.metrics import prom_counter
+
+EMBED_CACHE_PATH = os.getenv(
+    "EMBED_CACHE_PATH", str(Path.cwd() / "workspace" / ".cache" / "embeddings.sqlite")
+)
+EMBED_CACHE_MAX_BYTES = int(float(os.getenv("EMBED_CACHE_MAX_MB", "256")) * 1024 * 1024)
+
+EMBED_CACHE_LOOKUPS = prom_counter(
+    "ai_embedding_cache_total", "Embedding cache lookups by result (hit/miss)", ("result",)
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS embedding (
+    key TEXT PRIMARY KEY,
+    vector BLOB NOT NULL,
+    last_used REAL NOT NULL
+)
+"""
+_TOTAL_BYTES = "SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embedding"
+_CHUNK = 500  # keys per IN (...) query
+
+
+def cache_key(model: str, text: str) -> str:
+    return f"{model}:{hashlib.sha256(text.encode('utf-8')).hexdigest()}"
+
+
+class EmbeddingCache:
+    """Size-bounded LRU of embedding vectors in a SQLite file."""
+
+    def __init__(self, path: Path, max_bytes: int = EMBED_CACHE_MAX_BYTES):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        self._bytes: Optional[int] = None  # stored vector bytes, lazily summed
+
+    def _db(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(_SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, List[float]]:
+        found: Dict[str, List[float]] = {}
+        db = self._db()
+        unique = list(dict.fromkeys(keys))
+        for i in range(0, len(unique), _CHUNK):
+            part = unique[i:i + _CHUNK]
+            marks = ",".join("?" * len(part))
+            query = f"SELECT key, vector FROM embedding WHERE key IN ({marks})"
+            for key, blob in db.execute(query, part):
+                found[key] = array("f", blob).tolist()
+            hit = [k for k in part if k in found]
+            if hit:
+                marks = ",".join("?" * len(hit))
+                db.execute(
+                    f"UPDATE embedding SET last_used = ? WHERE key IN ({marks})",
+                    [time.time(), *hit],
+                )
+        return found
+
+    def put_many(self, items: Dict[str, List[float]]) -> None:
+        if not items:
+            return
+        now = time.time()
+        rows = [(k, array("f", v).tobytes(), now) for k, v in items.items()]
+        db = self._db()
+        db.executemany(
+            "INSERT OR REPLACE INTO embedding (key, vector, last_used) VALUES (?, ?, ?)", rows
+        )
+        if self._bytes is None:
+            self._bytes = db.execute(_TOTAL_BYTES).fetchone()[0]
+        else:
+            self._bytes += sum(len(r[1]) for r in rows)
+        if self._bytes > self.max_bytes:
+            self._evict(db)
+
+    def _evict(self, db: sqlite3.Connection) -> None:
+        """Drop least recently used vectors down to 90 % of the limit."""
+        total, count = db.execute(
+            "SELECT COALESCE(SUM(LENGTH(vector)), 0), COUNT(*) FROM embedding"
+        ).fetchone()
+        if total > self.max_bytes and count:
+            target = int(self.max_bytes * 0.9)
+            drop = max(1, int(count * (total - target) / total) + 1)
+            db.execute(
+                "DELETE FROM embedding WHERE key IN "
+                "(SELECT key FROM embedding ORDER BY last_used LIMIT ?)",
+                (drop,),
+            )
+            total = db.execute(_TOTAL_BYTES).fetchone()[0]
+        self._bytes = total
+
+    def embed(
+        self,
+        model: str,
+        texts: Sequence[str],
+        compute: Callable[[List[str]], List[List[float]]],
+    ) -> List[List[float]]:
+        """Vectors for *texts*; only texts not cached are passed to *compute*."""
+        keys = [cache_key(model, t) for t in texts]
+        try:
+            found = self.get_many(keys)
+        except sqlite3.Error as exc:  # pragma: no cover - cache is best effort
+            logging.getLogger(__name__).warning("Embedding cache read failed: %s", exc)
+            found = {}
+        missing: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in found:
+                missing.setdefault(key, text)
+        # repeats within one call are embedded once and count as hits
+        EMBED_CACHE_LOOKUPS.labels("hit").inc(len(keys) - len(missing))
+        EMBED_CACHE_LOOKUPS.labels("miss").inc(len(missing))
+        if missing:
+            fresh = dict(zip(missing, compute(list(missing.values()))))
+            found.update(fresh)
+            try:
+                self.put_many(fresh)
+            except sqlite3.Error as exc:  # pragma: no cover
+                logging.getLogger(__name__).warning("Embedding cache write failed: %s", exc)
+        return [found[k] for k in keys]
+
+
+__all__ = ["EMBED_CACHE_LOOKUPS", "EmbeddingCache", "cache_key"]
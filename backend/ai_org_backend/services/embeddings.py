@@ -0,0 +1,122 @@
+"""
+Embedding providers for the vector store.
+
+:class:`EmbeddingProvider` is what :class:`~.vector_store.VectorStore` needs
+from a model: a name, the vector dimension and a batched ``embed``. Every
+provider gets its own Qdrant collection (:attr:`EmbeddingProvider.collection`)
+created with its dimension, so switching providers never mixes vector spaces.
+
+* :class:`OpenAIProvider` - the OpenAI embeddings API (``EMBED_BATCH`` inputs
+  per request); vectors are worth caching (see :mod:`.embedding_cache`).
+* :class:`HashingProvider` - CPU-only, no network, no model files: signed
+  feature hashing of word unigrams and bigrams with sublinear term frequency,
+  L2-normalised, computed for a whole batch with NumPy. Lexical rather than
+  semantic, but good enough to find the artefacts that share a task's
+  vocabulary, and it works air-gapped with sub-millisecond query latency.
+"""
+from __future__ import annotations
+
+import hashlib
+import re
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from typing import Any, Callable, List, Tuple
+
+import numpy as np
+
+DEFAULT_COLLECTION = "artifacts"
+DEFAULT_OPENAI_MODEL = "text-embedding-3-small"
+
+_WORD = re.compile(r"[^\W_]+", re.UNICODE)
+
+
+class EmbeddingProvider(ABC):
+    """A text embedding model."""
+
+    name = "base"
+    model = ""
+    dim = 0
+    cacheable = True  # worth the on-disk / query caches
+
+    @property
+    def collection(self) -> str:
+        """Qdrant collection (or alias) holding this provider's vectors."""
+        slug = re.sub(r"[^a-z0-9]+", "_", self.model.lower()).strip("_")
+        return f"{DEFAULT_COLLECTION}_{slug}"
+
+    @abstractmethod
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        """One vector of length :attr:`dim` per text, in input order."""
+
+
+class OpenAIProvider(EmbeddingProvider):
+    """OpenAI embeddings; *api* returns the ``openai`` module (resolved per call)."""
+
+    name = "openai"
+
+    def __init__(
+        self,
+        api: Callable[[], Any],
+        model: str = DEFAULT_OPENAI_MODEL,
+        dim: int = 1536,
+        batch: int = 64,
+    ):
+        self._api = api
+        self.model = model
+        self.dim = dim
+        self.batch = batch
+
+    @property
+    def collection(self) -> str:
+        # the original collection name stays with the original model
+        return DEFAULT_COLLECTION if self.model == DEFAULT_OPENAI_MODEL else super().collection
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        vectors: List[List[float]] = []
+        for i in range(0, len(texts), self.batch):
+            res = self._api().Embedding.create(model=self.model, input=texts[i:i + self.batch])
+            data = sorted(res["data"], key=lambda d: d.get("index", 0))
+            vectors.extend(d["embedding"] for d in data)
+        return vectors
+
+
+@lru_cache(maxsize=200_000)
+def _bucket(feature: str, dim: int) -> Tuple[int, float]:
+    h = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+    return h % dim, 1.0 if (h >> 63) & 1 else -1.0
+
+
+class HashingProvider(EmbeddingProvider):
+    """Local feature-hashing embeddings (unigrams + bigrams), no network."""
+
+    name = "local"
+    cacheable = False  # recomputing is cheaper than a cache lookup
+
+    def __init__(self, dim: int = 1024, bigram_weight: float = 0.5):
+        self.dim = dim
+        self.bigram_weight = bigram_weight
+        self.model = f"hash-v1-{dim}"
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        rows: List[int] = []
+        cols: List[int] = []
+        vals: List[float] = []
+        for r, text in enumerate(texts):
+            words = _WORD.findall(text.lower())
+            features = [(w, 1.0) for w in words]
+            features += [(f"{a} {b}", self.bigram_weight) for a, b in zip(words, words[1:])]
+            for feature, weight in features:
+                col, sign = _bucket(feature, self.dim)
+                rows.append(r)
+                cols.append(col)
+                vals.append(sign * weight)
+        mat = np.zeros((len(texts), self.dim), dtype=np.float32)
+        index = (np.asarray(rows, dtype=np.intp), np.asarray(cols, dtype=np.intp))
+        np.add.at(mat, index, np.asarray(vals, dtype=np.float32))
+        mat = np.sign(mat) * np.log1p(np.abs(mat))  # sublinear term frequency
+        norms = np.linalg.norm(mat, axis=1, keepdims=True)
+        mat /= np.where(norms == 0, 1.0, norms)
+        return mat.tolist()
+
+
+__all__ = ["DEFAULT_COLLECTION", "EmbeddingProvider", "HashingProvider", "OpenAIProvider"]
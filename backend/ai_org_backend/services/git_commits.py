@@ -0,0 +1,240 @@
+"""
+Coalesced git commits for the artefact workspace.
+
+Every tenant directory (``<WORKSPACE>/<tenant>``) is its own repository,
+created lazily on the first commit (:func:`tenant_repo`), so commits of
+different tenants never wait on the same ``index.lock``. Writes to one
+repository are serialized by a thread lock plus an ``flock`` on
+``.git/ai_org.lock`` across worker processes; :func:`split_shared_repo`
+moves the history of the former shared ``<WORKSPACE>/.git`` into the
+tenant repositories.
+
+``register_artefact`` used to fork ``git add`` + ``git commit`` for every
+file, so a scaffold run with dozens of files meant dozens of serialized
+commits. :class:`CommitCoalescer` commits them per task instead: the
+artefact outbox worker hands over a claimed batch grouped by task
+(:meth:`CommitCoalescer.commit`), and each group becomes one commit.
+Objects are written in-process with dulwich; without dulwich the group is
+committed with a single ``git add`` / ``git commit`` pair.
+
+Commit messages stay per task: a single file keeps the old
+``"<task>: add artefact <sha>"`` message, several files become
+``"<task>: add N artefacts"`` with one line per file in the body.
+"""
+from __future__ import annotations
+
+import subprocess
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Optional, Tuple, Type, cast
+
+if TYPE_CHECKING:
+    from dulwich.objects import ObjectID
+
+GitRepo: Optional[Type[Repo]]
+try:  # optional: in-process object writing
+    from dulwich.repo import Repo
+except ImportError:  # pragma: no cover - fall back to the git CLI
+    GitRepo = None
+else:
+    GitRepo = Repo
+
+if sys.platform != "win32":  # POSIX: serialize commits of one repository across processes
+    import fcntl
+
+LOCK_RETRIES = 5  # a manual git run may hold index.lock
+
+
+def init_repo(root: Path) -> None:
+    """Create the git repository at *root* if it does not exist yet."""
+    if (root / ".git").exists():
+        return
+    if GitRepo is not None:
+        GitRepo.init(str(root))
+    else:  # pragma: no cover
+        subprocess.run(["git", "init", "-q", str(root)], check=True)
+
+
+def tenant_repo(workspace: Path, tenant_id: str) -> Path:
+    """Repository root of *tenant_id*, initialised on first use."""
+    root = Path(workspace) / tenant_id
+    if root not in _initialised:
+        root.mkdir(parents=True, exist_ok=True)
+        init_repo(root)
+        _initialised.add(root)
+    return root
+
+
+_initialised: set = set()
+
+
+@contextmanager
+def _repo_lock(root: Path) -> Iterator[None]:
+    if sys.platform == "win32":  # pragma: no cover - thread lock only
+        yield
+        return
+    with open(root / ".git" / "ai_org.lock", "a") as fh:
+        fcntl.flock(fh, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(fh, fcntl.LOCK_UN)
+
+
+def _message(task_id: str, lines: List[str]) -> str:
+    if len(lines) == 1:
+        return lines[0]
+    verb = "update" if all(": update " in line for line in lines) else "add"
+    return f"{task_id}: {verb} {len(lines)} artefacts\n\n" + "\n".join(lines)
+
+
+class CommitCoalescer:
+    """Artefact writes of one repository, committed per task."""
+
+    def __init__(self, root: Path):
+        self.root = root
+        self._git_lock = threading.Lock()  # repository writes
+
+    def commit(self, task_id: str, entries: List[Tuple[str, str]]) -> None:
+        """Commit ``(path, message line)`` *entries* of *task_id* now; raises on failure."""
+        paths = list(dict.fromkeys(p for p, _ in entries))
+        self._commit(paths, _message(task_id, [m for _, m in entries]))
+
+    def _commit(self, paths: List[str], message: str) -> None:
+        with self._git_lock, _repo_lock(self.root):
+            for attempt in range(LOCK_RETRIES):
+                try:
+                    if GitRepo is not None:
+                        self._commit_dulwich(GitRepo, paths, message)
+                    else:  # pragma: no cover
+                        self._commit_cli(paths, message)
+                    return
+                except Exception:
+                    if attempt == LOCK_RETRIES - 1:
+                        raise
+                    time.sleep(0.05 * 2**attempt)
+
+    def _commit_dulwich(self, repo_cls: Type[Repo], paths: List[str], message: str) -> None:
+        repo = repo_cls(str(self.root))
+        try:
+            # dulwich >= 0.23 moved stage/commit to the worktree
+            wt: Any = repo.get_worktree() if hasattr(repo, "get_worktree") else repo
+            wt.stage(paths)
+            if hasattr(wt, "commit"):
+                wt.commit(message=message.encode("utf-8"))
+            else:  # pragma: no cover
+                wt.do_commit(message.encode("utf-8"))
+        finally:
+            repo.close()
+
+    def _commit_cli(self, paths: List[str], message: str) -> None:  # pragma: no cover
+        subprocess.run(["git", "-C", str(self.root), "add", "--", *paths], check=True)
+        subprocess.run(
+            ["git", "-C", str(self.root), "commit", "-m", message, "--quiet"], check=True
+        )
+
+
+_coalescers: Dict[Path, CommitCoalescer] = {}
+_registry_lock = threading.Lock()
+
+
+def coalescer(root: Path) -> CommitCoalescer:
+    """Shared coalescer for the repository at *root*."""
+    root = Path(root)
+    with _registry_lock:
+        if root not in _coalescers:
+            _coalescers[root] = CommitCoalescer(root)
+        return _coalescers[root]
+
+
+def _copy_tree(src, dst, tree_id: bytes) -> None:
+    """Copy tree *tree_id* and everything below it from *src* to *dst*."""
+    stack = [tree_id]
+    while stack:
+        oid = stack.pop()
+        if oid in dst.object_store:
+            continue
+        obj = src.object_store[oid]
+        dst.object_store.add_object(obj)
+        if obj.type_name == b"tree":
+            stack.extend(entry.sha for entry in obj.iteritems() if entry.mode != 0o160000)
+
+
+def split_shared_repo(workspace: Path, tenants: Optional[Iterable[str]] = None) -> Dict[str, int]:
+    """Give each tenant directory a repository with its history from ``<workspace>/.git``.
+
+    Commits of the shared repository are replayed (author, dates and message
+    kept) with the tenant subtree as root tree; commits that did not touch
+    the tenant are dropped. Tenants that already have a repository are
+    skipped. The working trees are not touched. Returns commits written per tenant.
+    """
+    from dulwich.objects import Commit, Tree
+    from dulwich.repo import Repo
+
+    workspace = Path(workspace)
+    shared = Repo(str(workspace))
+    try:
+        head = shared.head()
+    except KeyError:  # empty repository
+        shared.close()
+        return {}
+    order = [w.commit for w in shared.get_walker(include=[head], reverse=True)]
+    names = list(tenants) if tenants is not None else sorted(
+        p.name for p in workspace.iterdir() if p.is_dir() and not p.name.startswith(".")
+    )
+    result: Dict[str, int] = {}
+    try:
+        for name in names:
+            root = workspace / name
+            if not root.is_dir() or (root / ".git").exists():
+                continue
+            key = name.encode("utf-8")
+            mapped: Dict[ObjectID, Optional[ObjectID]] = {}  # shared commit → tenant commit
+            subtrees: Dict[ObjectID, Optional[ObjectID]] = {}
+            init_repo(root)
+            repo = Repo(str(root))
+            try:
+                written = 0
+                for c in order:
+                    tree = cast(Tree, shared.object_store[c.tree])
+                    sub = tree[key][1] if key in tree else None
+                    parents = [m for m in (mapped.get(p) for p in c.parents) if m]
+                    parent_trees = {subtrees[p] for p in c.parents if p in subtrees}
+                    if sub is None or (parents and parent_trees == {sub}):
+                        # tenant unchanged (or absent): keep pointing at the parent
+                        mapped[c.id] = parents[0] if parents else None
+                        subtrees[c.id] = sub
+                        continue
+                    _copy_tree(shared, repo, sub)
+                    new = Commit()
+                    new.tree = sub
+                    new.parents = list(dict.fromkeys(parents))
+                    for attr in ("author", "committer", "author_time", "author_timezone",
+                                 "commit_time", "commit_timezone", "encoding", "message"):
+                        setattr(new, attr, getattr(c, attr))
+                    repo.object_store.add_object(new)
+                    mapped[c.id] = new.id
+                    subtrees[c.id] = sub
+                    written += 1
+                tip = mapped.get(head)
+                if tip:
+                    repo[b"HEAD"] = tip
+                    # index from the files on disk: unchanged files show clean
+                    tracked = [
+                        e.path.decode("utf-8")
+                        for e in repo.object_store.iter_tree_contents(cast(Commit, repo[tip]).tree)
+                    ]
+                    wt: Any = repo.get_worktree() if hasattr(repo, "get_worktree") else repo
+                    wt.stage([p for p in tracked if (root / p).exists()])
+                result[name] = written
+            finally:
+                repo.close()
+    finally:
+        shared.close()
+    return result
+
+
+__all__ = ["CommitCoalescer", "coalescer", "init_repo", "split_shared_repo", "tenant_repo"]
@@ -2,15 +2,45 @@
 Graph sync helpers for Neo4j.
 Keeps Task nodes and dependency edges in sync with the SQL source of truth.
 Idempotent MERGE/SET operations, safe to call often.
+
+Writers do not call Neo4j themselves: :func:`mirror_task` and
+:func:`mirror_dependency` add outbox entries to the writer's SQL session, and
+the outbox workers deliver them per tenant as ``UNWIND $rows`` batches. Task
+entries only carry the id; the node gets the task's state *at delivery
+time*, so late or retried deliveries never roll the graph back.
 """
 from __future__ import annotations
 
-from typing import Optional
+import logging
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+from sqlmodel import Session, col, select
 
+from ai_org_backend.db import engine
+from ai_org_backend.models import OutboxEntry, Task
+from ai_org_backend.services import outbox
 from ai_org_backend.services.storage import driver  # existing Neo4j driver
 
+TOPIC_TASK = "graph.task"
+TOPIC_EDGE = "graph.edge"
+
+# batched writes, shared with the incremental ingest (``graph_ingest``)
+UPSERT_TASKS = """
+UNWIND $rows AS row
+MERGE (t:Task {id: row.id})
+SET t += row.props
+"""
+UPSERT_DEPENDENCIES = """
+UNWIND $rows AS row
+MERGE (p:Task {id: row.from})
+MERGE (c:Task {id: row.to})
+MERGE (p)-[r:DEPENDS_ON]->(c)
+SET r.kind = row.kind
+"""
+
 
-def _coerce_kind(kind: Optional[str]) -> str:
+def coerce_kind(kind: Optional[str]) -> str:
     """
     Normalize dependency kind. Default to FINISH_START if unknown/None.
     """
@@ -67,7 +97,7 @@ def upsert_dependency(from_id: str, to_id: str, *, kind: Optional[str] = None) -
     """
     MERGE edge (:Task {id:from})-[:DEPENDS_ON {kind:...}]->(:Task {id:to})
     """
-    k = _coerce_kind(kind)
+    k = coerce_kind(kind)
     cypher = """
     MERGE (p:Task {id:$from})
     MERGE (c:Task {id:$to})
@@ -86,3 +116,82 @@ def remove_dependency(from_id: str, to_id: str) -> None:
     """
     with driver.session() as g:
         g.run(cypher, **{"from": from_id, "to": to_id})
+
+
+# ---------- outbox (batched mirroring) ----------
+def mirror_task(session: Session, tenant_id: str, task_id: str) -> None:
+    """Schedule the Task node of *task_id* to be synced once *session* commits."""
+    outbox.enqueue(session, TOPIC_TASK, tenant_id, task_id, {})
+
+
+def mirror_dependency(
+    session: Session, tenant_id: str, from_id: str, to_id: str, kind: Optional[str] = None
+) -> None:
+    """Schedule a DEPENDS_ON edge to be merged once *session* commits."""
+    outbox.enqueue(
+        session, TOPIC_EDGE, tenant_id, f"{from_id}->{to_id}",
+        {"from": from_id, "to": to_id, "kind": coerce_kind(kind)},
+    )
+
+
+def task_props(t: Task) -> Dict[str, Any]:
+    props = {
+        "tenant": t.tenant_id,
+        "desc": t.description,
+        "status": getattr(t.status, "value", t.status),
+        "business_value": t.business_value,
+        "tokens_plan": t.tokens_plan,
+        "tokens_actual": t.tokens_actual,
+        "purpose_relevance": t.purpose_relevance,
+    }
+    return {k: v for k, v in props.items() if v is not None}
+
+
+def upsert_tasks(rows: List[Dict[str, Any]]) -> None:
+    """MERGE many Task nodes: rows of ``{"id", "props"}``."""
+    with driver.session() as g:
+        g.run(UPSERT_TASKS, rows=rows).consume()
+
+
+def upsert_dependencies(rows: List[Dict[str, Any]]) -> None:
+    """MERGE many DEPENDS_ON edges: rows of ``{"from", "to", "kind"}``."""
+    with driver.session() as g:
+        g.run(UPSERT_DEPENDENCIES, rows=rows).consume()
+
+
+def _per_tenant(entries: List[OutboxEntry], write) -> Dict[int, str]:
+    groups: Dict[str, List[OutboxEntry]] = defaultdict(list)
+    for entry in entries:
+        groups[entry.tenant_id].append(entry)
+    failed: Dict[int, str] = {}
+    for tenant_id, group in groups.items():
+        try:
+            write(group)
+        except Exception as exc:
+            logging.getLogger(__name__).warning(
+                "Graph mirror for tenant %s failed: %s", tenant_id, exc
+            )
+            failed.update({outbox.id_of(e): f"neo4j: {exc}" for e in group})
+    return failed
+
+
+@outbox.handler(TOPIC_TASK, max_attempts=0)
+def _deliver_tasks(entries: List[OutboxEntry]) -> Dict[int, str]:
+    def write(group: List[OutboxEntry]) -> None:
+        ids = list({e.ref_id for e in group})
+        with Session(engine) as session:
+            tasks = session.exec(select(Task).where(col(Task.id).in_(ids))).all()
+            rows = [{"id": t.id, "props": task_props(t)} for t in tasks]
+        if rows:
+            upsert_tasks(rows)
+
+    return _per_tenant(entries, write)
+
+
+@outbox.handler(TOPIC_EDGE, max_attempts=0)
+def _deliver_dependencies(entries: List[OutboxEntry]) -> Dict[int, str]:
+    def write(group: List[OutboxEntry]) -> None:
+        rows = list({(p["from"], p["to"]): p for p in map(outbox.payload, group)}.values())
+        upsert_dependencies(rows)
+
+    return _per_tenant(entries, write)
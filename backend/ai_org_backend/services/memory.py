@@ -8,7 +8,7 @@ from typing import Any, Dict, List, Optional
 from ai_org_backend.db import SessionLocal
 from ai_org_backend.metrics import prom_counter
 from ai_org_backend.models import Task
-from ai_org_backend.services.storage import vector_store
+from ai_org_backend.services.storage import read_artefact, vector_store
 
 RETRIEVED_SNIPPETS = prom_counter(
     "ai_retrieved_snippets_total",
@@ -90,13 +90,15 @@ def get_relevant_snippets(
     seen_shas = set()
     seen_previews = set()
     for res in deduplicated_results:
-        file_path = Path("workspace") / res.payload.get("file", "")
-        content = ""
-        try:
-            content = file_path.read_text(encoding="utf-8", errors="ignore")
-        except Exception:
-            content = ""
         sha = res.payload.get("sha")
+        # the matching chunk; older points carry no text, read the file head then
+        content = res.payload.get("text") or ""
+        if not content:
+            try:
+                data = read_artefact(tenant_id, res.payload.get("file", ""), sha, 2048)
+                content = data.decode("utf-8", errors="ignore") if data else ""
+            except Exception:
+                content = ""
         if sha:
             if sha in seen_shas:
                 continue
@@ -0,0 +1,270 @@
+"""
+Transactional outbox for side effects of SQL writes.
+
+Work that talks to slow or flaky services (embedding, git, the Neo4j mirror)
+is not done by the writer. The writer adds :class:`OutboxEntry` rows in the same session
+as its own rows, so they commit (or roll back) together, and returns. A
+dedicated worker pool (Celery queue ``OUTBOX_QUEUE``) drains the table:
+
+* entries are claimed in batches with a lease, so concurrent workers never
+  run the same entry and a crashed worker's claim simply expires;
+* each topic has one batch handler (:func:`handler`); handlers must be
+  idempotent because an entry can run again after a lease expired. The
+  modules registering them (``HANDLER_MODULES``) are imported before the
+  first batch, and entries of topics without a handler are never claimed;
+* results are written back only while the worker's claim token is still on
+  the row, so a worker whose lease expired cannot overwrite the outcome of
+  the worker that re-claimed the entry;
+* failed entries come back after a jittered exponential backoff
+  (:func:`retry_queue.backoff_delay`) and are parked as ``dead`` after
+  ``OUTBOX_MAX_ATTEMPTS`` (per topic; mirroring topics retry until
+  delivered); done entries are deleted.
+"""
+from __future__ import annotations
+
+import importlib
+import json
+import logging
+import os
+import uuid
+from datetime import datetime as dt
+from datetime import timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from sqlalchemy import delete, func, update
+from sqlalchemy.engine import Engine
+from sqlmodel import Session, col, select
+
+from ai_org_backend.models import OutboxEntry
+from ai_org_backend.orchestrator.retry_queue import backoff_delay, classify_error
+from ai_org_backend.services.redis_client import get_redis
+
+OUTBOX_QUEUE = os.getenv("OUTBOX_QUEUE", "artefacts")
+OUTBOX_BATCH = int(os.getenv("OUTBOX_BATCH", "100"))
+OUTBOX_LEASE_S = float(os.getenv("OUTBOX_LEASE_S", "300"))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "8"))
+DRAIN_TASK = "outbox.drain"
+_KICK_KEY = "ai_org:outbox:kick"
+
+# topic → handler(entries) → {entry id: error} for the entries that failed
+BatchHandler = Callable[[List[OutboxEntry]], Dict[int, str]]
+HANDLERS: Dict[str, BatchHandler] = {}
+MAX_ATTEMPTS: Dict[str, int] = {}  # per topic; 0 = retry until delivered
+# modules whose import registers the production handlers (loaded lazily: they import us)
+HANDLER_MODULES = ("ai_org_backend.services.storage", "ai_org_backend.services.graph_sync")
+_handlers_loaded = False
+
+
+def handler(
+    topic: str, max_attempts: Optional[int] = None
+) -> Callable[[BatchHandler], BatchHandler]:
+    """Register the batch handler of *topic* (the latest registration wins)."""
+
+    def deco(fn: BatchHandler) -> BatchHandler:
+        HANDLERS[topic] = fn
+        if max_attempts is not None:
+            MAX_ATTEMPTS[topic] = max_attempts
+        return fn
+
+    return deco
+
+
+def load_handlers() -> None:
+    """Import ``HANDLER_MODULES`` once, so every process can run every topic."""
+    global _handlers_loaded
+    if not _handlers_loaded:
+        for name in HANDLER_MODULES:
+            importlib.import_module(name)
+        _handlers_loaded = True
+
+
+def enqueue(
+    session: Session, topic: str, tenant_id: str, ref_id: str, payload: Dict[str, Any]
+) -> OutboxEntry:
+    """Add an entry to *session*; it becomes visible when the caller commits."""
+    entry = OutboxEntry(
+        topic=topic, tenant_id=tenant_id, ref_id=ref_id, payload=json.dumps(payload)
+    )
+    session.add(entry)
+    return entry
+
+
+def payload(entry: OutboxEntry) -> Dict[str, Any]:
+    return json.loads(entry.payload or "{}")
+
+
+def id_of(entry: OutboxEntry) -> int:
+    """Primary key of a claimed (hence persisted) entry; handlers key failures by it."""
+    if entry.id is None:
+        raise ValueError("outbox entry has not been flushed")
+    return entry.id
+
+
+def claim(
+    engine: Engine, limit: int = OUTBOX_BATCH, topics: Optional[Iterable[str]] = None
+) -> List[OutboxEntry]:
+    """Lease up to *limit* due entries for this worker."""
+    now = dt.utcnow()
+    token = str(uuid.uuid4())
+    with Session(engine) as session:
+        due = (
+            select(OutboxEntry.id)
+            .where(OutboxEntry.status == "pending", OutboxEntry.available_at <= now)
+            .order_by(col(OutboxEntry.id))
+            .limit(limit)
+        )
+        if topics is not None:
+            due = due.where(col(OutboxEntry.topic).in_(list(topics)))
+        ids = list(session.exec(due).all())
+        if not ids:
+            return []
+        # re-check due-ness so a concurrent claim of the same ids loses
+        session.execute(
+            update(OutboxEntry)
+            .where(
+                col(OutboxEntry.id).in_(ids),
+                col(OutboxEntry.status) == "pending",
+                col(OutboxEntry.available_at) <= now,
+            )
+            .values(
+                claim=token,
+                available_at=now + timedelta(seconds=OUTBOX_LEASE_S),
+                attempts=OutboxEntry.attempts + 1,
+            )
+        )
+        session.commit()
+        rows = session.exec(
+            select(OutboxEntry).where(OutboxEntry.claim == token).order_by(col(OutboxEntry.id))
+        ).all()
+        for row in rows:
+            session.expunge(row)
+        return list(rows)
+
+
+def _finish(
+    engine: Engine, done: List[int], failed: Dict[int, str], entries: Dict[int, OutboxEntry]
+) -> None:
+    """Delete done and reschedule failed entries that are still claimed by us."""
+    now = dt.utcnow()
+    with Session(engine) as session:
+        if done:
+            token = entries[done[0]].claim  # one claim per batch
+            session.execute(
+                delete(OutboxEntry).where(
+                    col(OutboxEntry.id).in_(done), col(OutboxEntry.claim) == token
+                )
+            )
+        for entry_id, err in failed.items():
+            entry = entries[entry_id]
+            limit = MAX_ATTEMPTS.get(entry.topic, OUTBOX_MAX_ATTEMPTS)
+            dead = bool(limit) and entry.attempts >= limit
+            delay = backoff_delay(classify_error(err), entry.attempts - 1)
+            session.execute(
+                update(OutboxEntry)
+                .where(col(OutboxEntry.id) == entry_id, col(OutboxEntry.claim) == entry.claim)
+                .values(
+                    status="dead" if dead else "pending",
+                    available_at=now + timedelta(seconds=delay),
+                    claim=None,
+                    last_error=err[:2000],
+                )
+            )
+            log = logging.getLogger(__name__)
+            if dead:
+                log.error("Outbox %s entry %s for %s gave up after %s attempts: %s",
+                          entry.topic, entry_id, entry.ref_id, entry.attempts, err)
+            else:
+                log.warning("Outbox %s entry %s for %s failed (attempt %s, retry in %.0fs): %s",
+                            entry.topic, entry_id, entry.ref_id, entry.attempts, delay, err)
+        session.commit()
+
+
+def process(
+    engine: Engine, limit: int = OUTBOX_BATCH, topics: Optional[Iterable[str]] = None
+) -> int:
+    """Claim one batch and run it through the topic handlers; returns entries handled.
+
+    Only topics with a registered handler are claimed; other entries stay
+    pending (without using up attempts) for a process that can run them.
+    """
+    load_handlers()
+    handled = [t for t in (HANDLERS if topics is None else topics) if t in HANDLERS]
+    if not handled:
+        return 0
+    entries = claim(engine, limit, handled)
+    by_topic: Dict[str, List[OutboxEntry]] = {}
+    for entry in entries:
+        by_topic.setdefault(entry.topic, []).append(entry)
+    failed: Dict[int, str] = {}
+    for topic, batch in by_topic.items():
+        try:
+            failed.update(HANDLERS[topic](batch))
+        except Exception as exc:
+            failed.update({id_of(e): f"{type(exc).__name__}: {exc}" for e in batch})
+    done = [id_of(e) for e in entries if id_of(e) not in failed]
+    if entries:
+        _finish(engine, done, failed, {id_of(e): e for e in entries})
+    return len(entries)
+
+
+def drain(engine: Engine, max_batches: int = 50) -> int:
+    """Process batches until nothing is due (or *max_batches* ran)."""
+    total = 0
+    for _ in range(max_batches):
+        n = process(engine)
+        total += n
+        if n < OUTBOX_BATCH:
+            break
+    return total
+
+
+def due_count(session: Session) -> int:
+    now = dt.utcnow()
+    return session.exec(
+        select(func.count())
+        .select_from(OutboxEntry)
+        .where(OutboxEntry.status == "pending", OutboxEntry.available_at <= now)
+    ).one()
+
+
+def kick_or_drain(engine: Engine) -> None:
+    """After a write: wake the workers, or drain in-line when there is no broker."""
+    if not kick():
+        drain(engine)
+
+
+def kick(debounce_ms: int = 1000) -> bool:
+    """Ask the outbox workers to drain; at most one request per *debounce_ms*."""
+    r = get_redis()
+    if r is None:
+        return False
+    try:
+        if not r.set(_KICK_KEY, "1", nx=True, px=debounce_ms):
+            return True
+        from ai_org_backend.tasks.celery_app import celery
+
+        celery.send_task(DRAIN_TASK, queue=OUTBOX_QUEUE)
+        return True
+    except Exception as exc:  # pragma: no cover
+        logging.getLogger(__name__).warning("Outbox kick failed: %s", exc)
+        return False
+
+
+__all__ = [
+    "DRAIN_TASK",
+    "HANDLERS",
+    "HANDLER_MODULES",
+    "MAX_ATTEMPTS",
+    "OUTBOX_QUEUE",
+    "claim",
+    "drain",
+    "due_count",
+    "enqueue",
+    "handler",
+    "id_of",
+    "kick",
+    "kick_or_drain",
+    "load_handlers",
+    "payload",
+    "process",
+]
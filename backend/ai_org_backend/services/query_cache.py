@@ -0,0 +1,115 @@
+"""
+Cache of query embeddings for context retrieval.
+
+``memory.get_relevant_snippets`` (every agent run) and ``/api/context`` (every
+frontend view) embed the task description as search query; descriptions
+rarely change across retries and re-renders. :class:`QueryVectorCache` keeps
+those vectors in an in-process LRU and in Redis (shared by API replicas and
+workers), both with ``QUERY_CACHE_TTL_S``. Keys are the SHA-256 of embedding
+model, tenant and normalised query text, so switching ``EMBEDDING_MODEL``
+never serves a vector from the old model.
+"""
+from __future__ import annotations
+
+import base64
+import hashlib
+import logging
+import os
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from typing import Callable, List, Optional, Tuple
+
+from ai_org_backend.metrics import prom_counter
+from ai_org_backend.orchestrator.role_cache import normalize
+from ai_org_backend.services.redis_client import get_redis
+
+QUERY_CACHE_TTL_S = int(os.getenv("QUERY_CACHE_TTL_S", "3600"))
+QUERY_CACHE_MAX = int(os.getenv("QUERY_CACHE_MAX", "2048"))  # in-process entries
+
+_PREFIX = "ai_org:qvec:"
+
+QUERY_CACHE_LOOKUPS = prom_counter(
+    "ai_query_embedding_cache_total",
+    "Query embedding lookups by result (memory/redis/miss)",
+    ("result",),
+)
+
+
+def _encode(vector: List[float]) -> str:
+    return base64.b64encode(array("f", vector).tobytes()).decode("ascii")
+
+
+def _decode(data: str) -> List[float]:
+    return array("f", base64.b64decode(data)).tolist()
+
+
+class QueryVectorCache:
+    """(model, tenant, query) → vector, in memory and Redis, with TTL."""
+
+    def __init__(self, ttl_s: int = QUERY_CACHE_TTL_S, max_entries: int = QUERY_CACHE_MAX):
+        self.ttl_s = ttl_s
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._mem: "OrderedDict[str, Tuple[List[float], float]]" = OrderedDict()
+
+    def key(self, model: str, tenant_id: str, query: str) -> str:
+        return hashlib.sha256(f"{model}|{tenant_id}|{normalize(query)}".encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[List[float]]:
+        now = time.time()
+        with self._lock:
+            item = self._mem.get(key)
+            if item and item[1] >= now:
+                self._mem.move_to_end(key)
+                QUERY_CACHE_LOOKUPS.labels("memory").inc()
+                return item[0]
+            if item:
+                del self._mem[key]
+        r = get_redis()
+        if r is not None:
+            try:
+                data = r.get(_PREFIX + key)
+                if data:
+                    vector = _decode(data)
+                    self._remember(key, vector)
+                    QUERY_CACHE_LOOKUPS.labels("redis").inc()
+                    return vector
+            except Exception as exc:  # pragma: no cover - cache is best effort
+                logging.getLogger(__name__).warning("Query cache read failed: %s", exc)
+        QUERY_CACHE_LOOKUPS.labels("miss").inc()
+        return None
+
+    def set(self, key: str, vector: List[float]) -> None:
+        self._remember(key, vector)
+        r = get_redis()
+        if r is not None:
+            try:
+                r.set(_PREFIX + key, _encode(vector), ex=self.ttl_s)
+            except Exception as exc:  # pragma: no cover
+                logging.getLogger(__name__).warning("Query cache write failed: %s", exc)
+
+    def _remember(self, key: str, vector: List[float]) -> None:
+        with self._lock:
+            self._mem[key] = (vector, time.time() + self.ttl_s)
+            self._mem.move_to_end(key)
+            while len(self._mem) > self.max_entries:
+                self._mem.popitem(last=False)
+
+    def vector(
+        self, model: str, tenant_id: str, query: str, compute: Callable[[], List[float]]
+    ) -> List[float]:
+        """Cached vector of *query*; *compute* runs only on a miss."""
+        key = self.key(model, tenant_id, query)
+        vector = self.get(key)
+        if vector is None:
+            vector = compute()
+            self.set(key, vector)
+        return vector
+
+
+query_cache = QueryVectorCache()
+
+
+__all__ = ["QUERY_CACHE_LOOKUPS", "QueryVectorCache", "query_cache"]
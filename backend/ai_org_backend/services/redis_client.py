@@ -0,0 +1,68 @@
+"""Shared Redis connection with graceful fallback.
+
+Callers receive ``None`` while Redis is unreachable (or ``REDIS_URL`` is set
+to an empty string) and are expected to switch to an in-process fallback (see
+:mod:`budget`). ``REDIS_URL`` defaults to the same URL as ``main``/``config``.
+A failed connection is not remembered forever: resolution is retried after a
+backoff (``REDIS_RETRY_S``, doubling up to ``REDIS_RETRY_MAX_S``), so a Redis
+that comes up after the API or the workers is picked up without a restart.
+"""
+from __future__ import annotations
+
+import logging
+import math
+import os
+import threading
+import time
+from typing import Any, Optional
+
+from ai_org_backend.config import REDIS_URL
+
+try:  # pragma: no cover - optional redis import
+    import redis  # type: ignore
+except Exception:  # pragma: no cover
+    redis = None  # type: ignore
+
+REDIS_RETRY_S = float(os.getenv("REDIS_RETRY_S", "1"))
+REDIS_RETRY_MAX_S = float(os.getenv("REDIS_RETRY_MAX_S", "30"))
+REDIS_CONNECT_TIMEOUT_S = float(os.getenv("REDIS_CONNECT_TIMEOUT_S", "2"))
+
+_lock = threading.Lock()
+# redis-py types every sync reply as ``Awaitable[Any] | Any``; callers treat replies as values
+_client: Optional[Any] = None
+_next_try = 0.0  # monotonic time of the next connection attempt
+_delay = REDIS_RETRY_S
+
+
+def get_redis() -> Optional[Any]:
+    """Return a process-wide Redis client or ``None`` if not available (yet)."""
+    global _client, _next_try, _delay
+    if _client is not None or time.monotonic() < _next_try:
+        return _client
+    with _lock:
+        if _client is not None or time.monotonic() < _next_try:
+            return _client
+        url = os.getenv("REDIS_URL", REDIS_URL)
+        if not url or not redis:
+            _next_try = math.inf  # disabled, nothing to retry
+            return None
+        try:
+            r = redis.Redis.from_url(
+                url, decode_responses=True, socket_connect_timeout=REDIS_CONNECT_TIMEOUT_S
+            )
+            r.ping()
+            _client = r
+            _delay = REDIS_RETRY_S
+        except Exception as exc:
+            logging.getLogger(__name__).debug("Redis unavailable, retry in %.0f s: %s", _delay, exc)
+            _next_try = time.monotonic() + _delay
+            _delay = min(_delay * 2, REDIS_RETRY_MAX_S)
+    return _client
+
+
+def redis_enabled() -> bool:
+    """Whether Redis is configured at all (non-empty ``REDIS_URL``, client installed)."""
+    return bool(redis) and bool(os.getenv("REDIS_URL", REDIS_URL))
+
+
+__all__ = ["get_redis", "redis_enabled"]
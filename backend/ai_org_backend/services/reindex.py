@@ -0,0 +1,215 @@
+"""
+Rebuild the ``artifacts`` vector collection from the SQL artefact table.
+
+Needed after an embedding model or provider change (every provider has its own
+collection, see :mod:`.embeddings`), a Qdrant loss or a payload schema
+change, without re-running any agent. :func:`reindex` writes into a fresh
+collection ``artifacts_<timestamp>`` while queries keep using the current one
+and then swaps the ``artifacts`` alias onto it (blue/green, see
+:meth:`VectorStore.swap_alias`); the previous collection is dropped with
+``drop_previous``, otherwise it is logged and left for manual removal. Per
+tenant, the newest artefact of every path is streamed in keyset pages of
+``batch`` rows; files are read by ``readers`` threads and each page is
+chunked, embedded in batches (through the embedding cache, so unchanged text
+costs nothing) and upserted in one call.
+
+Progress is kept in a JSON checkpoint after every page; a rerun with the same
+checkpoint resumes in the same target collection. Artefacts registered while
+the reindex ran are indexed in a catch-up pass after the swap.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime as dt
+from datetime import timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import and_, exists
+from sqlalchemy.orm import aliased
+from sqlmodel import Session, col, select
+
+from ai_org_backend.db import engine
+from ai_org_backend.models import Artifact, Task
+from ai_org_backend.services.storage import read_artefact, should_embed, vector_store
+from ai_org_backend.services.vector_store import INDEX_MAX_BYTES
+
+REINDEX_BATCH = 200
+REINDEX_READERS = 8
+
+Row = Tuple[str, str, str, str, str]  # artefact id, task id, repo path, sha256, tenant
+
+
+def _tenants(session: Session) -> List[str]:
+    return sorted(
+        session.exec(
+            select(Task.tenant_id).join(Artifact, col(Artifact.task_id) == col(Task.id)).distinct()
+        ).all()
+    )
+
+
+def _pages(tenant: str, after: str, batch: int, since: Optional[dt] = None) -> Iterator[List[Row]]:
+    """Newest artefact per path of *tenant*, ordered by id, *batch* rows at a time."""
+    newer = aliased(Artifact)
+    while True:
+        with Session(engine) as session:
+            q = (
+                select(  # type: ignore[call-overload]  # sqlmodel types at most 4 columns
+                    Artifact.id,
+                    Artifact.task_id,
+                    Artifact.repo_path,
+                    Artifact.sha256,
+                    Task.tenant_id,
+                )
+                .join(Task, col(Task.id) == col(Artifact.task_id))
+                .where(
+                    Task.tenant_id == tenant,
+                    Artifact.id > after,
+                    ~exists().where(
+                        and_(
+                            col(newer.repo_path) == col(Artifact.repo_path),
+                            col(newer.created_at) > col(Artifact.created_at),
+                        )
+                    ),
+                )
+                .order_by(Artifact.id)
+                .limit(batch)
+            )
+            if since is not None:
+                q = q.where(Artifact.created_at >= since)
+            rows = list(session.exec(q).all())
+        if not rows:
+            return
+        yield rows
+        if len(rows) < batch:
+            return
+        after = rows[-1][0]
+
+
+def _read(row: Row) -> Optional[str]:
+    try:
+        data = read_artefact(row[4], row[2], row[3], INDEX_MAX_BYTES)
+    except Exception as exc:
+        logging.getLogger(__name__).warning("Reindex: artefact %s unreadable: %s", row[0], exc)
+        return None
+    return data.decode("utf-8", errors="ignore") if data else None
+
+
+def _index_tenant(
+    tenant: str,
+    target: Optional[str],
+    after: str,
+    batch: int,
+    pool: ThreadPoolExecutor,
+    stats: Dict[str, Any],
+    since: Optional[dt] = None,
+    on_page: Optional[Callable[[str], None]] = None,
+) -> None:
+    log = logging.getLogger(__name__)
+    for rows in _pages(tenant, after, batch, since):
+        docs: List[Tuple[str, str, Optional[Dict[str, Any]]]] = [
+            (row[0], text, {"task": row[1], "file": row[2], "sha": row[3]})
+            for row, text in zip(rows, pool.map(_read, rows))
+            if text and should_embed(text)
+        ]
+        if docs:
+            res = vector_store.index_artifacts(tenant, docs, collection=target, stats=stats)
+            failed = [a for a, ok in res.items() if not ok]
+            if failed:
+                raise RuntimeError(
+                    f"indexing failed for {len(failed)} artefacts of {tenant}, e.g. {failed[0]}"
+                )
+        stats["artefacts"] = stats.get("artefacts", 0) + len(docs)
+        stats["skipped"] = stats.get("skipped", 0) + len(rows) - len(docs)
+        elapsed = max(time.monotonic() - stats["t0"], 1e-6)
+        log.info(
+            "Reindex %s: %d artefacts, %.1f chunks/s, %.0f tokens/s",
+            tenant,
+            stats["artefacts"],
+            stats.get("chunks", 0) / elapsed,
+            stats.get("tokens", 0) / elapsed,
+        )
+        if on_page:
+            on_page(rows[-1][0])
+
+
+def reindex(
+    tenants: Optional[List[str]] = None,
+    checkpoint: Optional[Path] = None,
+    swap: bool = True,
+    batch: int = REINDEX_BATCH,
+    readers: int = REINDEX_READERS,
+    drop_previous: bool = False,
+) -> Dict[str, Any]:
+    """Re-embed artefacts into a new collection and swap it in; returns throughput stats."""
+    if vector_store.client is None:
+        raise RuntimeError("Qdrant is not configured (QDRANT_URL)")
+    state = json.loads(checkpoint.read_text()) if checkpoint and checkpoint.exists() else {}
+    if not state:
+        state = {
+            "target": vector_store.versioned_name(),
+            "started_at": dt.utcnow().isoformat(),
+            "tenants": {},
+        }
+    target = state["target"]
+    vector_store.create_collection(target)
+
+    def save() -> None:
+        if checkpoint:
+            tmp = checkpoint.with_suffix(".tmp")
+            tmp.write_text(json.dumps(state, indent=2))
+            tmp.replace(checkpoint)
+
+    stats: Dict[str, Any] = {"t0": time.monotonic()}
+    with Session(engine) as session:
+        names = tenants or _tenants(session)
+    with ThreadPoolExecutor(max_workers=readers) as pool:
+        for tenant in names:
+            done = state["tenants"].get(tenant, "")
+            if done == "done":
+                continue
+
+            def on_page(last_id: str, tenant: str = tenant) -> None:
+                state["tenants"][tenant] = last_id
+                save()
+
+            _index_tenant(tenant, target, done, batch, pool, stats, on_page=on_page)
+            state["tenants"][tenant] = "done"
+            save()
+
+        if swap:
+            previous = vector_store.swap_alias(target)
+            if previous != target:  # a rerun after the swap keeps the recorded one
+                state["swapped_from"] = previous
+                save()
+            # artefacts registered meanwhile went to the old collection
+            since = dt.fromisoformat(state["started_at"]) - timedelta(minutes=1)
+            for tenant in names:
+                _index_tenant(tenant, None, "", batch, pool, stats, since=since)
+
+    previous = state.get("swapped_from")
+    if previous and previous != target:
+        if drop_previous:
+            vector_store.drop_collection(previous)
+            state["swapped_from"] = None
+            save()
+        else:
+            logging.getLogger(__name__).info(
+                "Reindex: previous collection %s can be dropped", previous
+            )
+
+    elapsed = max(time.monotonic() - stats.pop("t0"), 1e-6)
+    stats.update(
+        seconds=elapsed,
+        chunks_per_s=stats.get("chunks", 0) / elapsed,
+        tokens_per_s=stats.get("tokens", 0) / elapsed,
+        target=target,
+        previous=previous,
+    )
+    return stats
+
+
+__all__ = ["reindex"]
@@ -1,23 +1,26 @@
 from __future__ import annotations
 
-import hashlib
 import mimetypes
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime as dt
 import os
 import logging
-import shutil
-import subprocess
-import time
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
 
 from neo4j import GraphDatabase
-from sqlmodel import Session
+from sqlmodel import Session, col, select
 
 from ai_org_backend.db import engine
-from ai_org_backend.models import Artifact, Task
+from ai_org_backend.models import Artifact, OutboxEntry, Task
 from ai_org_backend.metrics import prom_counter
-from .vector_store import VectorStore
+from ai_org_backend.utils.ingest import EMBED_MIN_WORDS
+from . import outbox
+from .blob_backend import get_backend
+from .blob_store import BLOB_DIR, find_artifact
+from .git_commits import coalescer, tenant_repo
+from .redis_client import get_redis
+from .vector_store import INDEX_MAX_BYTES, VectorStore
 
 WORKSPACE = Path.cwd() / "workspace"
 WORKSPACE.mkdir(exist_ok=True)
@@ -32,16 +35,17 @@ vector_store = VectorStore()
 ARTIFACT_UPDATES = prom_counter(
     "ai_artifact_updates_total", "Count of artefacts overwritten via register_artefact"
 )
+ARTIFACT_DEDUPED = prom_counter(
+    "ai_artifact_dedup_total", "Count of artefacts registered with content already in the workspace"
+)
 
-# retry settings for vector persistence
-VECTOR_STORE_RETRIES = 3
-
-if not (WORKSPACE / ".git").exists():
-    subprocess.run(["git", "init", "-q", str(WORKSPACE)], check=True)
+GIT_COMMIT_WORKERS = int(os.getenv("GIT_COMMIT_WORKERS", "4"))  # tenants committed in parallel
 
+# outbox topics of the post-processing stage
+TOPIC_EMBED = "artefact.embed"
+TOPIC_GIT = "artefact.git"
+TOPIC_GRAPH = "artefact.graph"
 
-def _sha256(p: Path) -> str:
-    return hashlib.sha256(p.read_bytes()).hexdigest()
 
 
 def _mime(p: Path) -> str:
@@ -49,49 +53,102 @@ def _mime(p: Path) -> str:
     return mt or "application/octet-stream"
 
 
-def _git_commit(rel_path: str, message: str) -> None:
-    subprocess.run(["git", "-C", str(WORKSPACE), "add", rel_path], check=True)
-    subprocess.run(
-        [
-            "git",
-            "-C",
-            str(WORKSPACE),
-            "commit",
-            "-m",
-            message,
-            "--quiet",
-        ],
-        check=True,
-    )
+# (tenant, repo_path) → resolved file; entries are re-validated with a stat on use
+_PATHS: Dict[Tuple[str, str], Path] = {}
+_PATHS_MAX = int(os.getenv("ARTIFACT_PATH_CACHE", "4096"))
 
 
-def _link_neo4j(task_id: str, artefact_sha: str) -> None:
-    """Link artifact to task in Neo4j graph, ensuring both nodes and relation exist."""
-    try:
-        # Ensure the task exists in graph (merge on id). Fetch task info for meaningful properties.
-        with Session(engine) as session:
-            task_obj = session.get(Task, task_id)
-            t_status = str(task_obj.status) if task_obj else "todo"
-            t_desc = task_obj.description if task_obj else ""
-        with driver.session() as g:
-            g.run(
-                """
-                MERGE (t:Task {id:$tid})
-                  ON CREATE SET t.status=$status, t.desc=$desc, t.created_at=$ts
-                MERGE (a:Artifact {sha256:$sha})
-                  ON CREATE SET a.created_at=$ts
-                MERGE (t)-[:PRODUCED]->(a)
-                """,
-                tid=task_id,
-                sha=artefact_sha,
-                status=t_status,
-                desc=t_desc[:200],
-                ts=dt.utcnow().isoformat(),
-            )
-    except Exception as exc:
-        logging.getLogger(__name__).error(
-            f"Neo4j link failed for Task {task_id}, Artifact {artefact_sha[:8]}: {exc}"
-        )
+def artifact_path(tenant_id: str, repo_path: str) -> Optional[Path]:
+    """Resolve the file of an artefact inside the tenant workspace.
+
+    ``repo_path`` is relative to ``WORKSPACE`` and starts with the tenant
+    (``<tenant>/<file>``); older rows and ``Artifact.create_from_file`` store
+    it relative to the tenant directory. Both layouts are accepted, paths
+    outside the tenant directory never are. Returns ``None`` if there is no file.
+    """
+    key = (tenant_id, repo_path)
+    hit = _PATHS.get(key)
+    if hit is not None and hit.is_file():
+        return hit
+    _PATHS.pop(key, None)
+    tenant_dir = (WORKSPACE / tenant_id).resolve()
+    for cand in (WORKSPACE / repo_path, tenant_dir / repo_path):
+        cand = cand.resolve()
+        if cand.is_relative_to(tenant_dir) and cand.is_file():
+            if len(_PATHS) >= _PATHS_MAX:
+                _PATHS.clear()
+            _PATHS[key] = cand
+            return cand
+    return None
+
+
+def artefact_file(tenant_id: str, repo_path: str, sha: Optional[str] = None) -> Optional[Path]:
+    """Local file with the artefact content: the blob (fetched from the storage
+    backend if needed), else the file in the tenant workspace."""
+    if sha:
+        path = get_backend(WORKSPACE / BLOB_DIR).local_path(sha)
+        if path is not None:
+            return path
+    return artifact_path(tenant_id, repo_path)
+
+
+def has_blob(sha: str) -> bool:
+    """Whether the immutable blob *sha* exists (artefacts before the blob store have none)."""
+    return bool(sha) and get_backend(WORKSPACE / BLOB_DIR).exists(sha)
+
+
+def read_artefact(
+    tenant_id: str, repo_path: str, sha: Optional[str] = None, limit: int = -1
+) -> Optional[bytes]:
+    path = artefact_file(tenant_id, repo_path, sha)
+    if path is None:
+        return None
+    with open(path, "rb") as fh:
+        return fh.read(limit)
+
+
+def _git_commit(entries: List[Tuple[str, str]], task_id: str) -> None:
+    """Commit ``(path, message line)`` *entries* of one task as one commit
+    in the repository of the tenant (first path component)."""
+    by_tenant: Dict[str, List[Tuple[str, str]]] = {}
+    for path, line in entries:
+        tenant, _, rel = path.partition("/")
+        by_tenant.setdefault(tenant, []).append((rel, line))
+    for tenant, items in by_tenant.items():
+        coalescer(tenant_repo(WORKSPACE, tenant)).commit(task_id, items)
+
+
+LINK_ARTEFACTS = """
+UNWIND $rows AS row
+MERGE (t:Task {id:row.tid})
+  ON CREATE SET t.status=row.status, t.desc=row.desc, t.created_at=$ts
+MERGE (a:Artifact {sha256:row.sha})
+  ON CREATE SET a.created_at=$ts
+MERGE (t)-[:PRODUCED]->(a)
+"""
+
+
+def _link_neo4j(links: List[Tuple[str, str]]) -> None:
+    """Link artifacts to tasks (``(task_id, sha)`` pairs) in one UNWIND batch,
+    ensuring both nodes and relation exist."""
+    # Ensure the task exists in graph (merge on id). Fetch task info for meaningful properties.
+    with Session(engine) as session:
+        linked = {tid for tid, _ in links}
+        tasks = {
+            t.id: t for t in session.exec(select(Task).where(col(Task.id).in_(linked))).all()
+        }
+    ts = dt.utcnow().isoformat()
+    rows = []
+    for task_id, sha in links:
+        task_obj = tasks.get(task_id)
+        rows.append({
+            "tid": task_id,
+            "sha": sha,
+            "status": getattr(task_obj.status, "value", task_obj.status) if task_obj else "todo",
+            "desc": (task_obj.description if task_obj else "")[:200],
+        })
+    with driver.session() as g:
+        g.run(LINK_ARTEFACTS, rows=rows, ts=ts).consume()
 
 
 def should_embed(text: str) -> bool:
@@ -100,7 +157,7 @@ def should_embed(text: str) -> bool:
     if not text:
         return False
     word_count = len(text.split())
-    return word_count >= 20
+    return word_count >= EMBED_MIN_WORDS
 
 
 def register_artefact(
@@ -121,7 +178,7 @@ def register_artefact(
         tenant_dir = task_obj.tenant_id if task_obj else "default"
     target_dir = WORKSPACE / tenant_dir
     target_dir.mkdir(exist_ok=True, parents=True)
-    # Determine target file path and ensure unique name
+    # Ingest once into the blob store (hash, size and word count in the same pass)
     if isinstance(src, bytes):
         if not filename:
             raise ValueError("`filename` required when passing bytes.")
@@ -129,115 +186,211 @@ def register_artefact(
     else:
         src = Path(src).expanduser().resolve()
         base_name = filename or src.name
+    backend = get_backend(WORKSPACE / BLOB_DIR)
+    blobs = backend.cache
+    meta, _, _ = blobs.put(src)
+    sha = meta.sha256
+    backend.put(sha)  # durable (e.g. in S3) before any other node can see the row
+    with Session(engine) as session:
+        known = find_artifact(session, tenant_dir, sha)
+        known_path = known.repo_path if known else None
+    # Determine target file path: reuse a path that already holds these bytes,
+    # otherwise ensure a unique name
     tgt = target_dir / base_name
     original_exists = tgt.exists()
-    if tgt.exists() and not allow_overwrite:
-        original_tgt = tgt
-        counter = 1
-        while tgt.exists():
-            stem = original_tgt.stem
-            suffix = original_tgt.suffix
-            tgt = target_dir / f"{stem}_{counter}{suffix}"
-            counter += 1
-        original_exists = False
-    # Write bytes or copy file
-    if isinstance(src, bytes):
-        tgt.write_bytes(src)
+    reused = blobs.holds(sha, tgt)
+    if not reused and tgt.exists() and not allow_overwrite:
+        if known_path and blobs.holds(sha, WORKSPACE / known_path):
+            tgt = WORKSPACE / known_path
+            reused = True
+        else:
+            original_tgt = tgt
+            counter = 1
+            while tgt.exists():
+                stem = original_tgt.stem
+                suffix = original_tgt.suffix
+                tgt = target_dir / f"{stem}_{counter}{suffix}"
+                counter += 1
+            original_exists = False
+    if not reused:
+        blobs.link(sha, tgt)
     else:
-        shutil.copy2(src, tgt)
-
-    # Compute metadata
-    sha = _sha256(tgt)
+        ARTIFACT_DEDUPED.inc()
     artefact = Artifact(
         task_id=task_id,
         repo_path=str(tgt.relative_to(WORKSPACE)),
         media_type=_mime(tgt),
-        size=tgt.stat().st_size,
+        size=meta.size,
         sha256=sha,
     )
-    text_content: Optional[str] = None
-    # Save artefact in database and link to task
+    # Save artefact in database and link to task; embedding, git and graph run
+    # from the outbox (same transaction) so the agent does not wait for them
     with Session(engine) as session:
         session.add(artefact)
         task_obj = session.get(Task, task_id)
         if task_obj:
             # Update token usage (approximate)
-            try:
-                text_content = tgt.read_text(encoding="utf-8", errors="ignore")
-                word_count = len(text_content.split())
-            except Exception:
-                word_count = 0
-            task_obj.tokens_actual += int(word_count * 1.5)
-        session.commit()
-        session.refresh(artefact)
-    if original_exists and allow_overwrite and vector_store.client:
-        try:
-            from qdrant_client.models import (
-                Filter,
-                FieldCondition,
-                MatchValue,
-                FilterSelector,
-            )
-
-            vector_store.client.set_payload(
-                collection_name=vector_store.collection_name,
-                points_selector=FilterSelector(
-                    filter=Filter(
-                        must=[
-                            FieldCondition(
-                                key="tenant", match=MatchValue(value=tenant_dir)
-                            ),
-                            FieldCondition(
-                                key="file",
-                                match=MatchValue(value=str(artefact.repo_path)),
-                            ),
-                        ]
-                    )
-                ),
-                payload={"obsolete": True},
+            task_obj.tokens_actual += int(meta.words * 1.5)
+        supersedes = original_exists and allow_overwrite and not reused
+        # known content is embedded already
+        embed = bool(task_obj) and known_path is None and meta.should_embed
+        if embed or supersedes:
+            outbox.enqueue(
+                session, TOPIC_EMBED, tenant_dir, artefact.id,
+                {
+                    "task": task_id,
+                    "file": artefact.repo_path,
+                    "sha": sha,
+                    "embed": embed,
+                    "supersedes": supersedes,
+                },
             )
-        except Exception as exc:
-            logging.getLogger(__name__).warning("Vector cleanup failed: %s", exc)
-
-    # persist vector before committing to git / graph
-    if text_content:
-        if should_embed(text_content):
-            stored = False
-            for attempt in range(1, VECTOR_STORE_RETRIES + 1):
-                if vector_store.store_vector(
-                    tenant_dir,
-                    artefact.id,
-                    text_content,
-                    {"task": task_id, "file": artefact.repo_path, "sha": sha},
-                ):
-                    stored = True
-                    break
-                logging.warning("Vector store attempt %s failed", attempt)
-                time.sleep(1)
-            if not stored:
-                raise RuntimeError("Vector store persistence failed")
-        else:
+        elif task_obj and known_path is None:
             logging.info(
                 "Skipping vector embedding for artifact due to irrelevance (content too short)."
             )
-
-    action = "update" if original_exists and allow_overwrite else "add"
-    _git_commit(
-        artefact.repo_path, f"{task_id}: {action} artefact {artefact.sha256[:8]}"
-    )
-    if original_exists and allow_overwrite:
+        if not reused:
+            action = "update" if supersedes else "add"
+            outbox.enqueue(
+                session, TOPIC_GIT, tenant_dir, artefact.id,
+                {"task": task_id, "path": artefact.repo_path, "sha": sha,
+                 "message": f"{task_id}: {action} artefact {sha[:8]}"},
+            )
+        outbox.enqueue(session, TOPIC_GRAPH, tenant_dir, artefact.id, {"task": task_id, "sha": sha})
+        session.commit()
+        session.refresh(artefact)
+    if reused:
+        logging.info(
+            f"Artefact {artefact.repo_path} unchanged (SHA256={sha[:8]}), "
+            "skipping embedding and commit"
+        )
+    elif supersedes:
         ARTIFACT_UPDATES.inc()
-    try:
-        _link_neo4j(task_id, sha)
-    except Exception:
-        # Fehler im Neo4j-Link wurden bereits geloggt
-        pass
+    if get_redis() is None:
+        # no broker, hence no outbox worker: post-process in-line (dev / tests)
+        outbox.drain(engine)
     logging.info(
         f"Registered artefact for Task {task_id}: {artefact.repo_path} (SHA256={sha[:8]})"
     )
     return artefact
 
 
+# ---------- post-processing (outbox handlers) ----------
+def _embed_text(tenant_id: str, repo_path: str, sha: str) -> str:
+    data = read_artefact(tenant_id, repo_path, sha, INDEX_MAX_BYTES)
+    if data is None:
+        raise FileNotFoundError(repo_path)
+    return data.decode("utf-8", errors="ignore")
+
+
+def _mark_obsolete(tenant_id: str, repo_path: str) -> None:
+    """Flag vectors of an overwritten file so retrieval skips them."""
+    from qdrant_client.models import (
+        Filter,
+        FieldCondition,
+        MatchValue,
+        FilterSelector,
+    )
+
+    client = vector_store.client
+    if client is None:
+        return
+    client.set_payload(
+        collection_name=vector_store.collection_name,
+        points_selector=FilterSelector(
+            filter=Filter(
+                must=[
+                    FieldCondition(key="tenant", match=MatchValue(value=tenant_id)),
+                    FieldCondition(key="file", match=MatchValue(value=repo_path)),
+                ]
+            )
+        ),
+        payload={"obsolete": True},
+    )
+
+
+@outbox.handler(TOPIC_EMBED)
+def _embed_artefacts(entries: List[OutboxEntry]) -> Dict[int, str]:
+    failed: Dict[int, str] = {}
+    for entry in entries:
+        data = outbox.payload(entry)
+        if data.get("supersedes") and vector_store.client:
+            try:
+                _mark_obsolete(entry.tenant_id, data["file"])
+            except Exception as exc:
+                logging.getLogger(__name__).warning("Vector cleanup failed: %s", exc)
+        if not data.get("embed"):
+            continue
+        try:
+            text = _embed_text(entry.tenant_id, data["file"], data["sha"])
+        except OSError as exc:
+            failed[outbox.id_of(entry)] = f"artefact file unreadable: {exc}"
+            continue
+        metadata = {"task": data["task"], "file": data["file"], "sha": data["sha"]}
+        if not vector_store.store_vector(entry.tenant_id, entry.ref_id, text, metadata):
+            failed[outbox.id_of(entry)] = "Vector store persistence failed"
+    return failed
+
+
+def _materialize(data: Dict[str, str]) -> None:
+    """Create a missing workspace file from its blob (written on another node).
+
+    An existing file is left alone: it may already hold a newer artefact."""
+    tgt = WORKSPACE / data["path"]
+    if not data.get("sha") or tgt.exists():
+        return
+    backend = get_backend(WORKSPACE / BLOB_DIR)
+    if backend.local_path(data["sha"]) is None:
+        raise FileNotFoundError(f"blob {data['sha']} not in artefact store")
+    backend.cache.link(data["sha"], tgt)
+
+
+@outbox.handler(TOPIC_GIT)
+def _commit_artefacts(entries: List[OutboxEntry]) -> Dict[int, str]:
+    # tenant → task → entries; tenants have separate repositories and commit in parallel
+    by_tenant: Dict[str, Dict[str, List[OutboxEntry]]] = {}
+    for entry in entries:
+        by_task = by_tenant.setdefault(entry.tenant_id, {})
+        by_task.setdefault(outbox.payload(entry)["task"], []).append(entry)
+
+    def _commit_tenant(by_task: Dict[str, List[OutboxEntry]]) -> Dict[int, str]:
+        failed: Dict[int, str] = {}
+        for task_id, group in by_task.items():
+            lines = [(outbox.payload(e)["path"], outbox.payload(e)["message"]) for e in group]
+            try:
+                for e in group:  # this worker may not have written the file itself
+                    _materialize(outbox.payload(e))
+                _git_commit(lines, task_id)
+            except Exception as exc:
+                failed.update({outbox.id_of(e): f"git commit failed: {exc}" for e in group})
+        return failed
+
+    failed: Dict[int, str] = {}
+    if len(by_tenant) == 1:
+        failed.update(_commit_tenant(next(iter(by_tenant.values()))))
+        return failed
+    with ThreadPoolExecutor(max_workers=min(GIT_COMMIT_WORKERS, len(by_tenant))) as pool:
+        for result in pool.map(_commit_tenant, by_tenant.values()):
+            failed.update(result)
+    return failed
+
+
+@outbox.handler(TOPIC_GRAPH, max_attempts=0)
+def _link_artefacts(entries: List[OutboxEntry]) -> Dict[int, str]:
+    by_tenant: Dict[str, List[OutboxEntry]] = {}
+    for entry in entries:
+        by_tenant.setdefault(entry.tenant_id, []).append(entry)
+    failed: Dict[int, str] = {}
+    for tenant_id, group in by_tenant.items():
+        links = [(outbox.payload(e)["task"], outbox.payload(e)["sha"]) for e in group]
+        try:
+            _link_neo4j(links)
+        except Exception as exc:
+            logging.getLogger(__name__).error(f"Neo4j link failed for tenant {tenant_id}: {exc}")
+            failed.update({outbox.id_of(e): str(exc) for e in group})
+    return failed
+
+
 def retract_artifact(artifact_id: str, remove_from_neo4j: bool = False) -> None:
     """Remove an artifact's vector embedding from Qdrant and optionally from Neo4j."""
     # Delete all vector entries for the given artifact from the vector store
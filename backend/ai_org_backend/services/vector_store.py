@@ -1,11 +1,35 @@
-"""Qdrant vector storage service."""
+"""Qdrant vector storage service.
+
+Artefacts are indexed in chunks: :func:`chunk_text` splits text into
+overlapping windows of at most ``EMBED_CHUNK_TOKENS`` tokens (tiktoken when
+installed, otherwise ~4 characters per token), :func:`embed_texts` embeds
+them ``EMBED_BATCH`` inputs per request, and every chunk is one point.
+Vectors are cached on disk by ``(model, sha256(text))``
+(:mod:`.embedding_cache`), so unchanged text is never embedded twice;
+search queries additionally go through :mod:`.query_cache`.
+
+Vectors come from an :class:`~.embeddings.EmbeddingProvider` chosen by
+``EMBEDDING_PROVIDER``: ``openai``, ``local`` (CPU-only feature hashing, for
+air-gapped deployments and network-free retrieval) or ``auto`` (OpenAI when
+the package and ``OPENAI_API_KEY`` are available, local otherwise). Each
+provider has its own collection with its own dimension.
+"""
 
 from __future__ import annotations
 
 import logging
-from typing import Any, Dict, List, Optional
+import math
+import os
+import re
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from ai_org_backend.config import QDRANT_API_KEY, QDRANT_URL
+from ai_org_backend.services.embedding_cache import EMBED_CACHE_PATH, EmbeddingCache
+from ai_org_backend.services.embeddings import EmbeddingProvider, HashingProvider, OpenAIProvider
+from ai_org_backend.services.query_cache import query_cache
 
 try:  # pragma: no cover - optional dependency during tests
     from qdrant_client import QdrantClient
@@ -20,30 +44,214 @@ try:  # pragma: no cover - optional dependency during tests
 except Exception:  # pragma: no cover
     QdrantClient = None  # type: ignore
 
+try:  # pragma: no cover
+    from qdrant_client.models import Range
+except Exception:  # pragma: no cover
+    Range = None  # type: ignore
+
 try:  # pragma: no cover - allow tests without openai package
     import openai
 except Exception:  # pragma: no cover
     openai = None  # type: ignore
 
+try:  # optional: exact token counts
+    import tiktoken
+except Exception:  # pragma: no cover
+    tiktoken = None  # type: ignore
+
+EMBEDDING_PROVIDER = os.getenv("EMBEDDING_PROVIDER", "auto")  # openai | local | auto
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")
+EMBEDDING_DIM = int(os.getenv("EMBEDDING_DIM", "1536"))
+EMBED_HASH_DIM = int(os.getenv("EMBED_HASH_DIM", "1024"))  # local provider
+EMBED_CHUNK_TOKENS = int(os.getenv("EMBED_CHUNK_TOKENS", "512"))
+EMBED_CHUNK_OVERLAP = int(os.getenv("EMBED_CHUNK_OVERLAP", "64"))
+EMBED_BATCH = int(os.getenv("EMBED_BATCH", "64"))  # inputs per embedding request
+# text read per artefact for indexing (chunked, so far more than one model input)
+INDEX_MAX_BYTES = int(os.getenv("EMBED_INDEX_MAX_BYTES", str(1024 * 1024)))
+
+_PIECE = re.compile(r"(\S+)(\s*)|\s+")
+_encoding = None
+
+
+def _tokenize(text: str) -> Tuple[List[Any], Callable[[List[Any]], str]]:
+    """Tokens of *text* and the function joining a token window back into text."""
+    global _encoding
+    if tiktoken is not None:
+        try:
+            if _encoding is None:
+                _encoding = tiktoken.encoding_for_model(EMBEDDING_MODEL)
+            return _encoding.encode(text), _encoding.decode
+        except Exception:  # pragma: no cover - unknown model, no BPE files offline
+            pass
+    pieces: List[str] = []
+    for match in _PIECE.finditer(text):
+        word = match.group(1) or ""
+        space = match.group(2) if word else match.group()
+        # ~4 characters per token; trailing whitespace rides on the last piece
+        cut = [word[i:i + 4] for i in range(0, len(word), 4)] or [""]
+        cut[-1] += space
+        pieces.extend(cut)
+    return pieces, "".join
+
+
+def _chunks(text: str, max_tokens: int = 0, overlap: int = -1) -> List[Tuple[str, int]]:
+    """``(chunk, token count)`` windows of *text*, see :func:`chunk_text`."""
+    if not text.strip():
+        return []
+    max_tokens = max_tokens or EMBED_CHUNK_TOKENS
+    overlap = EMBED_CHUNK_OVERLAP if overlap < 0 else overlap
+    overlap = min(overlap, max_tokens // 2)
+    tokens, join = _tokenize(text)
+    if len(tokens) <= max_tokens:
+        return [(text, len(tokens))]
+    step = max_tokens - overlap
+    count = math.ceil((len(tokens) - overlap) / step)
+    windows = [tokens[i * step:i * step + max_tokens] for i in range(count)]
+    return [(join(w), len(w)) for w in windows]
+
+
+def chunk_text(text: str, max_tokens: int = 0, overlap: int = -1) -> List[str]:
+    """Split *text* into windows of at most *max_tokens* tokens sharing *overlap* tokens."""
+    return [piece for piece, _ in _chunks(text, max_tokens, overlap)]
+
+
+def chunk_id(artifact_id: str, chunk_no: int) -> str:
+    """Point id of a chunk; chunk 0 keeps the artefact id."""
+    return artifact_id if chunk_no == 0 else str(uuid.uuid5(uuid.UUID(artifact_id), str(chunk_no)))
+
+
+def get_provider(name: Optional[str] = None) -> Optional[EmbeddingProvider]:
+    """Embedding provider *name* (default ``EMBEDDING_PROVIDER``); ``None`` if unavailable."""
+    name = (name or EMBEDDING_PROVIDER).lower()
+    if name == "auto":
+        name = "openai" if openai is not None and os.getenv("OPENAI_API_KEY") else "local"
+    if name == "local":
+        return HashingProvider(EMBED_HASH_DIM)
+    if name != "openai":
+        logging.getLogger(__name__).warning("Unknown EMBEDDING_PROVIDER=%r, using local", name)
+        return HashingProvider(EMBED_HASH_DIM)
+    if openai is None:
+        logging.getLogger(__name__).warning(
+            "EMBEDDING_PROVIDER=openai but the openai package is missing"
+        )
+        return None
+    # resolve the module per call so it can be swapped (tests, reloads)
+    return OpenAIProvider(lambda: openai, EMBEDDING_MODEL, EMBEDDING_DIM, EMBED_BATCH)
+
+
+def embed_texts(
+    texts: List[str],
+    cache: Optional[EmbeddingCache] = None,
+    provider: Optional[EmbeddingProvider] = None,
+) -> List[List[float]]:
+    """Embed *texts* with *provider* (default :func:`get_provider`), in input order.
+
+    With a *cache*, only texts it has not seen (for the provider's model) are
+    embedded; providers cheaper than a cache lookup bypass it.
+    """
+    provider = provider or get_provider()
+    if provider is None:
+        raise RuntimeError("no embedding provider available")
+    if cache is not None and provider.cacheable:
+        return cache.embed(provider.model, texts, provider.embed)
+    return provider.embed(texts)
+
 
 class VectorStore:
     """Wrapper around a Qdrant collection for storing embeddings."""
 
-    def __init__(self) -> None:
+    def __init__(self, provider: Optional[EmbeddingProvider] = None) -> None:
         self.client: Optional["QdrantClient"] = None
-        self.collection_name = "artifacts"
-        if QDRANT_URL and QdrantClient is not None:
+        self.provider = provider or get_provider()
+        self.collection_name = self.provider.collection if self.provider else "artifacts"
+        self.cache: Optional[EmbeddingCache] = None
+        if QDRANT_URL and QdrantClient is not None and self.provider is not None:
             try:
                 self.client = QdrantClient(url=QDRANT_URL, api_key=QDRANT_API_KEY)
-                if not self.client.collection_exists(self.collection_name):
-                    self.client.create_collection(
-                        collection_name=self.collection_name,
-                        vectors_config=VectorParams(size=1536, distance=Distance.COSINE),
-                    )
+                self.ensure_collection()
+                if EMBED_CACHE_PATH:
+                    self.cache = EmbeddingCache(Path(EMBED_CACHE_PATH))
             except Exception as exc:  # pragma: no cover
                 logging.getLogger(__name__).warning("Qdrant init failed: %s", exc)
                 self.client = None
 
+    # ---------- collections (blue/green) ----------
+    def _qdrant(self) -> "QdrantClient":
+        if self.client is None:
+            raise RuntimeError("Qdrant is not configured (QDRANT_URL)")
+        return self.client
+
+    def versioned_name(self) -> str:
+        """Fresh collection name for ``collection_name`` (which is an alias onto it)."""
+        return f"{self.collection_name}_{datetime.utcnow():%Y%m%d%H%M%S%f}"
+
+    def ensure_collection(self) -> None:
+        """Create a versioned collection behind the ``collection_name`` alias if neither exists.
+
+        Queries always go through the alias, so :meth:`swap_alias` can move
+        it without touching the live collection. A plain collection of that
+        name (created before aliases were used) is kept as is.
+        """
+        name = self.collection_name
+        if name in self.aliases() or self._qdrant().collection_exists(name):
+            return
+        target = self.versioned_name()
+        self.create_collection(target)
+        self.swap_alias(target)
+
+    def create_collection(self, name: str) -> None:
+        """Create collection *name* sized for the provider's vectors, unless it exists."""
+        if self.provider is None:
+            raise RuntimeError("no embedding provider available")
+        client = self._qdrant()
+        if not client.collection_exists(name):
+            client.create_collection(
+                collection_name=name,
+                vectors_config=VectorParams(size=self.provider.dim, distance=Distance.COSINE),
+            )
+
+    def drop_collection(self, name: str) -> None:
+        """Delete collection *name*; refuses the collection the alias points at."""
+        if name in (self.collection_name, self.aliases().get(self.collection_name)):
+            raise ValueError(f"collection {name} is live")
+        self._qdrant().delete_collection(name)
+
+    def aliases(self) -> Dict[str, str]:
+        """Alias name → collection name."""
+        return {a.alias_name: a.collection_name for a in self._qdrant().get_aliases().aliases}
+
+    def swap_alias(self, target: str) -> Optional[str]:
+        """Point ``collection_name`` at collection *target*; returns the previous collection.
+
+        Alias changes are atomic in Qdrant, so queries never see a missing
+        collection; the previous collection is left for the caller to drop.
+        Only a plain collection from before :meth:`ensure_collection` has to
+        be deleted before the alias can take its name (``None`` is returned).
+        """
+        from qdrant_client.models import (
+            CreateAlias,
+            CreateAliasOperation,
+            DeleteAlias,
+            DeleteAliasOperation,
+        )
+
+        client = self._qdrant()
+        alias = self.collection_name
+        previous = self.aliases().get(alias)
+        ops: List[Any] = []
+        if previous is not None:
+            ops.append(DeleteAliasOperation(delete_alias=DeleteAlias(alias_name=alias)))
+        elif client.collection_exists(alias):
+            logging.getLogger(__name__).warning(
+                "Replacing legacy collection %s by an alias onto %s", alias, target
+            )
+            client.delete_collection(alias)
+        ops.append(
+            CreateAliasOperation(create_alias=CreateAlias(collection_name=target, alias_name=alias))
+        )
+        client.update_collection_aliases(change_aliases_operations=ops)
+        return previous
+
     def store_vector(
         self,
         tenant_id: str,
@@ -58,57 +266,120 @@ class VectorStore:
         retry the operation.
         """
 
-        if not self.client or not text or openai is None:
-            return True
+        return self.index_artifacts(tenant_id, [(artifact_id, text, metadata)])[artifact_id]
+
+    def index_artifacts(
+        self,
+        tenant_id: str,
+        docs: List[Tuple[str, str, Optional[Dict[str, Any]]]],
+        collection: Optional[str] = None,
+        stats: Optional[Dict[str, int]] = None,
+    ) -> Dict[str, bool]:
+        """Chunk, embed and upsert ``(artifact_id, text, metadata)`` *docs*.
+
+        Every chunk becomes one point (``artifact_id``/``chunk_no`` in the
+        payload; chunk 0 keeps the artefact id as point id). Chunks of all
+        docs are embedded ``EMBED_BATCH`` inputs per request and upserted in
+        one call (into *collection*, default ``collection_name``); *stats*
+        accumulates ``chunks`` and ``tokens``. Returns per artefact whether
+        it was persisted.
+        """
+
+        result = {artifact_id: True for artifact_id, _, _ in docs}
+        if not self.client or self.provider is None:
+            return result
+        docs = [d for d in docs if d[1]]
+        if not docs:
+            return result
+        log = logging.getLogger(__name__)
+        target = collection or self.collection_name
+        # previous versions: one retrieve for all docs
+        versions: Dict[str, int] = {}
         try:
-            version = 1
-            existing_payload: Dict[str, Any] | None = None
-            try:
-                existing = self.client.retrieve(
-                    collection_name=self.collection_name,
-                    ids=[artifact_id],
-                    with_payload=True,
-                    with_vectors=False,
-                )
-                if existing:
-                    existing_payload = existing[0].payload or {}
-                    prev_version = existing_payload.get("version")
-                    if isinstance(prev_version, int):
-                        version = prev_version + 1
-                    self.client.delete(
-                        collection_name=self.collection_name,
-                        points_selector=[artifact_id],
-                    )
-            except Exception as exc:  # pragma: no cover
-                logging.getLogger(__name__).warning("Vector cleanup failed: %s", exc)
+            for point in self.client.retrieve(
+                collection_name=target,
+                ids=[artifact_id for artifact_id, _, _ in docs],
+                with_payload=True,
+                with_vectors=False,
+            ) or []:
+                prev = (point.payload or {}).get("version")
+                point_id = str(getattr(point, "id", docs[0][0]))
+                versions[point_id] = prev if isinstance(prev, int) else 0
+        except Exception as exc:  # pragma: no cover
+            log.warning("Vector version lookup failed: %s", exc)
+
+        chunks: List[Tuple[str, int, str]] = []  # (artifact id, chunk no, text)
+        for artifact_id, text, _ in docs:
+            pieces = _chunks(text)
+            chunks.extend((artifact_id, n, piece) for n, (piece, _) in enumerate(pieces))
+            if stats is not None:
+                stats["chunks"] = stats.get("chunks", 0) + len(pieces)
+                stats["tokens"] = stats.get("tokens", 0) + sum(n for _, n in pieces)
+        try:
+            vectors = embed_texts([c[2] for c in chunks], self.cache, self.provider)
+        except Exception as exc:  # pragma: no cover
+            log.warning("Embedding failed: %s", exc)
+            return {**result, **{artifact_id: False for artifact_id, _, _ in docs}}
 
-            embed = openai.Embedding.create(model="text-embedding-3-small", input=text)
-            vector = embed["data"][0]["embedding"]
+        meta = {artifact_id: metadata for artifact_id, _, metadata in docs}
+        counts: Dict[str, int] = {}
+        points = []
+        for (artifact_id, chunk_no, piece), vector in zip(chunks, vectors):
+            counts[artifact_id] = chunk_no + 1
+            version = versions.get(artifact_id, 0) + 1
             payload: Dict[str, Any] = {
                 "tenant": tenant_id,
                 "version": version,
                 "artifact_id": artifact_id,
+                "chunk_no": chunk_no,
+                "text": piece,
             }
-            if metadata:
-                payload.update(metadata)
+            extra = meta[artifact_id]
+            if extra:
+                payload.update(extra)
                 payload["version"] = int(payload.get("version", version))
-            self.client.upsert(
-                collection_name=self.collection_name,
-                points=[PointStruct(id=artifact_id, vector=vector, payload=payload)],
+            points.append(
+                PointStruct(id=chunk_id(artifact_id, chunk_no), vector=vector, payload=payload)
             )
-            return True
+        if not points:
+            return result
+        try:
+            self.client.upsert(collection_name=target, points=points)
         except Exception as exc:  # pragma: no cover
-            logging.getLogger(__name__).warning("Vector upsert failed: %s", exc)
-            return False
+            log.warning("Vector upsert failed: %s", exc)
+            return {**result, **{artifact_id: False for artifact_id, _, _ in docs}}
+
+        # re-indexed artefacts: drop chunks beyond the new chunk count
+        for artifact_id in versions if Range is not None else ():
+            try:
+                self.client.delete(
+                    collection_name=target,
+                    points_selector=Filter(
+                        must=[
+                            FieldCondition(key="artifact_id", match=MatchValue(value=artifact_id)),
+                            FieldCondition(
+                                key="chunk_no", range=Range(gte=counts.get(artifact_id, 0))
+                            ),
+                        ]
+                    ),
+                )
+            except Exception as exc:  # pragma: no cover
+                log.warning("Vector cleanup failed: %s", exc)
+        return result
 
     def query_vectors(self, tenant_id: str, query_text: str, top_k: int = 5) -> List[Any]:
         """Return up to *top_k* similar vectors for *query_text*."""
 
-        if not self.client or openai is None:
+        if not self.client or self.provider is None:
             return []
         try:
-            embed = openai.Embedding.create(model="text-embedding-3-small", input=query_text)
-            vector = embed["data"][0]["embedding"]
+            if self.provider.cacheable:
+                vector = query_cache.vector(
+                    self.provider.model, tenant_id, query_text,
+                    lambda: embed_texts([query_text], self.cache, self.provider)[0],
+                )
+            else:  # local provider: cheaper than a cache round trip
+                vector = self.provider.embed([query_text])[0]
             q_filter = Filter(
                 must=[FieldCondition(key="tenant", match=MatchValue(value=tenant_id))],
                 must_not=[FieldCondition(key="obsolete", match=MatchValue(value=True))],
@@ -124,5 +395,15 @@ class VectorStore:
             return []
 
 
-__all__ = ["VectorStore"]
+__all__ = [
+    "EMBEDDING_DIM",
+    "EMBEDDING_MODEL",
+    "EMBEDDING_PROVIDER",
+    "INDEX_MAX_BYTES",
+    "VectorStore",
+    "chunk_id",
+    "chunk_text",
+    "embed_texts",
+    "get_provider",
+]
 
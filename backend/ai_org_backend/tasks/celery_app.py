@@ -1,7 +1,9 @@
 """Celery application instance for ai_org_backend tasks."""
 
+import time
+
 from celery import Celery
-from celery.signals import task_prerun, task_failure, before_task_publish
+from celery.signals import task_prerun, task_postrun, task_failure, before_task_publish
 from dotenv import load_dotenv
 from ai_org_backend import config
 
@@ -12,6 +14,8 @@ load_dotenv()
 
 celery = Celery(__name__, broker=config.REDIS_URL, backend=config.REDIS_URL)
 celery.conf.task_acks_late = True
+# outbox drain task (artefact post-processing, queue OUTBOX_QUEUE)
+celery.conf.include = ["ai_org_backend.tasks.outbox_worker"]
 
 
 @before_task_publish.connect
@@ -68,6 +72,25 @@ def set_task_status_doing(
             Repo(tenant_id).update(t_id, status="doing")
         except Exception as e:
             print(f"Failed to set status 'doing' for task {t_id}: {e}")
+        try:
+            from ai_org_backend.orchestrator.ready_queue import publish_event
+
+            # lets the scheduler observe dispatch-to-start latency
+            publish_event(tenant_id, {"type": "start", "id": t_id, "ts": time.time()})
+        except Exception as e:
+            print(f"Failed to publish start event for task {t_id}: {e}")
+
+
+@task_postrun.connect
+def kick_artefact_postprocessing(sender=None, task_id=None, task=None, args=None, **extra):
+    """Let the outbox workers embed, commit and link the artefacts a task registered."""
+    if args and len(args) >= 2:
+        try:
+            from ai_org_backend.services.outbox import kick
+
+            kick()
+        except Exception as e:
+            print(f"Failed to kick artefact post-processing for task {args[1]}: {e}")
 
 
 @task_failure.connect
@@ -0,0 +1,14 @@
+"""Celery task draining the outbox (artefact embedding, git commits, Neo4j mirror)."""
+
+from __future__ import annotations
+
+from ai_org_backend.services import outbox
+from ai_org_backend.tasks.celery_app import celery
+
+
+@celery.task(name=outbox.DRAIN_TASK, queue=outbox.OUTBOX_QUEUE, ignore_result=True)
+def drain_outbox() -> int:
+    """Process due outbox entries until none are left; returns entries handled."""
+    from ai_org_backend.db import engine
+
+    return outbox.drain(engine)
@@ -0,0 +1,117 @@
+"""
+Single-pass streaming ingest for artefacts.
+
+Copies the source into the workspace in fixed-size chunks and computes, on the
+way, everything ``register_artefact`` needs: sha256, size, word count (same
+result as ``len(text.split())`` on the UTF-8 decoded file) and the leading
+text for the embedding. Memory stays bounded by ``CHUNK_SIZE`` plus
+``EMBED_MAX_BYTES`` regardless of the artefact size, and the artefact is not
+read back from disk.
+"""
+from __future__ import annotations
+
+import codecs
+import hashlib
+import os
+import shutil
+from pathlib import Path
+from typing import BinaryIO, Optional, Union
+
+CHUNK_SIZE = 64 * 1024
+# leading text kept on the result (the indexer reads the blob itself, see vector_store)
+EMBED_MAX_BYTES = int(os.getenv("EMBED_MAX_BYTES", str(32 * 1024)))
+# artefacts with fewer words are not embedded (stubs, placeholders)
+EMBED_MIN_WORDS = 20
+
+
+class IngestResult:
+    """Metadata of one ingested artefact."""
+
+    def __init__(self, sha256: str, size: int, words: int, text: str):
+        self.sha256 = sha256
+        self.size = size
+        self.words = words
+        self.text = text  # leading EMBED_MAX_BYTES, decoded
+
+    @property
+    def should_embed(self) -> bool:
+        return self.words >= EMBED_MIN_WORDS
+
+
+class _WordCounter:
+    """``len(text.split())`` over text that arrives in pieces."""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self._in_word = False
+
+    def feed(self, piece: str) -> None:
+        if not piece:
+            return
+        n = len(piece.split())
+        if n and self._in_word and not piece[0].isspace():
+            n -= 1  # word continues across the chunk boundary
+        self.count += n
+        self._in_word = not piece[-1].isspace()
+
+
+def ingest(
+    src: Union[Path, bytes, BinaryIO], tgt: Path, chunk_size: int = CHUNK_SIZE
+) -> IngestResult:
+    """Write *src* to *tgt* and return its metadata, reading each byte once."""
+    sha = hashlib.sha256()
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="ignore")
+    words = _WordCounter()
+    text_parts = []
+    text_len = 0
+    size = 0
+
+    def _consume(chunk: bytes, out: BinaryIO) -> None:
+        nonlocal size, text_len
+        out.write(chunk)
+        sha.update(chunk)
+        size += len(chunk)
+        piece = decoder.decode(chunk)
+        words.feed(piece)
+        if text_len < EMBED_MAX_BYTES:
+            keep = piece[: EMBED_MAX_BYTES - text_len]
+            text_parts.append(keep)
+            text_len += len(keep)
+
+    with open(tgt, "wb") as out:
+        if isinstance(src, (bytes, bytearray, memoryview)):
+            view = memoryview(src)
+            for i in range(0, len(view), chunk_size):
+                _consume(bytes(view[i: i + chunk_size]), out)
+        elif isinstance(src, Path):
+            with open(src, "rb") as fh:
+                for chunk in iter(lambda: fh.read(chunk_size), b""):
+                    _consume(chunk, out)
+        else:
+            for chunk in iter(lambda: src.read(chunk_size), b""):
+                _consume(chunk, out)
+        words.feed(decoder.decode(b"", final=True))
+    if isinstance(src, Path):
+        shutil.copystat(src, tgt)  # like shutil.copy2
+    return IngestResult(sha.hexdigest(), size, words.count, "".join(text_parts))
+
+
+def hash_file(path: Path, chunk_size: int = CHUNK_SIZE) -> Optional[str]:
+    """sha256 of *path* in bounded memory; ``None`` if it does not exist."""
+    if not path.exists():
+        return None
+    sha = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(chunk_size), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+__all__ = [
+    "CHUNK_SIZE",
+    "EMBED_MAX_BYTES",
+    "EMBED_MIN_WORDS",
+    "IngestResult",
+    "hash_file",
+    "ingest",
+]
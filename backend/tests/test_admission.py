@@ -0,0 +1,42 @@
+from ai_org_backend.models import Task
+from ai_org_backend.orchestrator import admission as adm
+from ai_org_backend.orchestrator.admission import AdmissionController
+from sqlmodel import Session, SQLModel, create_engine
+
+
+def test_role_cap_holds_and_releases(monkeypatch):
+    monkeypatch.setattr(adm, "get_redis", lambda: None)
+    ctl = AdmissionController(role_caps={"dev": 2}, default_cap=5, tenant_cap=0)
+    obs = ctl.observer("demo")
+
+    ctl.acquire("demo", "dev", "a")
+    ctl.acquire("other", "dev", "b")
+    assert not ctl.has_capacity("demo", "dev")  # cap is shared across tenants
+    assert ctl.has_capacity("demo", "qa")
+
+    ctl.hold("demo", "dev", {"id": "c"})
+    obs.apply({"type": "task", "id": "a", "status": "todo"})  # stale event, still running
+    assert not ctl.has_capacity("demo", "dev")
+
+    obs.apply({"type": "start", "id": "a", "ts": 0})
+    obs.apply({"type": "task", "id": "a", "status": "done"})
+    assert ctl.has_capacity("demo", "dev")
+    assert [(t, rec["id"], role) for t, rec, role in ctl.take_held()] == [("demo", "c", "dev")]
+
+
+def test_tenant_cap_and_reconcile(monkeypatch, tmp_path):
+    monkeypatch.setattr(adm, "get_redis", lambda: None)
+    ctl = AdmissionController(role_caps={}, default_cap=10, tenant_cap=1)
+    ctl.acquire("demo", "qa", "a")
+    ctl.acquire("demo", "qa", "b")
+    assert not ctl.has_capacity("demo", "qa")
+    assert ctl.has_capacity("other", "qa")
+
+    engine = create_engine(f"sqlite:///{tmp_path}/adm.db")
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as s:
+        s.add(Task(id="a", tenant_id="demo", description="A", status="doing"))
+        s.add(Task(id="b", tenant_id="demo", description="B", status="todo"))  # reset manually
+        s.commit()
+        ctl.observer("demo").rebuild(s)
+    assert list(ctl.inflight["demo"]) == ["a"]
@@ -0,0 +1,40 @@
+import io
+import zipfile
+from types import SimpleNamespace
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+
+def test_project_zip_streams_caches_and_revalidates(tmp_path, monkeypatch):
+    from ai_org_backend.api import pipeline
+    from ai_org_backend.api.dependencies import get_current_tenant
+
+    monkeypatch.chdir(tmp_path)
+    base = tmp_path / "workspace" / "acme"
+    (base / "src").mkdir(parents=True)
+    (base / "README.md").write_text("hello " * 1000)
+    (base / "src" / "app.py").write_text("print('hi')\n")
+
+    app = FastAPI()
+    app.include_router(pipeline.router)
+    app.dependency_overrides[get_current_tenant] = lambda: SimpleNamespace(id="acme")
+    client = TestClient(app)
+
+    first = client.get("/api/project.zip")
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    with zipfile.ZipFile(io.BytesIO(first.content)) as zf:
+        assert sorted(zf.namelist()) == ["README.md", "src/app.py"]
+        assert zf.read("src/app.py") == b"print('hi')\n"
+    cached = list((tmp_path / "workspace" / ".archives").glob("acme-*.zip"))
+    assert len(cached) == 1 and cached[0].read_bytes() == first.content
+
+    assert client.get("/api/project.zip", headers={"If-None-Match": etag}).status_code == 304
+    again = client.get("/api/project.zip")
+    assert again.content == first.content and again.headers["etag"] == etag
+
+    (base / "NEW.md").write_text("new")
+    changed = client.get("/api/project.zip", headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.headers["etag"] != etag
+    assert len(list((tmp_path / "workspace" / ".archives").glob("acme-*.zip"))) == 1
@@ -0,0 +1,71 @@
+from types import SimpleNamespace
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlmodel import Session, SQLModel, create_engine
+
+
+def test_artifact_download_etag_304_and_ranges(tmp_path, monkeypatch):
+    from ai_org_backend.api import pipeline
+    from ai_org_backend.api.dependencies import get_current_tenant
+    from ai_org_backend.models import Artifact, Task
+    from ai_org_backend.services import storage
+    from ai_org_backend.services.blob_store import BLOB_DIR, BlobStore
+    from ai_org_backend.utils.ingest import hash_file
+
+    engine = create_engine(f"sqlite:///{tmp_path}/dl.db")
+    SQLModel.metadata.create_all(engine)
+    monkeypatch.setattr(pipeline, "engine", engine)
+    monkeypatch.setattr(storage, "WORKSPACE", tmp_path)
+    (tmp_path / "acme").mkdir()
+    f = tmp_path / "acme" / "notes.txt"
+    f.write_bytes(b"0123456789" * 10)
+    sha = hash_file(f)
+    BlobStore(tmp_path / BLOB_DIR).put(f)
+    legacy = tmp_path / "acme" / "legacy.txt"  # from before the blob store: no blob
+    legacy.write_bytes(b"old")
+    with Session(engine) as s:
+        s.add(Task(id="t1", tenant_id="acme", description="x"))
+        text = {"task_id": "t1", "media_type": "text/plain"}
+        s.add(Artifact(id="a1", repo_path="acme/notes.txt", size=100, sha256=sha, **text))
+        # legacy row: path relative to the tenant directory
+        s.add(Artifact(id="a2", repo_path="notes.txt", size=100, sha256=sha, **text))
+        s.add(
+            Artifact(id="a3", repo_path="acme/legacy.txt", size=3, sha256=hash_file(legacy), **text)
+        )
+        s.commit()
+
+    app = FastAPI()
+    app.include_router(pipeline.router)
+    tenant = SimpleNamespace(id="acme")
+    app.dependency_overrides[get_current_tenant] = lambda: tenant
+    client = TestClient(app)
+
+    full = client.get("/api/artifact/a1")
+    assert full.status_code == 200 and full.content == f.read_bytes()
+    assert full.headers["etag"] == f'"{sha}"'
+    assert client.get("/api/artifact/a2").content == f.read_bytes()
+
+    assert client.get("/api/artifact/a1", headers={"If-None-Match": f'"{sha}"'}).status_code == 304
+    part = client.get("/api/artifact/a1", headers={"Range": "bytes=10-19"})
+    assert part.status_code == 206 and part.content == b"0123456789"
+    stale = client.get("/api/artifact/a1", headers={"Range": "bytes=0-9", "If-Range": '"other"'})
+    assert stale.status_code == 200
+
+    # overwriting the workspace file does not change what the sha256 ETag names
+    f.write_bytes(b"overwritten")
+    assert client.get("/api/artifact/a1").content == b"0123456789" * 10
+
+    # legacy artefact: weak ETag of the workspace file, which may change under it
+    old = client.get("/api/artifact/a3")
+    assert old.content == b"old" and old.headers["etag"].startswith('W/"')
+    revalidate = {"If-None-Match": old.headers["etag"]}
+    assert client.get("/api/artifact/a3", headers=revalidate).status_code == 304
+    legacy.write_bytes(b"newer")
+    new = client.get("/api/artifact/a3", headers=revalidate)
+    assert new.status_code == 200 and new.content == b"newer"
+    assert new.headers["etag"] != old.headers["etag"]
+
+    tenant.id = "beta"
+    assert client.get("/api/artifact/a1").status_code == 404
+    assert storage.artifact_path("beta", "../acme/notes.txt") is None
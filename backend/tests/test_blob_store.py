@@ -0,0 +1,63 @@
+import sys
+import types
+from types import SimpleNamespace
+
+from sqlmodel import Session, SQLModel
+
+
+def test_identical_artefacts_are_stored_once(monkeypatch, tmp_path):
+    openai_stub = types.ModuleType("openai")
+    openai_stub.Embedding = types.SimpleNamespace(
+        create=lambda *a, **kw: {"data": [{"embedding": [0.0]}]}
+    )
+    openai_stub.OpenAIError = Exception
+    monkeypatch.setitem(sys.modules, "openai", openai_stub)
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path}/test.db")
+    monkeypatch.setattr(
+        "ai_org_backend.metrics.prom_counter",
+        lambda *a, **k: SimpleNamespace(inc=lambda: None),
+        raising=False,
+    )
+    monkeypatch.delitem(sys.modules, "ai_org_backend.db", raising=False)
+    monkeypatch.delitem(sys.modules, "ai_org_backend.services.storage", raising=False)
+    import ai_org_backend.services.storage as storage
+    from ai_org_backend.models import Task
+    from ai_org_backend.services.blob_store import BlobStore, dedup_report
+
+    monkeypatch.setattr(storage, "WORKSPACE", tmp_path / "ws")
+    storage.WORKSPACE.mkdir()
+    SQLModel.metadata.create_all(storage.engine)
+    with Session(storage.engine) as session:
+        session.add(Task(id="t1", tenant_id="demo", description="x", status="done"))
+        session.add(Task(id="t2", tenant_id="demo", description="retry", status="done"))
+        session.commit()
+
+    commits, embeds = [], []
+    monkeypatch.setattr(storage, "_link_neo4j", lambda *a, **k: None)
+    monkeypatch.setattr(
+        storage, "_git_commit", lambda entries, *a, **k: commits.extend(p for p, _ in entries)
+    )
+    monkeypatch.setattr(
+        storage.vector_store, "store_vector", lambda *a, **k: embeds.append(a[1]) or True
+    )
+
+    body = ("same generated content " * 10).encode()
+    art1 = storage.register_artefact("t1", body, filename="spec.md")
+    art2 = storage.register_artefact("t2", body, filename="spec.md")  # retry: no spec_1.md
+    art3 = storage.register_artefact("t2", body, filename="copy.md")  # new name, same blob
+
+    assert art1.repo_path == art2.repo_path == "demo/spec.md"
+    assert not (storage.WORKSPACE / "demo" / "spec_1.md").exists()
+    assert commits == ["demo/spec.md", "demo/copy.md"]
+    assert embeds == [art1.id]
+
+    blob = BlobStore(storage.WORKSPACE / ".blobs").path(art1.sha256)
+    assert blob.stat().st_nlink == 3  # blob + two tenant paths
+    assert (storage.WORKSPACE / art3.repo_path).read_bytes() == body
+
+    with Session(storage.engine) as session:
+        (row,) = dedup_report(session)
+    assert row["tenant"] == "demo"
+    assert (row["artefacts"], row["blobs"]) == (3, 1)
+    assert row["bytes_saved"] == 2 * len(body)
+    assert row["dedup_ratio"] == 3.0
@@ -0,0 +1,60 @@
+import types
+
+from ai_org_backend.services import vector_store as vs_module
+
+
+def test_chunk_text_is_token_bounded_and_overlapping(monkeypatch):
+    monkeypatch.setattr(vs_module, "tiktoken", None)
+    text = " ".join(f"w{i:03d}" for i in range(300))  # 300 words of one "token" each
+    chunks = vs_module.chunk_text(text, max_tokens=100, overlap=20)
+    assert len(chunks) == 4
+    assert all(len(c.split()) <= 100 for c in chunks)
+    assert chunks[0].split()[-20:] == chunks[1].split()[:20]
+    assert chunks[-1].split()[-1] == "w299"
+    assert vs_module.chunk_text("short text") == ["short text"]
+    assert vs_module.chunk_text("  \n ") == []
+
+
+def test_index_artifacts_batches_embeddings_and_upserts_once(monkeypatch):
+    monkeypatch.setattr(vs_module, "tiktoken", None)
+    monkeypatch.setattr(vs_module, "EMBED_CHUNK_TOKENS", 50)
+    monkeypatch.setattr(vs_module, "EMBED_CHUNK_OVERLAP", 10)
+    monkeypatch.setattr(vs_module, "EMBED_BATCH", 8)
+    requests = []
+
+    def create(model, input):
+        requests.append(list(input))
+        return {"data": [{"index": i, "embedding": [float(len(t))]} for i, t in enumerate(input)]}
+
+    openai_stub = types.SimpleNamespace(Embedding=types.SimpleNamespace(create=create))
+    monkeypatch.setattr(vs_module, "openai", openai_stub)
+    monkeypatch.setattr(vs_module, "EMBEDDING_PROVIDER", "openai")
+    monkeypatch.setattr(vs_module, "PointStruct", lambda id, vector, payload: types.SimpleNamespace(
+        id=id, vector=vector, payload=payload))
+
+    class Client:
+        upserts = []
+
+        def retrieve(self, *a, **k):
+            return []
+
+        def upsert(self, collection_name, points):
+            self.upserts.append(points)
+
+    vs = vs_module.VectorStore()
+    vs.client = Client()
+    art_a, art_b = "6f1c1f7e-0000-4000-8000-000000000001", "6f1c1f7e-0000-4000-8000-000000000002"
+    long_text = " ".join(f"w{i}" for i in range(400))
+    res = vs.index_artifacts(
+        "acme", [(art_a, long_text, {"file": "a.py"}), (art_b, "tiny file", None)]
+    )
+
+    assert res == {art_a: True, art_b: True}
+    assert len(vs.client.upserts) == 1
+    points = vs.client.upserts[0]
+    chunk_nos = [p.payload["chunk_no"] for p in points if p.payload["artifact_id"] == art_a]
+    assert chunk_nos == list(range(10))
+    assert points[0].id == art_a and len({p.id for p in points}) == len(points)
+    assert all(p.payload["tenant"] == "acme" and p.payload["text"] for p in points)
+    assert points[0].payload["file"] == "a.py"
+    assert [len(r) for r in requests] == [8, 3]  # 11 chunks, two embedding requests
@@ -0,0 +1,111 @@
+import random
+
+import networkx as nx
+from ai_org_backend.orchestrator.critical_path import CriticalPathEngine
+from networkx import DiGraph
+
+
+def _graph():
+    # a → b → c → d, plus a short branch a → e
+    g = DiGraph()
+    for n in "abcde":
+        g.add_node(n, status="todo")
+    for a, b in ("ab", "bc", "cd", "ae"):
+        g.add_edge(a, b, kind="FINISH_START")
+    return g
+
+
+def test_load_graph_matches_full_scan():
+    cp = CriticalPathEngine("demo")
+    cp.load_graph(_graph())
+    assert cp.critical_length() == 3
+    assert cp.critical_path() == ["a", "b", "c", "d"]
+    assert cp.blocked_count() == 4  # all but the root
+    assert cp.slack("e") == 2 and cp.slack("b") == 0
+
+
+def test_incremental_events():
+    cp = CriticalPathEngine("demo")
+    cp.load_graph(_graph())
+
+    cp.apply({"type": "task", "id": "a", "status": "done"})
+    assert cp.critical_length() == 2
+    assert cp.blocked_count() == 2  # c, d
+
+    cp.apply({"type": "task", "id": "f", "status": "todo"})
+    cp.apply({"type": "edge", "from": "d", "to": "f", "kind": "FINISH_START"})
+    assert cp.critical_length() == 3
+    assert cp.critical_path() == ["b", "c", "d", "f"]
+    assert cp.blocked_count() == 3
+
+    # non-gating edges extend the chain but do not block
+    cp.apply({"type": "task", "id": "g", "status": "todo"})
+    cp.apply({"type": "edge", "from": "e", "to": "g", "kind": "RELATES_TO"})
+    assert cp.blocked_count() == 3
+
+    for n in "bcdf":
+        cp.apply({"type": "task", "id": n, "status": "done"})
+    assert cp.critical_length() == 1  # e → g
+    assert cp.blocked_count() == 0
+
+
+def _brute_force(g):
+    """Longest open chain overall and through every open node, from scratch."""
+    open_g = g.subgraph(n for n, d in g.nodes(data=True) if d["status"] != "done")
+    up, down = {}, {}
+    order = list(nx.topological_sort(open_g))
+    for n in order:
+        up[n] = max((up[p] + 1 for p in open_g.predecessors(n)), default=0)
+    for n in reversed(order):
+        down[n] = max((down[s] + 1 for s in open_g.successors(n)), default=0)
+    critical = max(up.values(), default=0)
+    return critical, {n: critical - up[n] - down[n] for n in order}
+
+
+def test_load_graph_of_long_chain_and_wide_dag():
+    rng = random.Random(7)
+    g = DiGraph()
+    for i in range(25):
+        g.add_node(f"c{i}", status="todo")
+        if i:
+            g.add_edge(f"c{i - 1}", f"c{i}", kind="FINISH_START")
+    chain = CriticalPathEngine("demo")
+    chain.load_graph(g)
+    assert chain.critical_length() == 24 and len(chain.critical_path()) == 25
+
+    for i in range(300):
+        g.add_node(f"w{i}", status="done" if rng.random() < 0.1 else "todo")
+        for j in rng.sample(range(i), min(i, rng.choice((0, 1, 2, 3)))):
+            g.add_edge(f"w{j}", f"w{i}", kind="FINISH_START")
+
+    cp = CriticalPathEngine("demo")
+    cp.load_graph(g)
+    critical, slack = _brute_force(g)
+    assert critical >= 24 and cp.critical_length() == critical
+    assert {n: cp.slack(n) for n in slack} == slack
+    assert cp.slack("w0") > 0 and any(cp.slack(n) > 0 for n in slack)
+    assert len(cp.critical_path()) == critical + 1
+
+    # incremental updates stay equal to a full recomputation
+    for n in ("c3", "w5", "w40"):
+        cp.apply({"type": "task", "id": n, "status": "done"})
+        g.nodes[n]["status"] = "done"
+    cp.apply({"type": "edge", "from": "c24", "to": "w299", "kind": "FINISH_START"})
+    g.add_edge("c24", "w299", kind="FINISH_START")
+    critical, slack = _brute_force(g)
+    assert cp.critical_length() == critical
+    assert {n: cp.slack(n) for n in slack} == slack
+
+
+def test_cycle_disables_critical_path():
+    cp = CriticalPathEngine("demo")
+    cp.load_graph(_graph())
+    cp.apply({"type": "edge", "from": "d", "to": "a", "kind": "FINISH_START"})
+    assert cp.critical_length() == 0 and cp.slack("e") == 0
+
+    cycle = _graph()
+    cycle.add_edge("d", "a", kind="FINISH_START")
+    cp.load_graph(cycle)
+    assert cp.critical_length() == 0
+    cp.load_graph(_graph())
+    assert cp.critical_length() == 3
@@ -0,0 +1,41 @@
+import types
+
+from ai_org_backend.services import vector_store as vs_module
+from ai_org_backend.services.embedding_cache import EMBED_CACHE_LOOKUPS, EmbeddingCache
+
+
+def _count(result):
+    return EMBED_CACHE_LOOKUPS.labels(result)._value.get()
+
+
+def test_reindex_of_unchanged_text_makes_no_embedding_calls(tmp_path, monkeypatch):
+    calls = []
+
+    def create(model, input):
+        calls.append(list(input))
+        data = [{"index": i, "embedding": [float(len(t)), 1.0]} for i, t in enumerate(input)]
+        return {"data": data}
+
+    openai_stub = types.SimpleNamespace(Embedding=types.SimpleNamespace(create=create))
+    monkeypatch.setattr(vs_module, "openai", openai_stub)
+    monkeypatch.setattr(vs_module, "EMBEDDING_PROVIDER", "openai")
+    cache = EmbeddingCache(tmp_path / "emb.sqlite")
+    hits, misses = _count("hit"), _count("miss")
+
+    first = vs_module.embed_texts(["alpha", "beta", "alpha"], cache)
+    assert calls == [["alpha", "beta"]]
+    assert first[0] == first[2] == [5.0, 1.0]
+    # a new process on the same node: served from disk
+    again = vs_module.embed_texts(["beta", "alpha"], EmbeddingCache(tmp_path / "emb.sqlite"))
+    assert again == [[4.0, 1.0], [5.0, 1.0]] and len(calls) == 1
+    assert _count("hit") - hits == 3 and _count("miss") - misses == 2
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = EmbeddingCache(tmp_path / "emb.sqlite", max_bytes=10 * 16)  # ten 4-float vectors
+    cache.put_many({f"k{i}": [float(i)] * 4 for i in range(10)})
+    cache.get_many(["k0"])  # k0 becomes the most recently used
+    cache.put_many({"k10": [10.0] * 4})
+    kept = cache.get_many([f"k{i}" for i in range(11)])
+    assert "k0" in kept and "k10" in kept and "k1" not in kept
+    assert len(kept) * 16 <= 10 * 16
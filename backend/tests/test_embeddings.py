@@ -0,0 +1,70 @@
+import types
+
+import numpy as np
+import pytest
+from ai_org_backend.services import vector_store as vs_module
+from ai_org_backend.services.embeddings import EmbeddingProvider, HashingProvider, OpenAIProvider
+from qdrant_client import QdrantClient
+
+
+def test_hashing_provider_is_deterministic_normalised_and_lexical():
+    provider = HashingProvider(dim=256)
+    a, b, c, empty = provider.embed([
+        "parse the invoice pdf and extract totals",
+        "extract totals from the invoice pdf",
+        "render the login page with react",
+        "",
+    ])
+    assert len(a) == 256 and provider.embed(["parse the invoice pdf and extract totals"])[0] == a
+    assert abs(np.linalg.norm(a) - 1.0) < 1e-6
+    assert np.dot(a, b) > 0.5 > np.dot(a, c)
+    assert not any(empty)
+
+
+def test_provider_without_embed_fails_at_construction():
+    class NoEmbed(EmbeddingProvider):
+        name = "none"
+
+    with pytest.raises(TypeError):
+        NoEmbed()
+
+
+def test_provider_selection_and_collections(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "")
+    assert isinstance(vs_module.get_provider("auto"), HashingProvider)
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    monkeypatch.setattr(vs_module, "openai", types.SimpleNamespace())
+    openai_provider = vs_module.get_provider("auto")
+    assert isinstance(openai_provider, OpenAIProvider) and openai_provider.collection == "artifacts"
+    assert HashingProvider(dim=64).collection == "artifacts_hash_v1_64"
+    monkeypatch.setattr(vs_module, "openai", None)
+    assert vs_module.get_provider("openai") is None
+
+
+def test_local_provider_indexes_and_queries_without_network(monkeypatch):
+    def offline(**kwargs):
+        raise AssertionError("no network expected")
+
+    openai_stub = types.SimpleNamespace(Embedding=types.SimpleNamespace(create=offline))
+    monkeypatch.setattr(vs_module, "openai", openai_stub)
+    store = vs_module.VectorStore(HashingProvider(dim=64))
+    store.client = QdrantClient(":memory:")
+    store.create_collection(store.collection_name)
+    assert store.client.get_collection(store.collection_name).config.params.vectors.size == 64
+
+    docs = [
+        (
+            "00000000-0000-4000-8000-000000000001",
+            "def parse_invoice(pdf): return totals",
+            {"file": "invoice.py"},
+        ),
+        (
+            "00000000-0000-4000-8000-000000000002",
+            "function LoginPage() { return <form/> }",
+            {"file": "login.tsx"},
+        ),
+    ]
+    assert all(store.index_artifacts("acme", docs).values())
+    hits = store.query_vectors("acme", "parse invoice totals", top_k=2)
+    assert [h.payload["file"] for h in hits][0] == "invoice.py"
+    assert store.query_vectors("other", "parse invoice totals") == []
@@ -0,0 +1,208 @@
+from ai_org_backend.orchestrator import sharding
+from ai_org_backend.orchestrator.fair_share import FairQueue
+from ai_org_backend.orchestrator.sharding import ShardLeases, shard_of
+
+
+def _rec(i: int, bv: float = 1.0) -> dict:
+    return {"id": f"t{i}", "tokens_plan": 1000, "business_value": bv}
+
+
+def test_fair_queue_interleaves_tenants_by_weight():
+    fq = FairQueue()
+    for i in range(20):
+        fq.push("big", _rec(i))
+    for i in range(20, 25):
+        fq.push("small", _rec(i))
+    fq.set_budget("big", 100.0)
+    fq.set_budget("small", 100.0)
+
+    first = [tid for tid, _ in fq.drain(10)]
+    # equal weights → the small tenant is not starved behind the big backlog
+    assert first.count("small") == 5
+    assert len(fq) == 15
+
+
+def test_fair_queue_prefers_budget_and_value():
+    fq = FairQueue()
+    for i in range(10):
+        fq.push("rich", _rec(i, bv=2.0))
+        fq.push("poor", _rec(100 + i, bv=1.0))
+    fq.set_budget("rich", 50.0)
+    fq.set_budget("poor", 1.0)
+
+    order = [tid for tid, _ in fq.drain(15)]
+    assert order.count("rich") > order.count("poor") > 0
+
+
+def test_shard_leases_without_redis_own_everything(monkeypatch):
+    monkeypatch.setattr(sharding, "get_redis", lambda: None)
+    monkeypatch.setattr(sharding, "redis_enabled", lambda: False)
+    leases = ShardLeases(replica_id="r1", num_shards=4)
+    assert leases.refresh() == {0, 1, 2, 3}
+    assert leases.owns("demo") and leases.confirm("demo")
+    assert shard_of("demo", 4) == shard_of("demo", 4)
+
+
+def test_shard_leases_with_unreachable_redis_own_nothing(monkeypatch):
+    monkeypatch.setattr(sharding, "get_redis", lambda: None)
+    monkeypatch.setattr(sharding, "redis_enabled", lambda: True)
+    leases = ShardLeases(replica_id="r1", num_shards=4)
+    assert leases.refresh() == set()
+    assert not leases.confirm("demo")
+
+
+class _LeaseRedis:
+    """SET NX PX, the lease scripts and the replica sorted set, on a fake clock."""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.keys = {}  # key -> (value, expires_at)
+        self.replicas = {}
+
+    def _get(self, key):
+        value, expires = self.keys.get(key, (None, 0.0))
+        return value if expires > self.clock[0] else None
+
+    def set(self, key, value, nx=False, px=0):
+        if nx and self._get(key) is not None:
+            return None
+        self.keys[key] = (value, self.clock[0] + px / 1000.0)
+        return True
+
+    def eval(self, script, numkeys, key, token, *args):
+        if self._get(key) != token:
+            return 0
+        if script == sharding._RENEW_LUA:
+            self.keys[key] = (token, self.clock[0] + int(args[0]) / 1000.0)
+        else:
+            del self.keys[key]
+        return 1
+
+    def pipeline(self):
+        redis, ops = self, []
+
+        class Pipe:
+            def zadd(self, key, mapping):
+                ops.append(lambda: redis.replicas.update(mapping))
+
+            def zremrangebyscore(self, key, lo, hi):
+                ops.append(lambda: [redis.replicas.pop(k) for k, v in list(redis.replicas.items())
+                                    if lo <= v <= hi])
+
+            def zcard(self, key):
+                ops.append(lambda: len(redis.replicas))
+
+            def execute(self):
+                return [op() for op in ops]
+
+        return Pipe()
+
+    def zrem(self, key, member):
+        self.replicas.pop(member, None)
+
+
+def test_shard_leases_split_rebalance_and_confirm_with_redis(monkeypatch):
+    clock = [1000.0]
+    redis = _LeaseRedis(clock)
+    monkeypatch.setattr(sharding, "get_redis", lambda: redis)
+    monkeypatch.setattr(sharding.time, "time", lambda: clock[0])
+    monkeypatch.setattr(sharding.time, "monotonic", lambda: clock[0])
+    a = ShardLeases(replica_id="a", num_shards=4, ttl_s=10)
+    b = ShardLeases(replica_id="b", num_shards=4, ttl_s=10)
+
+    assert a.refresh() == {0, 1, 2, 3}
+    b.refresh()  # b joins: a still holds everything
+    a.refresh()  # a releases its excess shards
+    b.refresh()  # and b claims them
+    assert len(a.owned) == len(b.owned) == 2 and not a.owned & b.owned
+
+    tenant = next(t for t in (f"t{i}" for i in range(50)) if a.owns(t))
+    assert a.confirm(tenant)
+    # a's tick outlasts the lease: b takes the shard over, a must not dispatch
+    clock[0] += 11
+    b.refresh()
+    assert b.owns(tenant)
+    assert not a.confirm(tenant) and not a.owns(tenant)
+    assert b.confirm(tenant)
+
+    # a lease confirmed within half a TTL needs no round trip
+    monkeypatch.setattr(redis, "eval", lambda *args: 0)
+    assert b.confirm(tenant)
+    b.release_all()
+    assert not b.owned
+
+
+def test_priority_orders_backlog_and_ages():
+    from ai_org_backend.orchestrator.priority import priority_score
+
+    cheap = {"id": "cheap", "tokens_plan": 500, "business_value": 5.0, "purpose_relevance": 1.0}
+    pricey = {"id": "pricey", "tokens_plan": 8000, "business_value": 5.0, "purpose_relevance": 1.0}
+    assert priority_score(cheap) > priority_score(pricey)
+    assert priority_score(pricey, slack=0) > priority_score(pricey, slack=5)
+    assert priority_score(pricey, waited_s=7200) > priority_score(cheap)
+
+    fq = FairQueue(priority=lambda tid, rec, waited: priority_score(rec, 0, waited))
+    fq.set_budget("demo", 10.0)
+    fq.push("demo", pricey)
+    fq.push("demo", cheap)
+    assert [rec["id"] for _, rec in fq.drain()] == ["cheap", "pricey"]
+
+
+def test_zero_value_task_is_not_starved_by_high_value_stream(monkeypatch):
+    from ai_org_backend.orchestrator import fair_share
+    from ai_org_backend.orchestrator.priority import priority_score
+
+    now = [0.0]
+    monkeypatch.setattr(fair_share.time, "time", lambda: now[0])
+    fq = FairQueue(priority=lambda tid, rec, waited: priority_score(rec, 0, waited))
+    fq.set_budget("demo", 10.0)
+    fq.push("demo", {"id": "chore", "tokens_plan": 8000, "business_value": 0.0})
+    served = []
+    for i in range(1000):  # one fresh high-value task per minute, one dispatch per minute
+        fq.push("demo", {"id": f"hot{i}", "tokens_plan": 500, "business_value": 10.0,
+                         "purpose_relevance": 1.0})
+        served += [rec["id"] for _, rec in fq.drain(1)]
+        if "chore" in served:
+            break
+        now[0] += 60
+    assert "chore" in served
+    assert now[0] < 24 * 3600  # within hours, not days
+
+
+def test_priority_uses_slack_of_rebuilt_critical_path(monkeypatch, tmp_path):
+    import ai_org_backend.main  # noqa: F401 - as in the scheduler, before graph_orchestrator
+    from ai_org_backend.models import Task, TaskDependency
+    from ai_org_backend.orchestrator import ready_queue
+    from ai_org_backend.orchestrator.critical_path import CriticalPathEngine
+    from ai_org_backend.orchestrator.priority import priority_score
+    from ai_org_backend.orchestrator.ready_queue import ReadyQueue
+    from sqlmodel import Session, SQLModel, create_engine
+
+    monkeypatch.setattr(ready_queue, "get_redis", lambda: None)
+    engine = create_engine(f"sqlite:///{tmp_path}/cp.db")
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as s:
+        # a 20-task chain and an independent task of the same value and cost
+        for tid in [f"c{i:02d}" for i in range(20)] + ["side"]:
+            s.add(Task(id=tid, tenant_id="demo", description=tid, business_value=5.0,
+                       purpose_relevance=1.0, tokens_plan=1000))
+        for i in range(1, 20):
+            s.add(TaskDependency(from_id=f"c{i - 1:02d}", to_id=f"c{i:02d}",
+                                 dependency_type="FINISH_START"))
+        s.commit()
+
+    cp = CriticalPathEngine("demo")
+    rq = ReadyQueue("demo", observers=[cp])
+    with Session(engine) as s:
+        rq.sync(s)  # first sync rebuilds the queue and the engine from SQL
+    assert cp.critical_length() == 19
+    assert cp.slack("c00") == 0 and cp.slack("side") == 19
+
+    def _priority(tid, rec, waited):  # as in the scheduler
+        return priority_score(rec, cp.slack(rec["id"]), waited)
+
+    fq = FairQueue(priority=_priority)
+    fq.set_budget("demo", 10.0)
+    for rec in sorted(rq.pop_ready(), key=lambda r: r["id"] != "side"):  # side queued first
+        fq.push("demo", rec)
+    assert [rec["id"] for _, rec in fq.drain()] == ["c00", "side"]
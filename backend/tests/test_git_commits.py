@@ -0,0 +1,51 @@
+import subprocess
+
+from ai_org_backend.services.git_commits import CommitCoalescer, init_repo
+
+
+def _git(root, *args):
+    return subprocess.run(["git", "-C", str(root), *args], capture_output=True, text=True).stdout
+
+
+def _log(root):
+    return _git(root, "log", "--format=%s").splitlines()
+
+
+def test_coalescer_commits_once_per_task(tmp_path):
+    init_repo(tmp_path)
+    c = CommitCoalescer(tmp_path)
+    for i in range(5):
+        (tmp_path / f"f{i}.txt").write_text(str(i))
+    (tmp_path / "g.txt").write_text("g")
+
+    c.commit("t1", [(f"f{i}.txt", f"t1: add artefact {i:08d}") for i in range(5)])
+    assert _log(tmp_path) == ["t1: add 5 artefacts"]
+    c.commit("t2", [("g.txt", "t2: add artefact 00000009")])
+    assert _log(tmp_path) == ["t2: add artefact 00000009", "t1: add 5 artefacts"]
+    assert _git(tmp_path, "status", "--porcelain") == ""
+
+
+def test_split_shared_repo_and_tenant_repos(tmp_path):
+    from ai_org_backend.services.git_commits import coalescer, split_shared_repo, tenant_repo
+
+    init_repo(tmp_path)
+    shared = CommitCoalescer(tmp_path)
+    for tenant, n in (("acme", 0), ("beta", 0), ("acme", 1)):
+        (tmp_path / tenant).mkdir(exist_ok=True)
+        (tmp_path / tenant / f"f{n}.txt").write_text(f"{tenant}{n}")
+        task = f"{tenant}-t{n}"
+        shared.commit(task, [(f"{tenant}/f{n}.txt", f"{task}: add artefact {n:08d}")])
+
+    assert split_shared_repo(tmp_path) == {"acme": 2, "beta": 1}
+    acme = tmp_path / "acme"
+    assert _log(acme) == ["acme-t1: add artefact 00000001", "acme-t0: add artefact 00000000"]
+    assert _log(tmp_path / "beta") == ["beta-t0: add artefact 00000000"]
+    assert _git(acme, "status", "--porcelain") == ""
+
+    # new commits go to the tenant repository, paths relative to it
+    assert tenant_repo(tmp_path, "acme") == acme
+    (acme / "f2.txt").write_text("acme2")
+    coalescer(acme).commit("acme-t2", [("f2.txt", "acme-t2: add artefact 00000002")])
+    assert _log(acme)[0] == "acme-t2: add artefact 00000002"
+    assert tenant_repo(tmp_path, "gamma") == tmp_path / "gamma"
+    assert (tmp_path / "gamma" / ".git").exists()
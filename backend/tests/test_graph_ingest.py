@@ -0,0 +1,79 @@
+from ai_org_backend.models import Task, TaskDependency
+from ai_org_backend.services import graph_ingest
+from sqlmodel import Session, SQLModel, create_engine
+
+
+class _FakeGraph:
+    """Records UNWIND batches and keeps the GraphSync watermark node."""
+
+    def __init__(self):
+        self.state = {}
+        self.writes = []
+
+    def session(self):
+        return self
+
+    def begin_transaction(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def commit(self):
+        pass
+
+    def run(self, cypher, **params):
+        self._single = None
+        if "RETURN s.task_ts" in cypher:
+            self._single = self.state.get(params["tenant"])
+        elif "MERGE (s:GraphSync" in cypher:
+            marks = ("task_ts", "dep_id", "artifact_ts")
+            self.state[params["tenant"]] = {k: params[k] for k in marks}
+        else:
+            self.writes.append((cypher, params))
+        return self
+
+    def single(self):
+        return self._single
+
+
+def test_ingest_applies_only_changes_of_one_tenant(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path}/graph.db")
+    SQLModel.metadata.create_all(engine)
+    fake = _FakeGraph()
+    monkeypatch.setattr(graph_ingest, "engine", engine)
+    monkeypatch.setattr(graph_ingest, "driver", fake)
+    monkeypatch.setattr(graph_ingest, "OVERLAP_S", 0)
+
+    with Session(engine) as s:
+        for i in range(20):
+            s.add(Task(id=f"a{i}", tenant_id="acme", description=f"task {i}"))
+        s.add(Task(id="b0", tenant_id="beta", description="other tenant"))
+        s.flush()
+        for i in range(1, 20):
+            s.add(
+                TaskDependency(from_id=f"a{i - 1}", to_id=f"a{i}", dependency_type="FINISH_START")
+            )
+        s.commit()
+
+    assert graph_ingest.ingest("acme") == {"tasks": 20, "deps": 19, "artifacts": 0}
+    tasks = [p["rows"] for c, p in fake.writes if "SET t += row.props" in c]
+    assert {r["id"] for r in tasks[0]} == {f"a{i}" for i in range(20)}  # beta untouched
+    assert not any("DETACH DELETE" in c for c, _ in fake.writes)
+
+    # QA adds one fix task: only it and its edge are written
+    fake.writes.clear()
+    with Session(engine) as s:
+        s.add(Task(id="fix1", tenant_id="acme", description="fix"))
+        s.flush()
+        s.add(TaskDependency(from_id="a19", to_id="fix1", dependency_type="FINISH_START"))
+        s.commit()
+    stats = graph_ingest.ingest("acme")
+    written = {r["id"] for c, p in fake.writes if "SET t += row.props" in c for r in p["rows"]}
+    edges = {(r["from"], r["to"]) for c, p in fake.writes if "DEPENDS_ON" in c for r in p["rows"]}
+    assert "fix1" in written and ("a19", "fix1") in edges
+    # at most the rows on the previous watermark are re-applied
+    assert stats["tasks"] <= 2 and stats["deps"] <= 2
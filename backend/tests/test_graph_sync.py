@@ -0,0 +1,56 @@
+from ai_org_backend.models import Task
+from ai_org_backend.services import graph_sync, outbox
+from sqlmodel import Session, SQLModel, create_engine
+
+
+class _FakeGraph:
+    def __init__(self):
+        self.runs = []
+
+    def session(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def run(self, cypher, **params):
+        self.runs.append((cypher, params))
+        return self
+
+    def consume(self):
+        return None
+
+
+def test_mirror_batches_per_tenant_with_latest_state(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path}/graph.db")
+    SQLModel.metadata.create_all(engine)
+    fake = _FakeGraph()
+    monkeypatch.setattr(graph_sync, "engine", engine)
+    monkeypatch.setattr(graph_sync, "driver", fake)
+
+    with Session(engine) as s:
+        for tid, tenant in (("a1", "acme"), ("a2", "acme"), ("b1", "beta")):
+            s.add(Task(id=tid, tenant_id=tenant, description=tid))
+            graph_sync.mirror_task(s, tenant, tid)
+        graph_sync.mirror_dependency(s, "acme", "a1", "a2", "finish_start")
+        s.commit()
+        # a later update of a1 before delivery: the node gets the newest state
+        a1 = s.get(Task, "a1")
+        a1.status = "done"
+        s.add(a1)
+        graph_sync.mirror_task(s, "acme", "a1")
+        s.commit()
+
+    assert outbox.drain(engine) == 5
+    tasks = [p["rows"] for c, p in fake.runs if "SET t += row.props" in c]
+    edges = [p["rows"] for c, p in fake.runs if "DEPENDS_ON" in c]
+    assert len(tasks) == 2  # one UNWIND per tenant
+    by_id = {row["id"]: row["props"] for rows in tasks for row in rows}
+    assert by_id["a1"]["status"] == "done" and by_id["a1"]["tenant"] == "acme"
+    assert sorted(len(rows) for rows in tasks) == [1, 2]
+    assert edges == [[{"from": "a1", "to": "a2", "kind": "FINISH_START"}]]
+    with Session(engine) as s:
+        assert outbox.due_count(s) == 0
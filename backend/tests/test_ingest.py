@@ -0,0 +1,27 @@
+import hashlib
+import io
+
+from ai_org_backend.utils.ingest import ingest
+
+
+def test_ingest_matches_whole_file_metadata(tmp_path):
+    # multi-byte characters and words straddling every chunk boundary
+    data = ("Grüße aus Köln — " * 50 + "wort\n\tzwei  drei ").encode("utf-8") * 3
+    src = tmp_path / "src.md"
+    src.write_bytes(data)
+    for source in (src, data, io.BytesIO(data)):
+        tgt = tmp_path / "out.md"
+        meta = ingest(source, tgt, chunk_size=7)
+        assert tgt.read_bytes() == data
+        assert meta.sha256 == hashlib.sha256(data).hexdigest()
+        assert meta.size == len(data)
+        assert meta.words == len(data.decode("utf-8").split())
+        assert meta.should_embed
+
+
+def test_ingest_caps_embed_text(tmp_path, monkeypatch):
+    monkeypatch.setattr("ai_org_backend.utils.ingest.EMBED_MAX_BYTES", 10)
+    meta = ingest(b"one two three four five six", tmp_path / "a.txt", chunk_size=4)
+    assert meta.text == "one two th"
+    assert meta.words == 6
+    assert not meta.should_embed
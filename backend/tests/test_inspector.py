@@ -0,0 +1,33 @@
+import importlib
+import os
+
+from ai_org_backend.models import Task
+from sqlmodel import Session, SQLModel, create_engine
+
+
+def test_status_counts_and_budgets(monkeypatch, tmp_path):
+    monkeypatch.setitem(os.environ, "DISABLE_METRICS", "1")
+    inspector = importlib.import_module("ai_org_backend.orchestrator.inspector")
+    engine = create_engine(f"sqlite:///{tmp_path}/insp.db")
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as s:
+        for i, (tenant, status) in enumerate(
+            [("a", "todo"), ("a", "todo"), ("a", "done"), ("b", "budget_exceeded"), ("c", "todo")]
+        ):
+            s.add(Task(id=f"t{i}", tenant_id=tenant, description="x", status=status))
+        s.commit()
+    monkeypatch.setattr(inspector, "engine", engine)
+
+    counts = inspector.status_counts(["a", "b"])
+    assert counts == {"a": {"todo": 2, "done": 1}, "b": {"budget_exceeded": 1}}
+    assert inspector.todo_count("a") == 2
+    inspector.export_status_counts(counts, ["a", "b"])
+    assert inspector.PROM_TASKS_BY_STATUS.labels("b", "todo")._value.get() == 0
+
+    class FakePool:
+        def hmget(self, key, names):
+            assert key == "budget"
+            return ["5.5", None][: len(names)]
+
+    monkeypatch.setattr(inspector, "pool", FakePool())
+    assert inspector.budgets_left(["a", "b"]) == {"a": 5.5, "b": float(inspector.DEFAULT_BUDGET)}
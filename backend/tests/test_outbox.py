@@ -0,0 +1,93 @@
+from datetime import datetime as dt
+from datetime import timedelta
+
+from ai_org_backend.models import OutboxEntry
+from ai_org_backend.services import outbox
+from sqlmodel import Session, SQLModel, create_engine, select
+
+
+def test_outbox_retries_failures_and_deletes_done(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path}/outbox.db")
+    SQLModel.metadata.create_all(engine)
+    monkeypatch.setattr(outbox, "OUTBOX_MAX_ATTEMPTS", 2)
+    calls = []
+
+    @outbox.handler("test.flaky")
+    def _flaky(entries):
+        calls.extend(outbox.payload(e)["n"] for e in entries)
+        return {
+            e.id: "Vector store persistence failed" for e in entries if outbox.payload(e)["n"] == 2
+        }
+
+    with Session(engine) as session:
+        for n in (1, 2):
+            outbox.enqueue(session, "test.flaky", "demo", f"a{n}", {"n": n})
+        session.commit()
+
+    assert outbox.process(engine) == 2
+    assert outbox.process(engine) == 0  # failed entry backs off, done entry is gone
+    with Session(engine) as session:
+        (row,) = session.exec(select(OutboxEntry)).all()
+        assert (row.ref_id, row.status, row.attempts, row.claim) == ("a2", "pending", 1, None)
+        assert row.available_at > dt.utcnow()
+        row.available_at = dt.utcnow() - timedelta(seconds=1)
+        session.add(row)
+        session.commit()
+
+    assert outbox.drain(engine) == 1
+    with Session(engine) as session:
+        (row,) = session.exec(select(OutboxEntry)).all()
+        assert (row.status, row.attempts) == ("dead", 2)
+        assert outbox.due_count(session) == 0
+    assert calls == [1, 2, 2]
+
+
+def test_outbox_claim_is_exclusive(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/outbox.db")
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        for n in range(5):
+            outbox.enqueue(session, "test.noop", "demo", f"a{n}", {})
+        session.commit()
+    first = outbox.claim(engine, limit=3)
+    second = outbox.claim(engine)
+    assert len(first) == 3 and len(second) == 2
+    assert not {e.id for e in first} & {e.id for e in second}
+    assert outbox.claim(engine) == []  # leased
+
+
+def test_outbox_leaves_topics_without_handler_unclaimed(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/outbox.db")
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        outbox.enqueue(session, "test.unhandled", "demo", "a1", {})
+        session.commit()
+
+    assert outbox.drain(engine) == 0
+    with Session(engine) as session:
+        (row,) = session.exec(select(OutboxEntry)).all()
+        assert (row.status, row.attempts, row.claim) == ("pending", 0, None)
+    # the production handlers are registered without importing their modules first
+    assert {"artefact.embed", "graph.task"} <= set(outbox.HANDLERS)
+
+
+def test_outbox_stale_worker_cannot_overwrite_reclaimed_entry(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path}/outbox.db")
+    SQLModel.metadata.create_all(engine)
+    monkeypatch.setattr(outbox, "OUTBOX_LEASE_S", -1)  # leases expire immediately
+    with Session(engine) as session:
+        outbox.enqueue(session, "test.slow", "demo", "a1", {})
+        outbox.enqueue(session, "test.slow", "demo", "a2", {})
+        session.commit()
+
+    stale = outbox.claim(engine)
+    fresh = outbox.claim(engine)  # lease of the first worker expired
+    assert [e.id for e in fresh] == [e.id for e in stale]
+    # the stale worker finishes late: its results must not touch the rows
+    outbox._finish(engine, [stale[0].id], {stale[1].id: "boom"}, {e.id: e for e in stale})
+    with Session(engine) as session:
+        rows = session.exec(select(OutboxEntry).order_by(OutboxEntry.id)).all()
+        assert [(r.claim, r.last_error) for r in rows] == [(fresh[0].claim, None)] * 2
+    outbox._finish(engine, [e.id for e in fresh], {}, {e.id: e for e in fresh})
+    with Session(engine) as session:
+        assert session.exec(select(OutboxEntry)).all() == []
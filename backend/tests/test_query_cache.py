@@ -0,0 +1,46 @@
+from ai_org_backend.services import query_cache as qc
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+
+
+def test_query_vectors_are_cached_per_tenant_and_model(monkeypatch):
+    redis = _FakeRedis()
+    monkeypatch.setattr(qc, "get_redis", lambda: redis)
+    calls = []
+
+    def compute(text):
+        return lambda: calls.append(text) or [0.5, float(len(calls))]
+
+    api = qc.QueryVectorCache(ttl_s=60)
+    v1 = api.vector("m1", "acme", "Build the login API", compute("q"))
+    # retries and re-renders: trivial variants, other replica (shared Redis)
+    assert api.vector("m1", "acme", "  build the   login api ", compute("q")) == v1
+    worker = qc.QueryVectorCache(ttl_s=60)
+    assert worker.vector("m1", "acme", "Build the login API", compute("q")) == v1
+    assert len(calls) == 1
+
+    # other tenant or new embedding model: never a stale vector
+    worker.vector("m1", "beta", "Build the login API", compute("q"))
+    worker.vector("m2", "acme", "Build the login API", compute("q"))
+    assert len(calls) == 3
+
+
+def test_query_cache_expires_in_memory_without_redis(monkeypatch):
+    monkeypatch.setattr(qc, "get_redis", lambda: None)
+    now = [1000.0]
+    monkeypatch.setattr(qc.time, "time", lambda: now[0])
+    cache = qc.QueryVectorCache(ttl_s=10, max_entries=1)
+    key = cache.key("m", "acme", "q")
+    cache.set(key, [1.0])
+    assert cache.get(key) == [1.0]
+    now[0] += 11
+    assert cache.get(key) is None
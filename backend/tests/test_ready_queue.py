@@ -0,0 +1,69 @@
+from ai_org_backend.models import Task, TaskDependency
+from ai_org_backend.orchestrator import ready_queue
+from ai_org_backend.orchestrator.ready_queue import ReadyQueue
+from sqlmodel import Session, SQLModel, create_engine
+
+
+def _setup(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/rq.db")
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as s:
+        s.add(Task(id="a", tenant_id="demo", description="A"))
+        s.add(Task(id="b", tenant_id="demo", description="B"))
+        s.add(Task(id="c", tenant_id="demo", description="C", status="done"))
+        s.add(TaskDependency(from_id="a", to_id="b", dependency_type="FINISH_START"))
+        s.add(TaskDependency(from_id="c", to_id="b"))  # legacy default kind "blocks"
+        s.commit()
+    return engine
+
+
+def test_ready_queue_releases_successor_on_done(monkeypatch, tmp_path):
+    monkeypatch.setattr(ready_queue, "get_redis", lambda: None)
+    engine = _setup(tmp_path)
+    rq = ReadyQueue("demo")
+    with Session(engine) as s:
+        rq.sync(s)
+    assert [t["id"] for t in rq.pop_ready()] == ["a"]
+
+    # dispatch a, nothing else becomes ready
+    ready_queue.publish_event("demo", {"type": "task", "id": "a", "status": "doing"})
+    with Session(engine) as s:
+        rq.sync(s)
+    assert rq.pop_ready() == []
+
+    # last predecessor done → b ready without a rebuild
+    ready_queue.publish_event("demo", {"type": "task", "id": "a", "status": "done"})
+    with Session(engine) as s:
+        rq.sync(s)
+    assert [t["id"] for t in rq.pop_ready()] == ["b"]
+
+
+def test_ready_queue_edge_and_reopen(monkeypatch, tmp_path):
+    monkeypatch.setattr(ready_queue, "get_redis", lambda: None)
+    engine = _setup(tmp_path)
+    rq = ReadyQueue("demo")
+    with Session(engine) as s:
+        rq.sync(s)
+    rq.pop_ready()
+
+    # new task gated by a (still todo) is not ready
+    ready_queue.publish_edge("demo", "a", "d", "FINISH_START")
+    ready_queue.publish_event("demo", {"type": "task", "id": "d", "status": "todo"})
+    # reopening c blocks b a second time
+    ready_queue.publish_event("demo", {"type": "task", "id": "c", "status": "todo"})
+    ready_queue.publish_event("demo", {"type": "task", "id": "a", "status": "done"})
+    with Session(engine) as s:
+        rq.sync(s)
+    assert sorted(t["id"] for t in rq.pop_ready()) == ["c", "d"]
+    assert rq.pending["b"] == 1
+
+
+def test_ready_tasks_sql_matches_ready_queue(tmp_path):
+    engine = _setup(tmp_path)
+    with Session(engine) as s:
+        s.add(Task(id="d", tenant_id="demo", description="D"))
+        s.add(TaskDependency(from_id="b", to_id="d", dependency_type="RELATES_TO"))  # not gating
+        s.add(Task(id="x", tenant_id="other", description="X"))
+        s.commit()
+        assert [t["id"] for t in ready_queue.ready_tasks(s, "demo")] == ["a", "d"]
+        assert ready_queue.ready_tasks(s, "demo", limit=1)[0]["tokens_plan"] == 0
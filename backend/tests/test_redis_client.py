@@ -0,0 +1,37 @@
+import types
+
+from ai_org_backend.services import redis_client
+
+
+def test_unreachable_redis_is_retried_after_backoff(monkeypatch):
+    state = {"up": False, "connects": 0, "url": None}
+
+    class FakeRedis:
+        @classmethod
+        def from_url(cls, url, **kwargs):
+            state["connects"] += 1
+            state["url"] = url
+            return cls()
+
+        def ping(self):
+            if not state["up"]:
+                raise ConnectionError("connection refused")
+            return True
+
+    now = [100.0]
+    monkeypatch.setattr(redis_client, "redis", types.SimpleNamespace(Redis=FakeRedis))
+    monkeypatch.setattr(redis_client.time, "monotonic", lambda: now[0])
+    monkeypatch.setattr(redis_client, "_client", None)
+    monkeypatch.setattr(redis_client, "_next_try", 0.0)
+    monkeypatch.setattr(redis_client, "_delay", 1.0)
+    monkeypatch.delenv("REDIS_URL", raising=False)
+
+    assert redis_client.get_redis() is None
+    assert state["url"] == redis_client.REDIS_URL  # same default as main/config
+    assert redis_client.get_redis() is None and state["connects"] == 1  # backing off
+
+    state["up"] = True
+    now[0] += 1.5
+    client = redis_client.get_redis()
+    assert isinstance(client, FakeRedis) and state["connects"] == 2
+    assert redis_client.get_redis() is client and state["connects"] == 2
@@ -0,0 +1,87 @@
+import json
+import types
+from datetime import datetime
+
+import pytest
+from ai_org_backend.models import Artifact, Task
+from ai_org_backend.services import reindex as reindex_mod
+from ai_org_backend.services import vector_store as vs_module
+from qdrant_client import QdrantClient
+from sqlmodel import Session, SQLModel, create_engine
+
+TEXT = {f"s{i}": " ".join(f"word{i}_{j}" for j in range(40)) for i in range(4)}
+
+
+def test_reindex_blue_green_with_resume(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path}/ri.db")
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as s:
+        s.add(Task(id="t1", tenant_id="acme", description="x"))
+        for i in range(4):
+            s.add(
+                Artifact(
+                    id=f"00000000-0000-4000-8000-00000000000{i}",
+                    task_id="t1",
+                    repo_path=f"acme/f{i}.py",
+                    media_type="text/x-source",
+                    sha256=f"s{i}".ljust(64, "0"),
+                    created_at=datetime(2025, 1, 1, 0, i),
+                )
+            )
+        s.commit()
+    monkeypatch.setattr(reindex_mod, "engine", engine)
+    monkeypatch.setattr(
+        reindex_mod, "read_artefact", lambda tenant, path, sha, limit: TEXT[sha[:2]].encode()
+    )
+
+    calls = []
+
+    def create(model, input):
+        calls.append(len(input))
+        data = [{"index": i, "embedding": [1.0, float(len(t))]} for i, t in enumerate(input)]
+        return {"data": data}
+
+    openai_stub = types.SimpleNamespace(Embedding=types.SimpleNamespace(create=create))
+    monkeypatch.setattr(vs_module, "openai", openai_stub)
+    monkeypatch.setattr(vs_module, "EMBEDDING_PROVIDER", "openai")
+    monkeypatch.setattr(vs_module, "EMBEDDING_DIM", 2)
+    store = vs_module.VectorStore()
+    store.client = QdrantClient(":memory:")
+    store.ensure_collection()
+    live = store.aliases()[store.collection_name]
+    monkeypatch.setattr(reindex_mod, "vector_store", store)
+
+    # first run dies after the first page
+    real_index = store.index_artifacts
+    pages = []
+
+    def flaky(*a, **k):
+        pages.append(1)
+        if len(pages) == 2:
+            raise ConnectionError("qdrant went away")
+        return real_index(*a, **k)
+
+    monkeypatch.setattr(store, "index_artifacts", flaky)
+    ckpt = tmp_path / "reindex.json"
+    with pytest.raises(ConnectionError):
+        reindex_mod.reindex(checkpoint=ckpt, batch=2)
+    state = json.loads(ckpt.read_text())
+    assert state["tenants"]["acme"] == "00000000-0000-4000-8000-000000000001"
+    assert store.aliases() == {"artifacts": live}  # still serving the old collection
+
+    monkeypatch.setattr(store, "index_artifacts", real_index)
+    calls.clear()
+    stats = reindex_mod.reindex(checkpoint=ckpt, batch=2)
+    assert sum(calls) == 2  # only the remaining page was embedded, no catch-up for old rows
+    assert stats["target"] == state["target"] and stats["chunks"] == 2 and stats["tokens"] > 0
+    assert store.aliases() == {"artifacts": state["target"]}
+    assert store.client.count(state["target"]).count == 4
+    assert len(store.query_vectors("acme", "word1_1", top_k=10)) == 4
+    # the swap only moved the alias: the old collection is kept until dropped
+    assert stats["previous"] == live and store.client.collection_exists(live)
+
+    again = reindex_mod.reindex(batch=2, drop_previous=True)
+    assert store.aliases() == {"artifacts": again["target"]}
+    assert again["previous"] == state["target"]
+    assert not store.client.collection_exists(state["target"])
+    assert len(store.query_vectors("acme", "word1_1", top_k=10)) == 4
@@ -0,0 +1,44 @@
+import random
+import time
+
+from ai_org_backend.orchestrator import retry_queue as rq
+
+
+def test_backoff_grows_with_jitter_and_cap():
+    rng = random.Random(1)
+    first = [rq.backoff_delay("llm", 0, rng) for _ in range(200)]
+    assert 15 <= min(first) and max(first) <= 30
+    assert len({round(d) for d in first}) > 5  # spread out, no thundering herd
+    assert 30 <= rq.backoff_delay("llm", 1, rng) <= 60
+    assert rq.backoff_delay("llm", 20, rng) <= rq.BACKOFF["llm"][1]
+
+
+def test_classify_error():
+    assert rq.classify_error("sandbox timed out after 120s") == "sandbox_timeout"
+    assert rq.classify_error("OpenAI RateLimitError: 429") == "llm"
+    assert rq.classify_error("budget exhausted") == "budget"
+    assert rq.classify_error("assertion failed") == "default"
+
+
+def test_pop_due_only_returns_due_entries(monkeypatch):
+    monkeypatch.setattr(rq, "get_redis", lambda: None)
+    assert rq.schedule_retry("demo", "t1", "OpenAI 503", 0) is not None
+    assert rq.schedule_retry("demo", "t2", "budget exhausted", 0) is not None
+    assert rq.schedule_retry("demo", "t3", "boom", rq.MAX_RETRIES) is None  # out of retries
+
+    assert rq.pop_due(now=time.time()) == []
+    assert rq.pop_due(now=time.time() + 60) == [("demo", "t1")]
+    rq.cancel_retry("demo", "t2")
+    assert rq.pop_due(now=time.time() + 10_000) == []
+    assert rq.pending_count() == 0
+
+
+def test_recovery_sweep_keeps_queued_entries_and_counts_from_failure(monkeypatch):
+    monkeypatch.setattr(rq, "get_redis", lambda: None)
+    failed_at = time.time() - 3600  # failed an hour ago, e.g. recorded by a worker process
+    due = rq.schedule_retry("demo", "t4", "boom", 0, failed_at=failed_at, keep_existing=True)
+    assert due is not None and due < time.time()
+    # the next sweep must not push the due time further out
+    assert rq.schedule_retry("demo", "t4", "boom", 0, keep_existing=True) is None
+    assert rq.pop_due() == [("demo", "t4")]
+    assert rq.pending_count() == 0
@@ -0,0 +1,45 @@
+import importlib
+import os
+
+
+def test_classify_roles_batches_and_caches(monkeypatch):
+    monkeypatch.setitem(os.environ, "DISABLE_METRICS", "1")
+    router = importlib.import_module("ai_org_backend.orchestrator.router")
+    from ai_org_backend.orchestrator import role_cache
+
+    monkeypatch.setattr(role_cache, "get_redis", lambda: None)
+    monkeypatch.setattr(router, "role_cache", role_cache.RoleCache(version="test"))
+    calls = []
+
+    def fake_completion(prompt, **kw):
+        calls.append(prompt)
+        return '["dev", "qa"]'
+
+    monkeypatch.setattr(router, "chat_completion", fake_completion)
+
+    descs = ["Build the API", "  build   the API ", "Write tests for the API"]
+    assert router.classify_roles(descs) == ["dev", "dev", "qa"]
+    assert len(calls) == 1  # one batched LLM call for two distinct descriptions
+
+    # repeat work (retries, fix tasks) is answered from the cache
+    assert router.classify_roles(descs) == ["dev", "dev", "qa"]
+    assert router.classify_role("Write tests for the API") == "qa"
+    assert len(calls) == 1
+
+
+def test_unknown_llm_role_is_not_cached(monkeypatch):
+    monkeypatch.setitem(os.environ, "DISABLE_METRICS", "1")
+    router = importlib.import_module("ai_org_backend.orchestrator.router")
+    from ai_org_backend.orchestrator import role_cache
+
+    monkeypatch.setattr(role_cache, "get_redis", lambda: None)
+    monkeypatch.setattr(router, "role_cache", role_cache.RoleCache(version="test"))
+    monkeypatch.setattr(router, "_classify_local", lambda desc: None)
+    answers = ['{"role": "wizard"}', '["wizard", "qa"]', '{"role": "wizard"}', '["qa", "dev"]']
+    monkeypatch.setattr(router, "chat_completion", lambda prompt, **kw: answers.pop(0))
+
+    assert router.classify_role("Write tests for the API") == "dev"  # fallback, not remembered
+    assert router.classify_roles(["Review the login", "Write tests for the API"]) == ["dev", "qa"]
+    assert router.classify_role("Write tests for the API") == "qa"  # cached by the batch
+    assert router.classify_roles(["Review the login", "Fix the build"]) == ["qa", "dev"]
+    assert not answers
@@ -0,0 +1,43 @@
+#!/usr/bin/env python
+"""
+Dedup-Report des Artefakt-Blob-Stores: pro Tenant Artefakte, Blobs,
+logische vs. gespeicherte Bytes, Dedup-Ratio und gesparte Bytes.
+
+Usage:
+    python scripts/dedup_report.py [--json]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "backend"))
+
+from ai_org_backend.db import engine  # noqa: E402
+from ai_org_backend.services.blob_store import dedup_report  # noqa: E402
+from sqlmodel import Session  # noqa: E402
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Artefact dedup ratio and bytes saved per tenant")
+    ap.add_argument("--json", action="store_true", help="print JSON instead of a table")
+    ns = ap.parse_args()
+
+    with Session(engine) as session:
+        rows = dedup_report(session)
+    if ns.json:
+        print(json.dumps(rows, indent=2))
+        return
+    print(f"{'tenant':<24}{'artefacts':>10}{'blobs':>8}{'logical':>14}{'stored':>14}{'ratio':>8}{'saved':>14}")
+    for r in rows:
+        print(
+            f"{r['tenant']:<24}{r['artefacts']:>10}{r['blobs']:>8}{r['logical_bytes']:>14,}"
+            f"{r['stored_bytes']:>14,}{r['dedup_ratio']:>8.2f}{r['bytes_saved']:>14,}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+"""
+Baut die Qdrant-Collection ``artifacts`` aus der Artefakt-Tabelle neu auf
+(nach Modellwechsel, Qdrant-Verlust oder Payload-Änderung).
+
+Schreibt in eine neue Collection und schwenkt danach den Alias ``artifacts``
+um (Blue/Green, Queries laufen währenddessen weiter). Mit ``--checkpoint``
+setzt ein erneuter Aufruf dort fort, wo der letzte abgebrochen ist. Die
+vorherige Collection bleibt erhalten, außer mit ``--drop-previous``.
+
+Usage:
+    python scripts/reindex_vectors.py [--tenant demo ...] [--checkpoint reindex.json]
+                                      [--batch 200] [--readers 8] [--no-swap]
+                                      [--drop-previous]
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "backend"))
+
+from ai_org_backend.services.reindex import REINDEX_BATCH, REINDEX_READERS, reindex  # noqa: E402
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Re-embed all artefacts into a new Qdrant collection")
+    ap.add_argument(
+        "--tenant", action="append", help="only these tenants (repeatable); default: all"
+    )
+    ap.add_argument("--checkpoint", type=Path, help="JSON file to resume from / write progress to")
+    ap.add_argument("--batch", type=int, default=REINDEX_BATCH, help="artefacts per page")
+    ap.add_argument("--readers", type=int, default=REINDEX_READERS, help="concurrent file reads")
+    ap.add_argument(
+        "--no-swap", action="store_true", help="build the collection but keep serving the old one"
+    )
+    ap.add_argument(
+        "--drop-previous", action="store_true", help="delete the old collection after the swap"
+    )
+    ns = ap.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    stats = reindex(
+        ns.tenant, ns.checkpoint, swap=not ns.no_swap, batch=ns.batch, readers=ns.readers,
+        drop_previous=ns.drop_previous,
+    )
+    print(
+        f"✅  {stats.get('artefacts', 0)} artefacts ({stats.get('skipped', 0)} skipped), "
+        f"{stats.get('chunks', 0)} chunks in {stats['seconds']:.1f}s: "
+        f"{stats['chunks_per_s']:.1f} chunks/s, {stats['tokens_per_s']:.0f} tokens/s "
+        f"→ {stats['target']}"
+    )
+    if stats["previous"] and not ns.drop_previous:
+        print(f"ℹ️  previous collection {stats['previous']} can be dropped (--drop-previous)")
+
+
+if __name__ == "__main__":
+    main()
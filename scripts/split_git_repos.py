@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+"""
+Teilt das gemeinsame Workspace-Repository (``workspace/.git``) in ein
+Repository pro Tenant (``workspace/<tenant>/.git``) auf.
+
+Die Historie jedes Tenants wird übernommen (Autor, Zeitstempel und Message
+bleiben erhalten), Commits ohne Änderungen am Tenant entfallen. Tenants mit
+eigenem Repository werden übersprungen, Dateien im Workspace nicht verändert.
+``--retire`` benennt das gemeinsame ``.git`` danach in ``.git-shared`` um.
+
+Usage:
+    python scripts/split_git_repos.py [--workspace workspace] [--tenant demo ...] [--retire]
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "backend"))
+
+from ai_org_backend.services.git_commits import split_shared_repo  # noqa: E402
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(
+        description="Split the shared workspace git history into per-tenant repositories"
+    )
+    ap.add_argument(
+        "--workspace", type=Path, default=Path.cwd() / "workspace", help="workspace directory"
+    )
+    ap.add_argument(
+        "--tenant", action="append", help="only these tenants (repeatable); default: all"
+    )
+    ap.add_argument(
+        "--retire", action="store_true", help="rename the shared .git to .git-shared afterwards"
+    )
+    ns = ap.parse_args()
+
+    if not (ns.workspace / ".git").exists():
+        print(f"No shared repository in {ns.workspace}, nothing to split")
+        return
+    for tenant, commits in split_shared_repo(ns.workspace, ns.tenant).items():
+        print(f"✅  {tenant}: {commits} commits")
+    if ns.retire:
+        (ns.workspace / ".git").rename(ns.workspace / ".git-shared")
+        print(f"Shared repository moved to {ns.workspace / '.git-shared'}")
+
+
+if __name__ == "__main__":
+    main()